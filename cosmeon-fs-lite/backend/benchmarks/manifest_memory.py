@@ -0,0 +1,91 @@
+"""
+Memory and encode/decode cost of a large manifest: plain dicts vs
+CompactManifest.
+
+    cd backend
+    python -m benchmarks.manifest_memory [chunks]
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fs_lite.compact_manifest import CompactManifest
+
+CHUNK_SIZE = 64 * 1024
+NODES = ["node_0", "node_1", "node_2", "node_3"]
+
+
+def build_dict_manifest(chunks: int) -> dict:
+    """A manifest shaped like the ones the upload path builds."""
+    return {
+        "file_id": "bench001",
+        "file_name": "bench.bin",
+        "file_size": chunks * CHUNK_SIZE - 1000,
+        "total_chunks": chunks,
+        "chunk_size": CHUNK_SIZE,
+        "full_hash": os.urandom(32).hex(),
+        "chunks": [
+            {
+                "id": f"bench001_{i}",
+                "index": i,
+                "size": CHUNK_SIZE if i < chunks - 1 else CHUNK_SIZE - 1000,
+                "hash": os.urandom(32).hex(),
+                "primary_node": NODES[i % 4],
+                "replica_node": NODES[(i + 1) % 4],
+            }
+            for i in range(chunks)
+        ],
+    }
+
+
+def measure(label: str, build):
+    """(result, bytes still allocated, seconds) for build()."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<32} {current / 1024 / 1024:8.1f} MB {elapsed:8.3f}s")
+    return result
+
+
+def main(chunks: int):
+    print(f"📏 Manifest with {chunks:,} chunks ({chunks * CHUNK_SIZE / 1024 ** 3:.1f} GB at 64KB)")
+    manifest = build_dict_manifest(chunks)
+    encoded_dict = json.dumps(manifest)
+
+    print("\n🧱 In memory (resident after build)")
+    measure("dict (json.loads)", lambda: json.loads(encoded_dict))
+    compact = measure("CompactManifest.from_dict", lambda: CompactManifest.from_dict(manifest))
+
+    print("\n💾 Stored form")
+    encoded_compact = json.dumps(compact.to_record())
+    print(f"   {'dict JSON':<32} {len(encoded_dict) / 1024 / 1024:8.1f} MB")
+    print(f"   {'packed chunk table JSON':<32} {len(encoded_compact) / 1024 / 1024:8.1f} MB")
+
+    print("\n⏱️  Encode / decode")
+    for label, fn in (
+        ("dict encode", lambda: json.dumps(manifest)),
+        ("compact encode", lambda: json.dumps(compact.to_record())),
+        ("dict decode", lambda: json.loads(encoded_dict)),
+        ("compact decode", lambda: CompactManifest.from_record(json.loads(encoded_compact))),
+    ):
+        started = time.perf_counter()
+        fn()
+        print(f"   {label:<32} {time.perf_counter() - started:8.3f}s")
+
+    print("\n🔁 Lazy dict for API output")
+    measure("CompactManifest.to_dict", compact.to_dict)
+
+    assert compact.to_dict()["chunks"] == manifest["chunks"]
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
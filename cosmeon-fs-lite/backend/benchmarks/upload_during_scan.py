@@ -0,0 +1,81 @@
+"""
+Upload hashing throughput while a throttled health scan is running:
+idle, with the scan on its own scrub pool, and with the scan sharing the
+hash pool (how it used to run) for comparison.
+
+    cd backend
+    python -m benchmarks.upload_during_scan [upload_mb]
+"""
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fs_lite import health_monitor, metadata_store, node_manager
+from fs_lite.chunk_engine import split_stream
+from fs_lite.distributor import distribute_chunks
+from fs_lite.hashing import get_hash_pool
+from fs_lite.intent_log import commit_upload
+from fs_lite.io_scheduler import MB, SCRUB, scheduler
+
+SCAN_DATA_BYTES = 2 * MB
+SCAN_CHUNK_SIZE = 32 * 1024
+SCRUB_LIMIT = 1 * MB
+
+
+def use_scratch_cluster(root: str):
+    """Point node and metadata storage at an empty scratch directory."""
+    node_manager.NODES_DIR = os.path.join(root, "nodes")
+    for node_id in node_manager.NODE_IDS:
+        os.makedirs(os.path.join(node_manager.NODES_DIR, node_id))
+    metadata_store.METADATA_DIR = os.path.join(root, "metadata")
+    metadata_store.METADATA_FILE = os.path.join(root, "metadata", "metadata.json")
+    import fs_lite.intent_log as intent_log
+    intent_log.INTENT_DIR = os.path.join(root, "metadata", "intents")
+    node_manager.refresh_node_state()
+
+
+def upload_rate(data: bytes) -> float:
+    """MB/s of chunking and hashing an upload stream."""
+    started = time.perf_counter()
+    split_stream(io.BytesIO(data), "bench.bin", verbose=False)
+    return len(data) / MB / (time.perf_counter() - started)
+
+
+def rate_during_scan(data: bytes) -> float:
+    scan = threading.Thread(target=health_monitor.scan_system_health, kwargs={"details": "none"})
+    scan.start()
+    time.sleep(0.2)     # let the scan fill its workers
+    rate = upload_rate(data)
+    scan.join()
+    return rate
+
+
+def main(upload_mb: int):
+    data = os.urandom(upload_mb * MB)
+    with tempfile.TemporaryDirectory() as root:
+        use_scratch_cluster(root)
+        manifest = distribute_chunks(split_stream(
+            io.BytesIO(os.urandom(SCAN_DATA_BYTES)), "scan.bin",
+            chunk_size=SCAN_CHUNK_SIZE, verbose=False,
+        ))
+        metadata_store.save_manifest(manifest)
+        commit_upload(manifest["file_id"])
+        scheduler.set_class_limit(SCRUB, SCRUB_LIMIT)
+
+        print(f"\n📏 Hashing a {upload_mb} MB upload; scan reads {manifest['total_chunks']} chunks x2 at "
+              f"{SCRUB_LIMIT // MB} MB/s scrub limit")
+        upload_rate(data)   # warm up the hash pool
+        print(f"   {'idle':<34} {upload_rate(data):8.1f} MB/s")
+        print(f"   {'during scan (scrub pool)':<34} {rate_during_scan(data):8.1f} MB/s")
+
+        health_monitor.get_scrub_pool = get_hash_pool
+        print(f"   {'during scan (shared hash pool)':<34} {rate_during_scan(data):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
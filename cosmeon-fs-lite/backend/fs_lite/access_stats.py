@@ -0,0 +1,159 @@
+import threading
+import time
+from array import array
+
+# Reads lose half their weight every this many seconds
+HALF_LIFE_SECONDS = 600
+
+# Count-min sketch for per-chunk heat: estimates never undercount, and
+# overcount by at most ~e/width of the total weight with high probability
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 4096
+
+# Rescale stored weights before they grow past what a float holds exactly
+MAX_WEIGHT = 2.0 ** 40
+
+
+class DecayedSketch:
+    """
+    Count-min sketch of exponentially decayed counts. Instead of decaying
+    every cell on a timer, each new read is added with a weight that grows
+    over time (2^(t / half-life)); dividing by the current weight on lookup
+    gives the decayed count.
+    """
+
+    def __init__(self, depth: int = SKETCH_DEPTH, width: int = SKETCH_WIDTH):
+        self.width = width
+        self.rows = [array("d", [0.0]) * width for _ in range(depth)]
+
+    def _cells(self, key: str):
+        for seed, row in enumerate(self.rows):
+            yield row, hash((seed, key)) % self.width
+
+    def add(self, key: str, weight: float):
+        for row, cell in self._cells(key):
+            row[cell] += weight
+
+    def estimate(self, key: str) -> float:
+        return min(row[cell] for row, cell in self._cells(key))
+
+    def scale(self, factor: float):
+        for row in self.rows:
+            for cell in range(self.width):
+                row[cell] *= factor
+
+    def clear(self):
+        for row in self.rows:
+            for cell in range(self.width):
+                row[cell] = 0.0
+
+
+class AccessStats:
+    """
+    Read heat kept by the read path: exact decayed read counts per file,
+    a decayed count-min sketch per chunk, and where read traffic was
+    served from (node, extra read replica, or the download cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._chunks = DecayedSketch()
+        self._files = {}        # file_id → [weighted reads, last read (wall clock)]
+        self._traffic = {}
+        self._reset_traffic()
+
+    def _reset_traffic(self):
+        self._traffic = {
+            "reads": 0,
+            "node_bytes": {},
+            "read_replica_reads": 0,
+            "read_replica_bytes": 0,
+            "cache_hits": 0,
+            "cache_bytes": 0,
+        }
+
+    def _weight(self) -> float:
+        """Weight of a read made now. Call with the lock held."""
+        weight = 2.0 ** ((time.monotonic() - self._origin) / HALF_LIFE_SECONDS)
+        if weight > MAX_WEIGHT:
+            factor = 1.0 / weight
+            self._chunks.scale(factor)
+            for entry in self._files.values():
+                entry[0] *= factor
+            self._origin = time.monotonic()
+            weight = 1.0
+        return weight
+
+    def record_read(self, file_id: str, chunk_ids=(), cached_bytes: int = 0):
+        """
+        A client read of a file (whole, range or export). chunk_ids are the
+        chunks it touched; cached_bytes is set when the download cache
+        served it without touching any node.
+        """
+        with self._lock:
+            weight = self._weight()
+            entry = self._files.setdefault(file_id, [0.0, None])
+            entry[0] += weight
+            entry[1] = time.time()
+            for chunk_id in chunk_ids:
+                self._chunks.add(chunk_id, weight)
+            self._traffic["reads"] += 1
+            if cached_bytes:
+                self._traffic["cache_hits"] += 1
+                self._traffic["cache_bytes"] += cached_bytes
+
+    def record_node_read(self, node_id: str, nbytes: int, read_replica: bool = False):
+        """Chunk bytes served by a node; read_replica if it was a tiering copy."""
+        with self._lock:
+            node_bytes = self._traffic["node_bytes"]
+            node_bytes[node_id] = node_bytes.get(node_id, 0) + nbytes
+            if read_replica:
+                self._traffic["read_replica_reads"] += 1
+                self._traffic["read_replica_bytes"] += nbytes
+
+    def file_heat(self, file_id: str) -> float:
+        """Decayed number of reads of the file."""
+        with self._lock:
+            entry = self._files.get(file_id)
+            return entry[0] / self._weight() if entry else 0.0
+
+    def chunk_heat(self, chunk_id: str) -> float:
+        """Decayed number of reads touching the chunk (sketch estimate)."""
+        with self._lock:
+            return self._chunks.estimate(chunk_id) / self._weight()
+
+    def last_read(self, file_id: str):
+        with self._lock:
+            entry = self._files.get(file_id)
+            return entry[1] if entry else None
+
+    def forget(self, file_id: str):
+        """Drop a deleted file's counters (its chunks simply decay away)."""
+        with self._lock:
+            self._files.pop(file_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._chunks.clear()
+            self._files.clear()
+            self._origin = time.monotonic()
+            self._reset_traffic()
+
+    def traffic(self) -> dict:
+        with self._lock:
+            traffic = dict(self._traffic)
+            traffic["node_bytes"] = dict(self._traffic["node_bytes"])
+            return traffic
+
+    def top_files(self, limit: int = 10) -> list:
+        with self._lock:
+            weight = self._weight()
+            ranked = sorted(self._files.items(), key=lambda item: item[1][0], reverse=True)
+            return [
+                {"file_id": file_id, "heat": round(entry[0] / weight, 3), "last_read": entry[1]}
+                for file_id, entry in ranked[:limit]
+            ]
+
+
+access_stats = AccessStats()
@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+import threading
+
+from fs_lite.distributor import REPLICATION_FACTOR
+from fs_lite.node_manager import get_node_statuses, get_free_bytes
+
+# Ingests (uploads, parts, appends, patches) running at once
+MAX_CONCURRENT_INGESTS = 4
+# Ingests allowed to wait for a slot; more than this are turned away at once
+MAX_QUEUED_INGESTS = 16
+# Longest a queued ingest waits for a slot before it is turned away
+QUEUE_TIMEOUT_SECONDS = 10.0
+
+# Retry-After hints
+RETRY_AFTER_BUSY = 2        # slots or reserved space free up as ingests finish
+RETRY_AFTER_FULL = 60       # only deletes / GC can make room
+
+
+class AdmissionRejected(Exception):
+    """An ingest turned away before its body was read."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def placeable_bytes(free: list, replicas: int = REPLICATION_FACTOR) -> int:
+    """
+    Most file bytes that fit when every byte needs `replicas` copies on
+    distinct nodes. With the j largest nodes left out, the rest must
+    still hold (replicas - j) copies of everything.
+    """
+    free = sorted((max(f, 0) for f in free), reverse=True)
+    if len(free) < replicas:
+        return 0
+    total = sum(free)
+    limit = total // replicas
+    for j in range(1, replicas):
+        total -= free[j - 1]
+        limit = min(limit, total // (replicas - j))
+    return limit
+
+
+def _cluster_placeable() -> int:
+    statuses = get_node_statuses()
+    return placeable_bytes([
+        get_free_bytes(node_id)
+        for node_id, status in statuses.items()
+        if status == "ONLINE"
+    ])
+
+
+class AdmissionController:
+    """
+    Gate in front of every ingest: caps concurrent ingests with a bounded
+    queue and reserves the declared size (times the replication factor)
+    before the body is read. Chunks only count as used once they are
+    committed, so a reservation and the space it covers overlap only
+    briefly between commit and release.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = None      # created on first use, inside the event loop
+        self._active = 0
+        self._queued = 0
+        self._reservations = {}     # ticket → reserved file bytes
+        self._tickets = itertools.count(1)
+        self._stats = {
+            "admitted": 0,
+            "rejected_busy": 0,
+            "rejected_full": 0,
+            "rejected_no_length": 0,
+        }
+
+    def _reject(self, stat: str, status_code: int, detail: str, retry_after: int = None):
+        with self._lock:
+            self._stats[stat] += 1
+        print(f"🚦 Ingest rejected ({status_code}): {detail}")
+        raise AdmissionRejected(status_code, detail, retry_after)
+
+    def _reserved(self) -> int:
+        return sum(self._reservations.values())
+
+    async def admit(self, declared_bytes: int) -> int:
+        """
+        Wait for a slot and reserve space. Returns a ticket for release().
+        Raises AdmissionRejected (411 / 429 / 507).
+        """
+        if declared_bytes is None:
+            self._reject("rejected_no_length", 411, "Content-Length is required for uploads")
+
+        # Hopeless even with every in-flight ingest gone — don't queue it
+        if declared_bytes > _cluster_placeable():
+            self._reject(
+                "rejected_full", 507,
+                f"Insufficient storage for {declared_bytes} bytes "
+                f"at replication factor {REPLICATION_FACTOR}",
+                RETRY_AFTER_FULL,
+            )
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(MAX_CONCURRENT_INGESTS)
+
+        if self._slots.locked():
+            with self._lock:
+                if self._queued >= MAX_QUEUED_INGESTS:
+                    full = True
+                else:
+                    full = False
+                    self._queued += 1
+            if full:
+                self._reject("rejected_busy", 429, "Too many uploads in progress", RETRY_AFTER_BUSY)
+            try:
+                await asyncio.wait_for(self._slots.acquire(), QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._reject("rejected_busy", 429, "Timed out waiting for an upload slot", RETRY_AFTER_BUSY)
+            finally:
+                with self._lock:
+                    self._queued -= 1
+        else:
+            await self._slots.acquire()
+
+        placeable = _cluster_placeable()
+        with self._lock:
+            available = placeable - self._reserved()
+            if declared_bytes <= available:
+                ticket = next(self._tickets)
+                self._reservations[ticket] = declared_bytes
+                self._active += 1
+                self._stats["admitted"] += 1
+                return ticket
+
+        self._slots.release()
+        if declared_bytes <= placeable:
+            self._reject(
+                "rejected_busy", 429,
+                "Storage is reserved by uploads in progress", RETRY_AFTER_BUSY,
+            )
+        self._reject(
+            "rejected_full", 507,
+            f"Insufficient storage for {declared_bytes} bytes "
+            f"at replication factor {REPLICATION_FACTOR}",
+            RETRY_AFTER_FULL,
+        )
+
+    def release(self, ticket: int):
+        """The ingest finished (or failed): free its slot and reservation."""
+        with self._lock:
+            if self._reservations.pop(ticket, None) is None:
+                return
+            self._active -= 1
+        self._slots.release()
+
+    def snapshot(self) -> dict:
+        placeable = _cluster_placeable()
+        with self._lock:
+            reserved = self._reserved()
+            return {
+                "config": {
+                    "max_concurrent_ingests": MAX_CONCURRENT_INGESTS,
+                    "max_queued_ingests": MAX_QUEUED_INGESTS,
+                    "queue_timeout_seconds": QUEUE_TIMEOUT_SECONDS,
+                    "replication_factor": REPLICATION_FACTOR,
+                },
+                "active": self._active,
+                "queued": self._queued,
+                "reserved_bytes": reserved,
+                "placeable_bytes": placeable,
+                "available_bytes": max(placeable - reserved, 0),
+                **self._stats,
+            }
+
+
+admission = AdmissionController()
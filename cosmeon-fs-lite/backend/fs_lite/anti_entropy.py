@@ -0,0 +1,139 @@
+from fs_lite.merkle import NodeDigest, bucket_of, diverging_buckets
+from fs_lite.metadata_store import (
+    list_compact_manifests,
+    list_archived_compact,
+    metadata_signature,
+)
+from fs_lite.node_manager import (
+    NODE_IDS,
+    get_node_statuses,
+    get_node_digest_levels,
+    get_node_chunks,
+)
+
+
+# Expected placements and digests, rebuilt only when metadata changes.
+# Shared between passes: read-only.
+_expected_cache = {"signature": None, "placements": None, "digests": None}
+
+
+def _expected_state() -> tuple:
+    """(placements, node_id → expected digest levels), cached per metadata signature."""
+    signature = metadata_signature()
+    if _expected_cache["signature"] != signature:
+        placements = _expected_placements()
+        digests = {}
+        for node_id, chunks in placements.items():
+            digest = NodeDigest()
+            for chunk_id, (size, _) in chunks.items():
+                digest.toggle(chunk_id, size)
+            digests[node_id] = digest.levels()
+        _expected_cache.update(signature=signature, placements=placements, digests=digests)
+    return _expected_cache["placements"], _expected_cache["digests"]
+
+
+def expected_placements() -> dict:
+    """
+    node_id → {chunk_id: (size, file_id)}: every copy that current or
+    archived manifests (read replicas included) place on a node. Cached
+    until metadata changes; treat as read-only.
+    """
+    return _expected_state()[0]
+
+
+def _expected_placements() -> dict:
+    """
+    node_id → {chunk_id: (size, file_id)} according to metadata.
+    Chunks only referenced by archived versions, and hot-file read
+    replicas, map to file_id None: they are expected on disk but are not
+    repaired.
+    """
+    expected = {node_id: {} for node_id in NODE_IDS}
+    for manifests, live in ((list_archived_compact(), False), (list_compact_manifests(), True)):
+        for manifest in manifests:
+            file_id = manifest.header["file_id"] if live else None
+            read_replicas = manifest.header.get("read_replicas", {})
+            for chunk_id, size, primary_node, replica_node in manifest.iter_placements():
+                for node_id in (primary_node, replica_node):
+                    if node_id in expected:
+                        expected[node_id][chunk_id] = (size, file_id)
+                # Extra copies for hot files: expected, but never repaired
+                read_replica = read_replicas.get(chunk_id)
+                if read_replica in expected and chunk_id not in expected[read_replica]:
+                    expected[read_replica][chunk_id] = (size, None)
+    return expected
+
+
+def find_divergence() -> dict:
+    """
+    Compare what metadata says each node should hold with the node's
+    rolled-up digest, top-down. Only buckets whose digests differ are
+    listed and compared entry by entry; no chunk data is read.
+
+    - missing: expected on the node but absent (or wrong size)
+    - unexpected: present on the node but not placed there by metadata
+    Chunks placed on OFFLINE nodes count as unavailable. SUSPECT nodes are
+    skipped: their chunks are not repaired until the node is declared
+    OFFLINE.
+    """
+    statuses = get_node_statuses()
+    expected, expected_digests = _expected_state()
+
+    nodes = {}
+    affected_files = set()
+    tree_nodes_compared = 0
+
+    for node_id in NODE_IDS:
+        if statuses.get(node_id) == "SUSPECT":
+            nodes[node_id] = {"status": "SUSPECT"}
+            continue
+
+        if statuses.get(node_id) != "ONLINE":
+            unavailable = expected[node_id]
+            affected_files.update(
+                file_id for _, file_id in unavailable.values() if file_id
+            )
+            nodes[node_id] = {
+                "status": statuses.get(node_id),
+                "unavailable_chunks": len(unavailable),
+            }
+            continue
+
+        buckets, compared = diverging_buckets(
+            expected_digests[node_id],
+            get_node_digest_levels(node_id)
+        )
+        tree_nodes_compared += compared
+
+        missing = []
+        unexpected = []
+        if buckets:
+            bucket_set = set(buckets)
+            actual = get_node_chunks(node_id, bucket_set)
+            wanted = {
+                chunk_id: entry
+                for chunk_id, entry in expected[node_id].items()
+                if bucket_of(chunk_id) in bucket_set
+            }
+            for chunk_id, (size, file_id) in wanted.items():
+                if actual.get(chunk_id) != size:
+                    missing.append(chunk_id)
+                    if file_id:
+                        affected_files.add(file_id)
+            unexpected = [c for c in actual if c not in wanted]
+
+        nodes[node_id] = {
+            "status": "ONLINE",
+            "diverging_buckets": len(buckets),
+            "missing_chunks": missing,
+            "unexpected_chunks": unexpected,
+        }
+
+    return {
+        "in_sync": not affected_files and all(
+            not n.get("unexpected_chunks") for n in nodes.values()
+        ),
+        "affected_files": sorted(affected_files),
+        "tree_nodes_compared": tree_nodes_compared,
+        "nodes": nodes,
+    }
@@ -0,0 +1,243 @@
+import os
+import time
+import uuid
+import tarfile
+import zipfile
+
+from fs_lite.chunk_engine import split_stream
+from fs_lite.distributor import distribute_batch
+from fs_lite.hashing import DEFAULT_CHECKSUM_POLICY, parse_checksum_policy, sha256_hex
+from fs_lite.intent_log import begin_upload, seal_upload, commit_upload, abort_upload
+from fs_lite.metadata_store import save_manifests, get_manifest, list_manifests
+from fs_lite.reconstruct import _fetch_chunk
+from fs_lite.access_stats import access_stats
+
+ARCHIVE_FORMATS = ("tar", "zip")
+
+# Member files are placed and written in batches of at most this many
+# bytes / files, which bounds the chunk data held in memory
+BULK_BATCH_BYTES = 8 * 1024 * 1024
+BULK_BATCH_FILES = 256
+
+
+# ─────────────────────────────────────────────────────────
+# INGEST
+# ─────────────────────────────────────────────────────────
+
+def detect_archive_format(stream) -> str:
+    """'zip' or 'tar' from the leading bytes (the stream must be seekable)."""
+    magic = stream.read(4)
+    stream.seek(0)
+    return "zip" if magic in (b"PK\x03\x04", b"PK\x05\x06") else "tar"
+
+
+def _members(stream, archive_format: str):
+    """
+    (name, file object) per archive member, in archive order; the file
+    object is None for anything that isn't a regular file. Tar (plain or
+    compressed) is read as a stream; zip needs its central directory.
+    """
+    if archive_format == "zip":
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    yield info.filename, None
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, member
+    else:
+        with tarfile.open(fileobj=stream, mode="r|*") as archive:
+            for info in archive:
+                yield info.name, archive.extractfile(info) if info.isfile() else None
+
+
+def ingest_archive(stream, archive_format: str = None, checksum: str = DEFAULT_CHECKSUM_POLICY) -> dict:
+    """
+    Ingest every regular file in a tar or zip stream in one pass.
+    Members are chunked straight from the archive and written in batches
+    (one node snapshot and one group commit per batch) under a single
+    upload intent; all manifests are then saved in one metadata commit.
+    Atomic: either every member becomes a file or none does.
+    """
+    parse_checksum_policy(checksum)
+    archive_format = archive_format or detect_archive_format(stream)
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {archive_format}. Available: {list(ARCHIVE_FORMATS)}")
+
+    started = time.time()
+    bulk_id = f"bulk_{uuid.uuid4().hex[:8]}"
+    begin_upload({"file_id": bulk_id}, kind="bulk")
+
+    ingested = []
+    batch = []
+    batch_bytes = 0
+    batches = 0
+    skipped = 0
+
+    try:
+        for name, member in _members(stream, archive_format):
+            file_name = os.path.basename(name.rstrip("/"))
+            if member is None or not file_name:
+                skipped += 1
+                continue
+
+            manifest = split_stream(member, file_name, checksum=checksum, verbose=False)
+            batch.append(manifest)
+            batch_bytes += manifest["file_size"]
+
+            if len(batch) >= BULK_BATCH_FILES or batch_bytes >= BULK_BATCH_BYTES:
+                ingested += distribute_batch(batch, bulk_id)
+                batches += 1
+                batch, batch_bytes = [], 0
+
+        if batch:
+            ingested += distribute_batch(batch, bulk_id)
+            batches += 1
+
+        if not ingested:
+            raise ValueError("Archive contains no files")
+
+        # All chunk data is durable — from here recovery rolls forward
+        seal_upload(bulk_id)
+        save_manifests(ingested)
+
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        abort_upload(bulk_id)
+        raise ValueError(f"Unreadable {archive_format} archive: {e}")
+    except Exception:
+        print(f"❌ Bulk ingest {bulk_id} failed — rolling back")
+        abort_upload(bulk_id)
+        raise
+
+    commit_upload(bulk_id)
+
+    total_bytes = sum(m["file_size"] for m in ingested)
+    duration = time.time() - started
+    print(
+        f"📦 Bulk ingest {bulk_id}: {len(ingested)} files, "
+        f"{total_bytes / 1024:.1f} KB in {batches} batches ({duration:.2f}s)"
+    )
+    return {
+        "bulk_id": bulk_id,
+        "files_ingested": len(ingested),
+        "bytes_ingested": total_bytes,
+        "skipped_members": skipped,
+        "batches": batches,
+        "duration_seconds": round(duration, 3),
+        "files": [
+            {
+                "file_id": m["file_id"],
+                "file_name": m["file_name"],
+                "file_size": m["file_size"],
+                "total_chunks": m["total_chunks"],
+            }
+            for m in ingested
+        ],
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# EXPORT
+# ─────────────────────────────────────────────────────────
+
+class _Sink:
+    """Write-only buffer that zipfile streams into; drained after each write."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _file_bytes(manifest: dict):
+    """A file's chunks straight from the nodes, each checked against its hash."""
+    chunks = sorted(manifest["chunks"], key=lambda c: c["index"])
+    read_replicas = manifest.get("read_replicas", {})
+    access_stats.record_read(manifest["file_id"], [c["id"] for c in chunks])
+    for chunk in chunks:
+        data = _fetch_chunk(
+            chunk["id"], chunk["primary_node"], chunk["replica_node"],
+            read_replicas.get(chunk["id"]),
+        )
+        if data is None:
+            raise RuntimeError(f"Chunk {chunk['id']} unavailable on both nodes")
+        if sha256_hex(data) != chunk["hash"]:
+            raise RuntimeError(f"Chunk {chunk['id']} failed integrity check")
+        yield data
+
+
+def _archive_names(manifests: list) -> list:
+    """Member names: the file name, prefixed with the file ID if taken."""
+    names = []
+    seen = set()
+    for manifest in manifests:
+        name = manifest["file_name"]
+        if name in seen:
+            name = f"{manifest['file_id']}_{name}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _stream_tar(manifests: list, names: list):
+    mtime = int(time.time())
+    for manifest, name in zip(manifests, names):
+        info = tarfile.TarInfo(name)
+        info.size = manifest["file_size"]
+        info.mtime = mtime
+        info.mode = 0o644
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        yield from _file_bytes(manifest)
+        padding = -manifest["file_size"] % tarfile.BLOCKSIZE
+        if padding:
+            yield tarfile.NUL * padding
+    # End-of-archive marker: two zero blocks
+    yield tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+
+
+def _stream_zip(manifests: list, names: list):
+    sink = _Sink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for manifest, name in zip(manifests, names):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.file_size = manifest["file_size"]
+            with archive.open(info, "w") as member:
+                for data in _file_bytes(manifest):
+                    member.write(data)
+                    yield sink.take()
+            yield sink.take()
+    # Central directory, written on close
+    yield sink.take()
+
+
+def export_archive(file_ids: list = None, archive_format: str = "tar"):
+    """
+    Stream many files back as one tar or zip, chunk by chunk from the
+    nodes — nothing is reassembled on disk. file_ids defaults to every
+    file. Unknown IDs raise ValueError before anything is sent; a chunk
+    that can't be read mid-stream aborts the response.
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unsupported archive format: {archive_format}. Available: {list(ARCHIVE_FORMATS)}")
+    if file_ids is None:
+        # One snapshot: a file deleted meanwhile is simply not exported
+        manifests = list_manifests()
+    else:
+        manifests = [get_manifest(file_id) for file_id in file_ids]
+    names = _archive_names(manifests)
+    print(f"📦 Bulk export: {len(manifests)} files as {archive_format}")
+
+    if archive_format == "zip":
+        return _stream_zip(manifests, names)
+    return _stream_tar(manifests, names)
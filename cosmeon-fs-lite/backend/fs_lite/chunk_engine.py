@@ -3,45 +3,93 @@ import hashlib
 import uuid
 import json
 
+from fs_lite.hashing import (
+    DEFAULT_CHECKSUM_POLICY,
+    StreamHasher,
+    checksum_info,
+    get_hash_pool,
+    hash_chunk,
+    parse_checksum_policy,
+)
+from fs_lite.merkle import merkle_root
+
 CHUNK_SIZE = 512 * 1024  # 512KB default
 
-def split_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> dict:
+def split_file(
+    file_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    file_id: str = None,
+    checksum: str = DEFAULT_CHECKSUM_POLICY,
+) -> dict:
     """
     Takes a file path, splits it into chunks, hashes each chunk,
     and returns a manifest dictionary describing the file.
+    Chunk IDs are derived from file_id (generated if not given).
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    file_name = os.path.basename(file_path)
-    file_id = str(uuid.uuid4())[:8]  # short unique ID e.g. "a3f9c1b2"
-    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        return split_stream(
+            f,
+            os.path.basename(file_path),
+            chunk_size=chunk_size,
+            file_id=file_id,
+            checksum=checksum,
+        )
+
+
+def split_stream(
+    stream,
+    file_name: str,
+    chunk_size: int = CHUNK_SIZE,
+    file_id: str = None,
+    checksum: str = DEFAULT_CHECKSUM_POLICY,
+    verbose: bool = True,
+) -> dict:
+    """
+    Splits a binary stream into chunks and returns its manifest.
+
+    Hashing is pipelined with reading: each chunk's SHA-256 (and optional
+    fast checksum, per the checksum policy) is computed on the hash pool,
+    and the full-file SHA-256 on a dedicated thread, while the next chunk
+    is being read.
+    """
+    fast_algorithm = parse_checksum_policy(checksum)
+    file_id = file_id or str(uuid.uuid4())[:8]  # short unique ID e.g. "a3f9c1b2"
+
+    pool = get_hash_pool()
+    full_hash = StreamHasher()
 
     chunks = []
-    full_hash = hashlib.sha256()
+    pending = []
 
-    with open(file_path, "rb") as f:
-        index = 0
-        while True:
-            data = f.read(chunk_size)
-            if not data:
-                break
-
-            # Hash this individual chunk
-            chunk_hash = hashlib.sha256(data).hexdigest()
-
-            # Also feed into full file hash
-            full_hash.update(data)
-
-            chunk_info = {
-                "id": f"{file_id}_{index}",
-                "index": index,
-                "size": len(data),
-                "hash": chunk_hash,
-                "data": data  # raw bytes, used during distribution
-            }
-            chunks.append(chunk_info)
-            index += 1
+    index = 0
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+
+        # Full file hash on its own thread, chunk hash on the pool
+        full_hash.feed(data)
+        pending.append(pool.submit(hash_chunk, data, fast_algorithm))
+
+        chunk_info = {
+            "id": f"{file_id}_{index}",
+            "index": index,
+            "size": len(data),
+            "hash": None,  # filled in once the pool finishes
+            "data": data  # raw bytes, used during distribution
+        }
+        chunks.append(chunk_info)
+        index += 1
+
+    for chunk_info, future in zip(chunks, pending):
+        chunk_info["hash"], fast = future.result()
+        if fast_algorithm:
+            chunk_info["fast_hash"] = fast
+
+    file_size = sum(c["size"] for c in chunks)
 
     manifest = {
         "file_id": file_id,
@@ -50,13 +98,27 @@ def split_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> dict:
         "total_chunks": len(chunks),
         "chunk_size": chunk_size,
         "full_hash": full_hash.hexdigest(),
+        "checksums": checksum_info(fast_algorithm),
+        "merkle_root": merkle_root([c["hash"] for c in chunks]),
         "chunks": chunks
     }
 
-    print(f"\n✅ File split complete!")
-    print(f"   File     : {file_name}")
-    print(f"   Size     : {file_size / 1024:.1f} KB")
-    print(f"   Chunks   : {len(chunks)}")
-    print(f"   Hash     : {manifest['full_hash'][:16]}...")
+    if verbose:
+        print(f"\n✅ File split complete!")
+        print(f"   File     : {file_name}")
+        print(f"   Size     : {file_size / 1024:.1f} KB")
+        print(f"   Chunks   : {len(chunks)}")
+        print(f"   Hash     : {manifest['full_hash'][:16]}...")
 
-    return manifest
\ No newline at end of file
+    return manifest
+
+
+def composite_hash(part_hashes: list) -> str:
+    """
+    S3-style multipart hash: SHA-256 over the concatenated part digests,
+    suffixed with the part count. Computable from part manifests alone.
+    """
+    h = hashlib.sha256()
+    for part_hash in part_hashes:
+        h.update(bytes.fromhex(part_hash))
+    return f"{h.hexdigest()}-{len(part_hashes)}"
@@ -0,0 +1,307 @@
+import re
+import copy
+import base64
+import bisect
+from array import array
+
+from fs_lite.merkle import build_tree
+
+# Chunk IDs look like "<prefix><number><suffix>": "a3f9c1b2_17",
+# "a3f9c1b2_p2_9c01aa_4" (multipart), "a3f9c1b2_17_v3" (patched).
+# Consecutive chunks whose numbers count up share one run.
+_ID_PATTERN = re.compile(r"^(.*_)(\d+)((?:_v\d+)?)$")
+
+# Version of the packed chunk table stored in metadata.json
+TABLE_FORMAT = 1
+
+NO_NODE = -1
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text.encode("ascii"))
+
+
+class CompactManifest:
+    """
+    A manifest whose chunk table is packed instead of one dict per chunk:
+    - SHA-256 hashes in one buffer, 32 bytes per chunk
+    - fast checksums (if any) in one buffer, fixed width per chunk; chunks
+      without one are listed sparsely
+    - primary / replica as small-int arrays into a per-manifest node list
+    - sizes implied by chunk_size, with exceptions stored sparsely
+    - chunk IDs as runs of "<prefix><n><suffix>"
+    - the Merkle tree's interior nodes, 32 bytes each, so a partial update
+      rehashes only the changed paths
+    File-level fields stay a plain dict in `header`. Dicts are only built
+    by to_dict() / chunk(), e.g. for API output.
+    """
+
+    __slots__ = (
+        "header", "count", "hashes", "fast_hashes", "fast_width", "fast_missing",
+        "node_names", "primary", "replica", "size_overrides",
+        "run_starts", "runs", "tree",
+    )
+
+    def __init__(self, header: dict):
+        self.header = header
+        self.count = 0
+        self.hashes = bytearray()
+        self.fast_hashes = None
+        self.fast_width = 0
+        self.fast_missing = set()   # indices with no fast checksum, once fast_hashes exists
+        self.node_names = []
+        self.primary = array("b")
+        self.replica = array("b")
+        self.size_overrides = {}
+        self.run_starts = []
+        self.runs = []          # (prefix, first_number, suffix) or (chunk_id, None, None)
+        self.tree = None        # interior Merkle levels above the leaves, packed; None if not stored
+
+    # ── construction ─────────────────────────────────────
+
+    @classmethod
+    def from_dict(cls, manifest: dict) -> "CompactManifest":
+        header = {k: v for k, v in manifest.items() if k != "chunks"}
+        compact = cls(header)
+        for chunk in sorted(manifest["chunks"], key=lambda c: c["index"]):
+            compact._append(chunk)
+        return compact
+
+    def _node_index(self, node_id: str) -> int:
+        if not node_id:
+            return NO_NODE
+        try:
+            return self.node_names.index(node_id)
+        except ValueError:
+            self.node_names.append(node_id)
+            return len(self.node_names) - 1
+
+    def _append(self, chunk: dict):
+        index = self.count
+
+        self.hashes += bytes.fromhex(chunk["hash"])
+
+        fast = chunk.get("fast_hash")
+        if fast is not None:
+            if self.fast_hashes is None:
+                self.fast_width = len(fast) // 2
+                self.fast_hashes = bytearray(self.fast_width * index)
+                self.fast_missing = set(range(index))
+            self.fast_hashes += bytes.fromhex(fast)
+        elif self.fast_hashes is not None:
+            self.fast_hashes += bytes(self.fast_width)
+            self.fast_missing.add(index)
+
+        self.primary.append(self._node_index(chunk.get("primary_node", "")))
+        self.replica.append(self._node_index(chunk.get("replica_node", "")))
+
+        if chunk["size"] != self.header["chunk_size"]:
+            self.size_overrides[index] = chunk["size"]
+
+        self._append_id(index, chunk["id"])
+        self.count += 1
+
+    def _append_id(self, index: int, chunk_id: str):
+        match = _ID_PATTERN.match(chunk_id)
+        if match and self.runs:
+            prefix, number, suffix = match.group(1), int(match.group(2)), match.group(3)
+            last_prefix, last_first, last_suffix = self.runs[-1]
+            if (
+                last_first is not None
+                and last_prefix == prefix
+                and last_suffix == suffix
+                and last_first + (index - self.run_starts[-1]) == number
+            ):
+                return  # continues the current run
+        self.run_starts.append(index)
+        if match:
+            self.runs.append((match.group(1), int(match.group(2)), match.group(3)))
+        else:
+            self.runs.append((chunk_id, None, None))
+
+    # ── chunk access ─────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _check(self, index: int):
+        if not 0 <= index < self.count:
+            raise IndexError(f"Chunk index out of range: {index}")
+
+    def chunk_id(self, index: int) -> str:
+        self._check(index)
+        run = bisect.bisect_right(self.run_starts, index) - 1
+        prefix, first, suffix = self.runs[run]
+        if first is None:
+            return prefix
+        return f"{prefix}{first + index - self.run_starts[run]}{suffix}"
+
+    def chunk_hash(self, index: int) -> str:
+        self._check(index)
+        return self.hashes[index * 32:(index + 1) * 32].hex()
+
+    def chunk_size(self, index: int) -> int:
+        self._check(index)
+        return self.size_overrides.get(index, self.header["chunk_size"])
+
+    def placement(self, index: int) -> tuple:
+        self._check(index)
+        return self._node_name(self.primary[index]), self._node_name(self.replica[index])
+
+    def _node_name(self, node_index: int) -> str:
+        return "" if node_index == NO_NODE else self.node_names[node_index]
+
+    def set_placement(self, index: int, primary_node: str, replica_node: str):
+        self._check(index)
+        self.primary[index] = self._node_index(primary_node)
+        self.replica[index] = self._node_index(replica_node)
+
+    def chunk_hashes(self) -> list:
+        """All chunk hashes as hex, in order (Merkle leaves)."""
+        return [self.hashes[i:i + 32].hex() for i in range(0, len(self.hashes), 32)]
+
+    def _level_sizes(self) -> list:
+        sizes = [max(self.count, 1)]
+        while sizes[-1] > 1:
+            sizes.append((sizes[-1] + 1) // 2)
+        return sizes
+
+    def merkle_levels(self) -> list:
+        """
+        Merkle tree over the chunk hashes (leaves first, root last). Read
+        from the stored interior nodes; built from the hashes if there are
+        none (older records).
+        """
+        sizes = self._level_sizes()
+        if self.count == 0 or self.tree is None or len(self.tree) != 32 * sum(sizes[1:]):
+            return build_tree(self.chunk_hashes())
+        levels = [self.chunk_hashes()]
+        offset = 0
+        for size in sizes[1:]:
+            levels.append([
+                self.tree[offset + 32 * i:offset + 32 * (i + 1)].hex()
+                for i in range(size)
+            ])
+            offset += 32 * size
+        return levels
+
+    def set_merkle_levels(self, levels: list):
+        """Store a tree computed over this manifest's chunk hashes."""
+        self.tree = bytearray(b"".join(
+            bytes.fromhex(node) for level in levels[1:] for node in level
+        ))
+
+    def iter_chunk_ids(self):
+        for run, start in enumerate(self.run_starts):
+            end = self.run_starts[run + 1] if run + 1 < len(self.runs) else self.count
+            prefix, first, suffix = self.runs[run]
+            if first is None:
+                yield prefix
+                continue
+            for n in range(first, first + end - start):
+                yield f"{prefix}{n}{suffix}"
+
+    def iter_placements(self):
+        """(chunk_id, size, primary_node, replica_node) per chunk, no dicts."""
+        default_size = self.header["chunk_size"]
+        names = self.node_names + [""]  # index -1 → ""
+        for index, chunk_id in enumerate(self.iter_chunk_ids()):
+            yield (
+                chunk_id,
+                self.size_overrides.get(index, default_size),
+                names[self.primary[index]],
+                names[self.replica[index]],
+            )
+
+    def chunk(self, index: int) -> dict:
+        primary_node, replica_node = self.placement(index)
+        chunk = {
+            "id": self.chunk_id(index),
+            "index": index,
+            "size": self.chunk_size(index),
+            "hash": self.chunk_hash(index),
+            "primary_node": primary_node,
+            "replica_node": replica_node,
+        }
+        if self.fast_hashes is not None and index not in self.fast_missing:
+            w = self.fast_width
+            chunk["fast_hash"] = self.fast_hashes[index * w:(index + 1) * w].hex()
+        return chunk
+
+    def to_dict(self) -> dict:
+        """
+        The plain manifest. Everything is a fresh copy, nested header
+        fields (parts, checksums, read_replicas) included, so the caller
+        can modify it without touching the cached manifest.
+        """
+        manifest = copy.deepcopy(self.header)
+        manifest["chunks"] = [self.chunk(i) for i in range(self.count)]
+        return manifest
+
+    # ── persistence ──────────────────────────────────────
+
+    def to_record(self) -> dict:
+        """JSON-able form for metadata.json: header plus a packed chunk table."""
+        record = dict(self.header)
+        record["chunk_table"] = {
+            "format": TABLE_FORMAT,
+            "count": self.count,
+            "hashes": _b64(bytes(self.hashes)),
+            "fast_hashes": _b64(bytes(self.fast_hashes)) if self.fast_hashes is not None else None,
+            "fast_width": self.fast_width,
+            "fast_missing": sorted(self.fast_missing),
+            "nodes": self.node_names,
+            "primary": _b64(self.primary.tobytes()),
+            "replica": _b64(self.replica.tobytes()),
+            "sizes": {str(i): size for i, size in self.size_overrides.items()},
+            "ids": [
+                [start, prefix, first, suffix]
+                for start, (prefix, first, suffix) in zip(self.run_starts, self.runs)
+            ],
+            "tree": _b64(bytes(self.tree)) if self.tree is not None else None,
+        }
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "CompactManifest":
+        """Load a stored manifest — packed, or the older list-of-dicts form."""
+        if "chunk_table" not in record:
+            return cls.from_dict(record)
+
+        table = record["chunk_table"]
+        if table.get("format") != TABLE_FORMAT:
+            raise ValueError(f"Unsupported chunk table format: {table.get('format')}")
+
+        compact = cls({k: v for k, v in record.items() if k != "chunk_table"})
+        compact.count = table["count"]
+        compact.hashes = bytearray(_unb64(table["hashes"]))
+        if table["fast_hashes"] is not None:
+            compact.fast_hashes = bytearray(_unb64(table["fast_hashes"]))
+            compact.fast_width = table["fast_width"]
+            compact.fast_missing = set(table.get("fast_missing", []))
+        compact.node_names = list(table["nodes"])
+        compact.primary = array("b", _unb64(table["primary"]))
+        compact.replica = array("b", _unb64(table["replica"]))
+        compact.size_overrides = {int(i): size for i, size in table["sizes"].items()}
+        compact.run_starts = [run[0] for run in table["ids"]]
+        compact.runs = [tuple(run[1:]) for run in table["ids"]]
+        if table.get("tree") is not None:
+            compact.tree = bytearray(_unb64(table["tree"]))
+        return compact
+
+    def nbytes(self) -> int:
+        """Approximate size of the packed chunk table in bytes."""
+        return (
+            len(self.hashes)
+            + (len(self.fast_hashes) if self.fast_hashes is not None else 0)
+            + self.primary.itemsize * len(self.primary)
+            + self.replica.itemsize * len(self.replica)
+            + 64 * len(self.size_overrides)
+            + 32 * len(self.fast_missing)
+            + 96 * len(self.runs)
+            + (len(self.tree) if self.tree is not None else 0)
+        )
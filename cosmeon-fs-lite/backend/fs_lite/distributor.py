@@ -1,19 +1,68 @@
 import random
-import os
 from fs_lite.node_manager import (
     get_online_nodes,
-    write_chunk_to_node,
+    stage_chunk_on_node,
+    commit_staged_chunks,
+    delete_chunk_from_node,
     has_capacity,
 )
+from fs_lite.intent_log import (
+    begin_upload,
+    record_file,
+    record_chunk,
+    intent_file,
+    seal_upload,
+    abort_upload,
+)
 
 REPLICATION_FACTOR = 2
 
 
-def distribute_chunks(manifest: dict) -> dict:
+def _choose_nodes(online_nodes: list, chunk_size: int, pending_bytes: dict, pending_chunks: dict) -> tuple:
+    """
+    (primary, replica) for one chunk: least loaded primary, random replica,
+    both with room for it on top of what this upload has staged already.
+    """
+    eligible_nodes = [
+        n for n in online_nodes
+        if has_capacity(
+            n["node_id"],
+            chunk_size + pending_bytes.get(n["node_id"], 0)
+        )
+    ]
+
+    if len(eligible_nodes) < REPLICATION_FACTOR:
+        raise RuntimeError(
+            "Not enough node capacity to satisfy replication factor!"
+        )
+
+    # Least loaded primary
+    sorted_nodes = sorted(
+        eligible_nodes,
+        key=lambda n: n["chunk_count"] + pending_chunks.get(n["node_id"], 0)
+    )
+
+    primary_node = sorted_nodes[0]["node_id"]
+
+    remaining_nodes = [
+        n["node_id"]
+        for n in sorted_nodes
+        if n["node_id"] != primary_node
+    ]
+
+    replica_node = random.choice(remaining_nodes)
+    return primary_node, replica_node
+
+
+def distribute_chunks(manifest: dict, intent_kind: str = "file", intent_owner: dict = None) -> dict:
     """
     Capacity-aware, load-aware distribution.
     Fully atomic:
     - If any failure occurs, all written chunks are rolled back.
+    Crash-consistent:
+    - Every placement is logged to the upload intent before it is written
+    - Chunks are staged as temp files and published together in one
+      group commit, so a crash leaves nothing recovery can't clean up
     """
 
     print(f"\n📡 Distributing {manifest['total_chunks']} chunks...")
@@ -22,47 +71,38 @@ def distribute_chunks(manifest: dict) -> dict:
     print(f"   Atomic upload enabled\n")
 
     written_chunks = []  # Track (node_id, chunk_id) for rollback
+    staged_entries = []  # (tmp_path, final_path) awaiting group commit
+    pending_bytes = {}   # Staged chunks are not on disk yet — count them here
+    pending_chunks = {}
+
+    begin_upload(manifest, kind=intent_kind, owner=intent_owner)
 
     try:
         for i, chunk in enumerate(manifest["chunks"]):
             chunk_size = chunk["size"]
 
-            online_nodes = get_online_nodes()
-
-            eligible_nodes = [
-                n for n in online_nodes
-                if has_capacity(n["node_id"], chunk_size)
-            ]
-
-            if len(eligible_nodes) < REPLICATION_FACTOR:
-                raise RuntimeError(
-                    "Not enough node capacity to satisfy replication factor!"
-                )
-
-            # Least loaded primary
-            sorted_nodes = sorted(
-                eligible_nodes,
-                key=lambda n: n["chunk_count"]
+            primary_node, replica_node = _choose_nodes(
+                get_online_nodes(), chunk_size, pending_bytes, pending_chunks
             )
 
-            primary_node = sorted_nodes[0]["node_id"]
-
-            remaining_nodes = [
-                n["node_id"]
-                for n in sorted_nodes
-                if n["node_id"] != primary_node
-            ]
-
-            replica_node = random.choice(remaining_nodes)
+            record_chunk(manifest["file_id"], chunk, [primary_node, replica_node])
 
             # Write primary
-            write_chunk_to_node(primary_node, chunk["id"], chunk["data"])
+            staged_entries.append(
+                stage_chunk_on_node(primary_node, chunk["id"], chunk["data"])
+            )
             written_chunks.append((primary_node, chunk["id"]))
 
             # Write replica
-            write_chunk_to_node(replica_node, chunk["id"], chunk["data"])
+            staged_entries.append(
+                stage_chunk_on_node(replica_node, chunk["id"], chunk["data"])
+            )
             written_chunks.append((replica_node, chunk["id"]))
 
+            for node_id in (primary_node, replica_node):
+                pending_bytes[node_id] = pending_bytes.get(node_id, 0) + chunk_size
+                pending_chunks[node_id] = pending_chunks.get(node_id, 0) + 1
+
             manifest["chunks"][i]["primary_node"] = primary_node
             manifest["chunks"][i]["replica_node"] = replica_node
 
@@ -71,6 +111,11 @@ def distribute_chunks(manifest: dict) -> dict:
                 f"Primary: {primary_node} | Replica: {replica_node}"
             )
 
+        # Intent log + all chunk data durable in one batch, then published
+        staged_entries.append((intent_file(manifest["file_id"]), None))
+        commit_staged_chunks(staged_entries)
+        seal_upload(manifest["file_id"])
+
         print("\n🛰️  Smart capacity-aware distribution complete!")
         return manifest
 
@@ -81,16 +126,52 @@ def distribute_chunks(manifest: dict) -> dict:
         # Rollback all writes for this upload attempt
         for node_id, chunk_id in written_chunks:
             try:
-                chunk_path = os.path.join(
-                    os.path.dirname(os.path.dirname(__file__)),
-                    "nodes",
-                    node_id,
-                    chunk_id
-                )
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
+                delete_chunk_from_node(node_id, chunk_id)
             except Exception:
                 pass
+        abort_upload(manifest["file_id"])
 
         print("✅ Rollback complete. System state restored.\n")
-        raise e
\ No newline at end of file
+        raise e
+
+def distribute_batch(manifests: list, upload_key: str) -> list:
+    """
+    Place and write the chunks of many small files together (bulk ingest).
+    The online node list is read once for the batch, every placement goes
+    to the single intent `upload_key` (opened by the caller with
+    kind="bulk"), and all chunk data is published in one group commit.
+    Chunk bytes are dropped from the manifests once committed.
+    On failure, nothing is rolled back here — the caller aborts the whole
+    intent, which also covers earlier batches.
+    """
+    online_nodes = get_online_nodes()
+    staged_entries = []
+    pending_bytes = {}
+    pending_chunks = {}
+
+    for manifest in manifests:
+        record_file(upload_key, manifest)
+        for chunk in manifest["chunks"]:
+            primary_node, replica_node = _choose_nodes(
+                online_nodes, chunk["size"], pending_bytes, pending_chunks
+            )
+            record_chunk(
+                upload_key, chunk, [primary_node, replica_node],
+                file_id=manifest["file_id"],
+            )
+            for node_id in (primary_node, replica_node):
+                staged_entries.append(
+                    stage_chunk_on_node(node_id, chunk["id"], chunk["data"])
+                )
+                pending_bytes[node_id] = pending_bytes.get(node_id, 0) + chunk["size"]
+                pending_chunks[node_id] = pending_chunks.get(node_id, 0) + 1
+            chunk["primary_node"] = primary_node
+            chunk["replica_node"] = replica_node
+
+    staged_entries.append((intent_file(upload_key), None))
+    commit_staged_chunks(staged_entries)
+
+    for manifest in manifests:
+        for chunk in manifest["chunks"]:
+            chunk.pop("data", None)
+    return manifests
@@ -0,0 +1,214 @@
+import os
+import sys
+import ctypes
+import threading
+import time
+
+# How long a group-commit leader waits for other writers to join its batch
+GROUP_COMMIT_WINDOW = 0.002  # seconds
+
+TEMP_SUFFIX = ".tmp"
+
+
+def _load_syncfs():
+    """libc syncfs(2) on Linux, None elsewhere."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return None
+
+
+_syncfs = _load_syncfs()
+
+
+def temp_path_for(final_path: str) -> str:
+    """
+    Hidden sibling path used while a file is being written.
+    Dot-prefixed so node listings and capacity accounting ignore it.
+    """
+    directory, name = os.path.split(final_path)
+    return os.path.join(directory, f".{name}{TEMP_SUFFIX}")
+
+
+def fsync_dir(dir_path: str, strict: bool = False):
+    """
+    Persist directory entries (renames/unlinks). Best effort by default;
+    with strict, a failed sync raises OSError. Windows can't sync a
+    directory, so it's always a no-op there.
+    """
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        if strict:
+            raise
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        if strict:
+            raise
+    finally:
+        os.close(fd)
+
+
+def sync_filesystem(path: str):
+    """
+    Flush everything dirty on the filesystem holding path with one
+    syncfs(2). Raises OSError on failure — since Linux 5.8 that includes
+    writeback errors of any file on it.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if _syncfs(fd) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Crash-safe single file write: temp file → fsync → rename → fsync dir.
+    Readers see either the old file or the new one, never a torn write.
+    """
+    tmp_path = temp_path_for(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+class _Batch:
+    def __init__(self):
+        self.entries = []   # (tmp_path, final_path or None)
+        self.failed = {}    # tmp_path -> exception
+        self.done = threading.Event()
+
+
+class GroupCommitter:
+    """
+    Coalesces durability work from concurrent writers.
+
+    Each writer stages data in a temp file and calls commit(). The first
+    caller of a batch becomes its leader: it waits GROUP_COMMIT_WINDOW for
+    others to join, then makes the staged data durable with one syncfs per
+    filesystem (per-file fsync where syncfs isn't available), renames the
+    files into place, and syncs each touched directory once. Followers
+    just wait for their batch to finish. Any sync error fails the entries
+    it covers.
+
+    syncfs also flushes unrelated dirty data on the same filesystem; with
+    chunks batched that is still far fewer device flushes than one fsync
+    per chunk (see benchmarks/group_commit.py).
+    """
+
+    def __init__(self, window: float = GROUP_COMMIT_WINDOW, batch_sync: bool = None):
+        self.window = window
+        # None: syncfs when the platform has it
+        self.batch_sync = _syncfs is not None if batch_sync is None else batch_sync
+        self._lock = threading.Lock()
+        self._batch = _Batch()
+        self._leader_active = False
+        self.batches_committed = 0
+        self.entries_committed = 0
+
+    def commit(self, entries: list):
+        """
+        entries: list of (tmp_path, final_path). final_path may be None for
+        files that only need to be made durable (e.g. an intent log).
+        Raises the first error hit by one of *this caller's* entries.
+        """
+        if not entries:
+            return
+
+        with self._lock:
+            batch = self._batch
+            batch.entries.extend(entries)
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+
+        if is_leader:
+            if self.window:
+                time.sleep(self.window)
+            with self._lock:
+                # Later arrivals start the next batch
+                self._batch = _Batch()
+                self._leader_active = False
+            self._flush(batch)
+            batch.done.set()
+        else:
+            batch.done.wait()
+
+        for tmp_path, _ in entries:
+            if tmp_path in batch.failed:
+                raise batch.failed[tmp_path]
+
+    def _flush(self, batch: _Batch):
+        # 1. Data durable — one sync per filesystem for the whole batch
+        if self.batch_sync:
+            self._sync_filesystems(batch)
+        else:
+            self._sync_files(batch)
+
+        # 2. Publish — rename staged files into place
+        touched_dirs = {}   # dir → entries whose durability depends on it
+        for tmp_path, final_path in batch.entries:
+            if tmp_path in batch.failed:
+                continue
+            if final_path is not None:
+                try:
+                    os.replace(tmp_path, final_path)
+                except OSError as e:
+                    batch.failed[tmp_path] = e
+                    continue
+            directory = os.path.dirname(final_path or tmp_path)
+            touched_dirs.setdefault(directory, []).append(tmp_path)
+
+        # 3. Directory entries durable — one fsync per directory, not per file
+        for dir_path, tmp_paths in touched_dirs.items():
+            try:
+                fsync_dir(dir_path, strict=True)
+            except OSError as e:
+                for tmp_path in tmp_paths:
+                    batch.failed[tmp_path] = e
+
+        self.batches_committed += 1
+        self.entries_committed += len(batch.entries)
+
+    def _sync_filesystems(self, batch: _Batch):
+        """syncfs once per device; an error fails every entry on that device."""
+        devices = {}    # st_dev → (a directory on it, [tmp_paths])
+        for tmp_path, _ in batch.entries:
+            directory = os.path.dirname(tmp_path)
+            try:
+                device = os.stat(directory).st_dev
+            except OSError as e:
+                batch.failed[tmp_path] = e
+                continue
+            devices.setdefault(device, (directory, []))[1].append(tmp_path)
+
+        for directory, tmp_paths in devices.values():
+            try:
+                sync_filesystem(directory)
+            except OSError as e:
+                for tmp_path in tmp_paths:
+                    batch.failed[tmp_path] = e
+
+    def _sync_files(self, batch: _Batch):
+        """Fallback without syncfs: fsync each staged file."""
+        for tmp_path, _ in batch.entries:
+            try:
+                with open(tmp_path, "rb+") as f:
+                    os.fsync(f.fileno())
+            except OSError as e:
+                batch.failed[tmp_path] = e
+
+
+group_commit = GroupCommitter()
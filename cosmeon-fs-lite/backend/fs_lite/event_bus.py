@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+# Per-viewer queue bound — a slow client drops events rather than
+# growing memory; it still gets the latest state on reconnect.
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_loop = None
+_subscribers = set()
+_latest = {}  # event type → most recent payload
+
+
+def bind_loop(loop: asyncio.AbstractEventLoop):
+    """Attach the server's event loop so worker threads can publish."""
+    global _loop
+    _loop = loop
+
+
+def publish(event: str, data: dict, changed_only: bool = False):
+    """
+    Record the latest state for an event type and push it to every
+    connected viewer. Safe to call from any thread. Cost is independent of
+    how the data was produced — viewers never trigger disk I/O.
+    With changed_only, identical consecutive payloads are not re-sent.
+    """
+    payload = {**data, "timestamp": time.time()}
+    with _lock:
+        previous = _latest.get(event)
+        if changed_only and previous is not None:
+            if {k: v for k, v in previous.items() if k != "timestamp"} == data:
+                return
+        _latest[event] = payload
+        loop = _loop
+
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.call_soon_threadsafe(_fan_out, event, payload)
+    except RuntimeError:
+        pass  # loop shutting down
+
+
+def _fan_out(event: str, payload: dict):
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait((event, payload))
+        except asyncio.QueueFull:
+            pass
+
+
+def subscribe() -> asyncio.Queue:
+    """New viewer queue, pre-filled with the current state of every event type."""
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _lock:
+        for event, payload in _latest.items():
+            queue.put_nowait((event, payload))
+    _subscribers.add(queue)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue):
+    _subscribers.discard(queue)
+
+
+def latest(event: str) -> dict:
+    with _lock:
+        return _latest.get(event)
+
+
+def subscriber_count() -> int:
+    return len(_subscribers)
@@ -0,0 +1,182 @@
+import math
+import threading
+import time
+from collections import deque
+
+# Node liveness as seen by the detector
+ONLINE = "ONLINE"
+SUSPECT = "SUSPECT"     # probably unhealthy — reads avoid it, nothing is repaired yet
+OFFLINE = "OFFLINE"     # silent for longer than the detection time
+
+PROBE_INTERVAL = 0.5            # seconds between liveness probes
+DEFAULT_PHI_SUSPECT = 5.0       # suspicion level that marks a node SUSPECT
+DEFAULT_DETECTION_SECONDS = 5.0 # silence after which a node is OFFLINE
+IO_ERRORS_TO_SUSPECT = 3        # consecutive failed chunk I/Os that mark SUSPECT
+SLOW_IO_SECONDS = 2.0           # a chunk I/O slower than this counts as a failure
+
+# Heartbeat intervals remembered per node
+HISTORY_SIZE = 100
+# Floor on the interval deviation, so a perfectly regular probe stream
+# doesn't make a few milliseconds of jitter look like a failure
+MIN_STD_SECONDS = PROBE_INTERVAL / 4
+
+
+class _NodeHistory:
+
+    def __init__(self, now: float):
+        self.intervals = deque(maxlen=HISTORY_SIZE)
+        self.last_probe = None
+        self.last_seen = now
+        self.io_errors = 0
+        self.state = ONLINE
+
+    def phi(self, now: float) -> float:
+        """
+        Phi-accrual suspicion: -log10 of the probability that a heartbeat
+        is still on its way after this much silence, with intervals modelled
+        as a normal distribution (logistic approximation of its CDF).
+        """
+        if not self.intervals:
+            mean, std = PROBE_INTERVAL, MIN_STD_SECONDS
+        else:
+            mean = sum(self.intervals) / len(self.intervals)
+            variance = sum((i - mean) ** 2 for i in self.intervals) / len(self.intervals)
+            std = max(math.sqrt(variance), MIN_STD_SECONDS)
+
+        y = (now - self.last_seen - mean) / std
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y))
+        if y > 0:
+            p_later = e / (1.0 + e)
+        else:
+            p_later = 1.0 - 1.0 / (1.0 + e)
+        return -math.log10(max(p_later, 1e-300))
+
+
+class FailureDetector:
+    """
+    Fed by periodic probes (heartbeats) and by the outcome of real chunk
+    I/O. evaluate() turns the evidence into ONLINE / SUSPECT / OFFLINE;
+    lookups return the last evaluated state, so the read path never waits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}
+        self.phi_suspect = DEFAULT_PHI_SUSPECT
+        self.detection_seconds = DEFAULT_DETECTION_SECONDS
+        self.version = 0    # bumped on every state transition
+
+    def _node(self, node_id: str, now: float) -> _NodeHistory:
+        if node_id not in self._nodes:
+            self._nodes[node_id] = _NodeHistory(now)
+        return self._nodes[node_id]
+
+    def heartbeat(self, node_id: str):
+        """A probe answered."""
+        now = time.monotonic()
+        with self._lock:
+            node = self._node(node_id, now)
+            if node.last_probe is not None:
+                node.intervals.append(now - node.last_probe)
+            node.last_probe = now
+            node.last_seen = now
+            node.io_errors = 0
+
+    def record_io(self, node_id: str, ok: bool, latency: float = 0.0):
+        """
+        Outcome of a real chunk read/write. A fast success is as good as a
+        heartbeat; failures and very slow I/O add up to suspicion.
+        """
+        now = time.monotonic()
+        suspected = False
+        with self._lock:
+            node = self._node(node_id, now)
+            if ok and latency < SLOW_IO_SECONDS:
+                node.last_seen = now
+                node.io_errors = 0
+            else:
+                node.io_errors += 1
+                # Don't wait for the next evaluation to steer reads away
+                if node.io_errors >= IO_ERRORS_TO_SUSPECT and node.state == ONLINE:
+                    node.state = SUSPECT
+                    self.version += 1
+                    suspected = True
+        if suspected:
+            print(f"🟡 Node {node_id} is SUSPECT (repeated failed/slow I/O)")
+
+    def evaluate(self, node_ids: list) -> list:
+        """Re-assess these nodes. Returns [(node_id, old_state, new_state)]."""
+        now = time.monotonic()
+        transitions = []
+        with self._lock:
+            for node_id in node_ids:
+                node = self._node(node_id, now)
+                silence = now - node.last_seen
+                if silence >= self.detection_seconds:
+                    state = OFFLINE
+                elif (
+                    node.phi(now) >= self.phi_suspect
+                    or node.io_errors >= IO_ERRORS_TO_SUSPECT
+                ):
+                    state = SUSPECT
+                else:
+                    state = ONLINE
+
+                if state != node.state:
+                    transitions.append((node_id, node.state, state))
+                    node.state = state
+
+            if transitions:
+                self.version += 1
+
+        for node_id, old, new in transitions:
+            emoji = {ONLINE: "🟢", SUSPECT: "🟡", OFFLINE: "🔴"}[new]
+            print(f"{emoji} Failure detector: {node_id} {old} → {new}")
+        return transitions
+
+    def state(self, node_id: str) -> str:
+        with self._lock:
+            node = self._nodes.get(node_id)
+            return node.state if node else ONLINE
+
+    def reset(self, node_id: str):
+        """Forget a node's history (e.g. an operator brought it back)."""
+        with self._lock:
+            self._nodes[node_id] = _NodeHistory(time.monotonic())
+            self.version += 1
+
+    def configure(self, phi_suspect: float = None, detection_seconds: float = None):
+        if phi_suspect is not None:
+            if phi_suspect <= 0:
+                raise ValueError("phi_suspect must be positive")
+            self.phi_suspect = phi_suspect
+        if detection_seconds is not None:
+            if detection_seconds <= PROBE_INTERVAL:
+                raise ValueError(f"detection_seconds must exceed the probe interval ({PROBE_INTERVAL}s)")
+            self.detection_seconds = detection_seconds
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "config": {
+                    "probe_interval": PROBE_INTERVAL,
+                    "phi_suspect": self.phi_suspect,
+                    "detection_seconds": self.detection_seconds,
+                    "io_errors_to_suspect": IO_ERRORS_TO_SUSPECT,
+                    "slow_io_seconds": SLOW_IO_SECONDS,
+                },
+                "nodes": {
+                    node_id: {
+                        "state": node.state,
+                        "phi": round(node.phi(now), 3),
+                        "seconds_since_seen": round(now - node.last_seen, 3),
+                        "io_errors": node.io_errors,
+                        "samples": len(node.intervals),
+                    }
+                    for node_id, node in sorted(self._nodes.items())
+                },
+            }
+
+
+detector = FailureDetector()
@@ -0,0 +1,203 @@
+import threading
+from contextlib import contextmanager
+
+from fs_lite.distributor import distribute_chunks
+from fs_lite.hashing import get_hash_pool, hash_chunk, sha256_hex
+from fs_lite.intent_log import commit_upload, abort_upload
+from fs_lite.merkle import update_leaves
+from fs_lite.metadata_store import get_compact_manifest, save_new_version
+from fs_lite.reconstruct import _fetch_chunk
+
+# One writer per file at a time; readers are never blocked.
+# file_id → [lock, writers holding or waiting]; dropped at zero, so the
+# table only ever holds files being updated right now.
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _lock_for(file_id: str):
+    with _file_locks_guard:
+        entry = _file_locks.setdefault(file_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _file_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _file_locks[file_id]
+
+
+def append_to_file(file_id: str, data: bytes) -> dict:
+    """Append bytes to the end of a file as a new manifest version."""
+    with _lock_for(file_id):
+        compact = get_compact_manifest(file_id)
+        manifest = compact.to_dict()
+        return _write_range(manifest, compact.merkle_levels(), manifest["file_size"], data)
+
+
+def patch_file(file_id: str, offset: int, data: bytes) -> dict:
+    """
+    Overwrite bytes starting at offset as a new manifest version.
+    The write may run past the current end (growing the file) but may not
+    start beyond it.
+    """
+    with _lock_for(file_id):
+        compact = get_compact_manifest(file_id)
+        manifest = compact.to_dict()
+        if offset < 0 or offset > manifest["file_size"]:
+            raise RuntimeError(
+                f"Offset {offset} outside file of {manifest['file_size']} bytes"
+            )
+        return _write_range(manifest, compact.merkle_levels(), offset, data)
+
+
+def _write_range(manifest: dict, levels: list, offset: int, data: bytes) -> dict:
+    """
+    Rewrite only the chunks overlapping [offset, offset + len(data)).
+    Unchanged chunk entries are carried into the new version as-is; the
+    old version stays readable because its chunks are left in place.
+    levels is the file's stored Merkle tree; only the paths above the
+    rewritten chunks are rehashed.
+    """
+    if not data:
+        raise RuntimeError("Nothing to write")
+
+    file_id = manifest["file_id"]
+    chunk_size = manifest["chunk_size"]
+    old_version = manifest.get("version", 1)
+    new_version = old_version + 1
+    fast_algorithm = manifest.get("checksums", {}).get("fast")
+
+    chunks = sorted(manifest["chunks"], key=lambda c: c["index"])
+    file_size = manifest["file_size"]
+    end = offset + len(data)
+    last = len(chunks) - 1
+
+    # Which existing chunks does the write touch?
+    affected = []
+    position = 0
+    for i, chunk in enumerate(chunks):
+        chunk_start, chunk_end = position, position + chunk["size"]
+        position = chunk_end
+        overlaps = chunk_start < end and chunk_end > offset
+        # Appending: top up a partial last chunk instead of leaving it short
+        fills_tail = i == last and offset >= chunk_end and chunk["size"] < chunk_size
+        if overlaps or fills_tail:
+            affected.append(i)
+
+    region_start = sum(c["size"] for c in chunks[:affected[0]]) if affected else file_size
+
+    # Read (and verify) only the affected chunks
+    region = bytearray()
+    for i in affected:
+        chunk = chunks[i]
+        old = _fetch_chunk(chunk["id"], chunk["primary_node"], chunk["replica_node"])
+        if old is None or sha256_hex(old) != chunk["hash"]:
+            raise RuntimeError(f"Chunk {chunk['index']} unavailable or corrupt — repair first")
+        region.extend(old)
+
+    relative = offset - region_start
+    if len(region) < relative + len(data):
+        region.extend(b"\0" * (relative + len(data) - len(region)))
+    region[relative:relative + len(data)] = data
+
+    # Keep existing chunk boundaries; only the tail is re-split
+    touches_tail = end > file_size or (affected and affected[-1] == last)
+    sizes = [
+        chunks[i]["size"] for i in affected
+        if not (touches_tail and i == last)
+    ]
+    remaining = len(region) - sum(sizes)
+    while remaining > 0:
+        sizes.append(min(chunk_size, remaining))
+        remaining -= sizes[-1]
+
+    first_index = affected[0] if affected else len(chunks)
+    pool = get_hash_pool()
+    new_chunks = []
+    pending = []
+    cursor = 0
+    for n, size in enumerate(sizes):
+        piece = bytes(region[cursor:cursor + size])
+        cursor += size
+        index = first_index + n
+        new_chunks.append({
+            "id": f"{file_id}_{index}_v{new_version}",
+            "index": index,
+            "size": size,
+            "hash": None,
+            "data": piece,
+        })
+        pending.append(pool.submit(hash_chunk, piece, fast_algorithm))
+
+    for chunk, future in zip(new_chunks, pending):
+        chunk["hash"], fast = future.result()
+        if fast_algorithm:
+            chunk["fast_hash"] = fast
+
+    # Place only the new chunks, under their own intent
+    delta_key = f"{file_id}_v{new_version}"
+    delta = {
+        "file_id": delta_key,
+        "file_name": manifest["file_name"],
+        "file_size": len(region),
+        "total_chunks": len(new_chunks),
+        "chunk_size": chunk_size,
+        "full_hash": "",
+        "chunks": new_chunks,
+    }
+    delta = distribute_chunks(
+        delta,
+        intent_kind="version",
+        intent_owner={"file_id": file_id, "version": new_version},
+    )
+
+    replaced = set(affected)
+    kept = [c for i, c in enumerate(chunks) if i not in replaced]
+    merged = kept[:first_index] + delta["chunks"] + kept[first_index:]
+    for index, chunk in enumerate(merged):
+        chunk["index"] = index
+
+    # Merkle tree: recompute only the paths above changed leaves
+    levels = update_leaves(levels, {
+        c["index"]: c["hash"] for c in delta["chunks"]
+    })
+
+    new_manifest = {
+        **{k: v for k, v in manifest.items() if k != "chunks"},
+        "file_size": max(file_size, end),
+        "total_chunks": len(merged),
+        "version": new_version,
+        "merkle_root": levels[-1][0],
+        # A SHA-256 over the whole file can't be updated without rereading
+        # it; after a partial update the Merkle root is the file hash.
+        "full_hash": levels[-1][0],
+        "full_hash_scheme": "merkle",
+        "chunks": merged,
+        "merkle_levels": levels,    # stored with the record, not a header field
+    }
+    new_manifest.pop("parts", None)
+
+    try:
+        save_new_version(new_manifest, old_version)
+    except Exception:
+        abort_upload(delta_key)
+        raise
+    commit_upload(delta_key)
+
+    print(
+        f"✏️  {file_id} → v{new_version}: rewrote {len(delta['chunks'])} of "
+        f"{len(merged)} chunks ({len(data)} bytes at offset {offset})"
+    )
+
+    return {
+        "file_id": file_id,
+        "version": new_version,
+        "file_size": new_manifest["file_size"],
+        "total_chunks": new_manifest["total_chunks"],
+        "chunks_rewritten": len(delta["chunks"]),
+        "full_hash": new_manifest["full_hash"],
+    }
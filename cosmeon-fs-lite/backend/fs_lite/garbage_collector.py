@@ -0,0 +1,186 @@
+import threading
+import time
+
+from fs_lite.anti_entropy import expected_placements
+from fs_lite.io_scheduler import scheduler, GC
+from fs_lite.metadata_store import (
+    list_tombstones,
+    remove_tombstone,
+    prune_versions,
+)
+from fs_lite.multipart import MULTIPART_TTL_SECONDS, list_part_chunk_ids, reap_stale_uploads
+from fs_lite.intent_log import list_intent_chunk_ids
+from fs_lite.node_manager import (
+    NODE_IDS,
+    get_node_statuses,
+    get_chunk_size,
+    node_has_chunk,
+    delete_chunk_from_node,
+    discard_staged_chunk,
+    scan_node_files,
+)
+
+# Unreferenced files younger than this are left alone: they may belong to
+# an upload whose metadata is being written right now
+GC_GRACE_SECONDS = 300
+
+# Chunks reclaimed per batch before yielding to other work
+GC_BATCH_SIZE = 64
+
+# Nominal I/O cost charged to the GC class per delete, so reclaiming runs
+# at a bounded rate and backs off while nodes are busy with client I/O
+DELETE_COST_BYTES = 64 * 1024
+
+# Archived versions kept per file; older ones are pruned by the sweep
+MAX_ARCHIVED_VERSIONS = 10
+
+# One collection pass at a time
+_gc_lock = threading.Lock()
+
+_status = {
+    "last_collect": None,
+    "last_sweep": None,
+}
+
+
+def _delete(node_id: str, chunk_id: str) -> int:
+    """Throttled delete of one chunk. Returns bytes freed."""
+    size = get_chunk_size(node_id, chunk_id) or 0
+    scheduler.acquire(GC, node_id, DELETE_COST_BYTES)
+    return size if delete_chunk_from_node(node_id, chunk_id) else 0
+
+
+def collect_deleted() -> dict:
+    """
+    Reclaim the chunks of files marked deleted, in batches. A tombstone is
+    removed once its chunks are gone from every ONLINE node; copies left on
+    OFFLINE nodes are picked up by the sweep after they recover.
+    """
+    with _gc_lock:
+        files = 0
+        copies_deleted = 0
+        bytes_freed = 0
+
+        for tombstone in list_tombstones():
+            chunk_ids = tombstone["chunks"]
+            for start in range(0, len(chunk_ids), GC_BATCH_SIZE):
+                online = [
+                    node_id for node_id, status in get_node_statuses().items()
+                    if status == "ONLINE"
+                ]
+                for chunk_id in chunk_ids[start:start + GC_BATCH_SIZE]:
+                    for node_id in online:
+                        if node_has_chunk(node_id, chunk_id):
+                            bytes_freed += _delete(node_id, chunk_id)
+                            copies_deleted += 1
+
+            remove_tombstone(tombstone["file_id"])
+            files += 1
+            print(f"♻️  Reclaimed deleted file {tombstone['file_id']} ({len(chunk_ids)} chunks)")
+
+        result = {
+            "files_reclaimed": files,
+            "chunk_copies_deleted": copies_deleted,
+            "bytes_freed": bytes_freed,
+            "finished_at": time.time(),
+        }
+        if files:
+            _status["last_collect"] = result
+        return result
+
+
+def _in_flight_chunk_ids() -> set:
+    """
+    Chunks of open multipart uploads and logged uploads. Their placement
+    isn't final yet, so a copy on any node is live.
+    """
+    return list_part_chunk_ids() | list_intent_chunk_ids()
+
+
+def _is_orphan(node_id: str, chunk_id: str, in_flight: set) -> bool:
+    """
+    No metadata places this copy on this node: not a current or archived
+    manifest (read replicas included), not an upload in flight. A stale
+    copy of a live chunk — e.g. left behind on a node repair replaced —
+    is an orphan too.
+    """
+    return chunk_id not in in_flight and chunk_id not in expected_placements()[node_id]
+
+
+def sweep_orphans(grace_seconds: float = GC_GRACE_SECONDS) -> dict:
+    """
+    Mark-and-sweep: list each ONLINE node, then mark every (node, chunk)
+    copy metadata places, and remove unplaced copies and stale temp files
+    older than the grace period. Listing before marking means a chunk
+    written after the listing is never considered; each batch is checked
+    against the placements again right before deleting, so a placement
+    saved meanwhile is respected. Abandoned multipart uploads are
+    discarded first (see multipart.MULTIPART_TTL_SECONDS).
+    """
+    with _gc_lock:
+        pruned_versions = prune_versions(MAX_ARCHIVED_VERSIONS)
+        expired_uploads = reap_stale_uploads()
+
+        cutoff = time.time() - grace_seconds
+        statuses = get_node_statuses()
+        listings = {
+            node_id: [f for f in scan_node_files(node_id) if f["mtime"] < cutoff]
+            for node_id in NODE_IDS
+            if statuses.get(node_id) == "ONLINE"
+        }
+        in_flight = _in_flight_chunk_ids()
+
+        scanned = 0
+        orphans = []
+        stale_temps = []
+        for node_id, files in listings.items():
+            scanned += len(files)
+            for f in files:
+                if f["temp"]:
+                    # Nothing finishes a temp file this old — it's a leftover
+                    stale_temps.append((node_id, f["chunk_id"]))
+                elif _is_orphan(node_id, f["chunk_id"], in_flight):
+                    orphans.append((node_id, f["chunk_id"]))
+
+        bytes_freed = 0
+        orphans_deleted = 0
+        for start in range(0, len(orphans), GC_BATCH_SIZE):
+            in_flight = _in_flight_chunk_ids()
+            for node_id, chunk_id in orphans[start:start + GC_BATCH_SIZE]:
+                if _is_orphan(node_id, chunk_id, in_flight):
+                    bytes_freed += _delete(node_id, chunk_id)
+                    orphans_deleted += 1
+        for node_id, chunk_id in stale_temps:
+            scheduler.acquire(GC, node_id, DELETE_COST_BYTES)
+            discard_staged_chunk(node_id, chunk_id)
+
+        result = {
+            "files_scanned": scanned,
+            "orphans_deleted": orphans_deleted,
+            "temp_files_deleted": len(stale_temps),
+            "versions_pruned": pruned_versions,
+            "multipart_uploads_expired": expired_uploads,
+            "bytes_freed": bytes_freed,
+            "grace_seconds": grace_seconds,
+            "finished_at": time.time(),
+        }
+        _status["last_sweep"] = result
+
+    if orphans_deleted or stale_temps:
+        print(
+            f"🧹 GC sweep: {orphans_deleted} orphan chunks, "
+            f"{len(stale_temps)} stale temp files removed"
+        )
+    return result
+
+
+def get_gc_status() -> dict:
+    tombstones = list_tombstones()
+    return {
+        "pending_files": len(tombstones),
+        "pending_chunks": sum(len(t["chunks"]) for t in tombstones),
+        "grace_seconds": GC_GRACE_SECONDS,
+        "max_archived_versions": MAX_ARCHIVED_VERSIONS,
+        "multipart_ttl_seconds": MULTIPART_TTL_SECONDS,
+        **_status,
+    }
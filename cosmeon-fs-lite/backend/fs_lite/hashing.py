@@ -0,0 +1,142 @@
+import os
+import zlib
+import queue
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional fast checksums — used only if the package is installed
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import crc32c as _crc32c
+except ImportError:
+    _crc32c = None
+
+# hashlib releases the GIL while hashing buffers larger than ~2 KB, so a
+# thread pool spreads SHA-256 over all cores without the pickling and
+# copying cost a process pool would add for every chunk.
+HASH_WORKERS = os.cpu_count() or 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for chunk hashing and verification."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=HASH_WORKERS,
+                thread_name_prefix="fs-hash"
+            )
+        return _pool
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# ─────────────────────────────────────────────────────────
+# CHECKSUM POLICIES
+# ─────────────────────────────────────────────────────────
+# SHA-256 is always kept for end-to-end integrity. A policy may add a fast
+# non-cryptographic checksum per chunk, used for routine scrubbing.
+
+DEFAULT_CHECKSUM_POLICY = "sha256"
+
+
+def _crc32(data: bytes) -> str:
+    return f"{zlib.crc32(data) & 0xFFFFFFFF:08x}"
+
+
+def _available_fast_checksums() -> dict:
+    algorithms = {"crc32": _crc32}
+    if xxhash is not None:
+        algorithms["xxh3"] = lambda data: xxhash.xxh3_64_hexdigest(data)
+    if _crc32c is not None:
+        algorithms["crc32c"] = lambda data: f"{_crc32c.crc32c(data):08x}"
+    return algorithms
+
+
+FAST_CHECKSUMS = _available_fast_checksums()
+
+
+def checksum_policies() -> list:
+    return [DEFAULT_CHECKSUM_POLICY] + [
+        f"sha256+{name}" for name in FAST_CHECKSUMS
+    ]
+
+
+def parse_checksum_policy(policy: str) -> str:
+    """Returns the fast algorithm a policy adds (or None). Raises ValueError."""
+    if policy == DEFAULT_CHECKSUM_POLICY:
+        return None
+    if policy.startswith("sha256+") and policy[len("sha256+"):] in FAST_CHECKSUMS:
+        return policy[len("sha256+"):]
+    raise ValueError(
+        f"Unsupported checksum policy: {policy}. "
+        f"Available: {checksum_policies()}"
+    )
+
+
+def checksum_info(fast_algorithm: str = None) -> dict:
+    """Algorithms recorded in a manifest."""
+    return {"chunk": "sha256", "full": "sha256", "fast": fast_algorithm}
+
+
+def fast_checksum(algorithm: str, data: bytes) -> str:
+    return FAST_CHECKSUMS[algorithm](data)
+
+
+def hash_chunk(data: bytes, fast_algorithm: str = None) -> tuple:
+    """(sha256 hex, fast checksum or None) — runs on the hash pool."""
+    fast = fast_checksum(fast_algorithm, data) if fast_algorithm else None
+    return sha256_hex(data), fast
+
+
+def chunk_matches(chunk: dict, data: bytes, fast_algorithm: str = None) -> bool:
+    """
+    Check chunk data against its manifest entry. With fast_algorithm and a
+    recorded fast_hash, the cheap checksum is used (scrubbing); otherwise
+    SHA-256.
+    """
+    if (
+        fast_algorithm
+        and chunk.get("fast_hash")
+        and fast_algorithm in FAST_CHECKSUMS
+    ):
+        return fast_checksum(fast_algorithm, data) == chunk["fast_hash"]
+    return sha256_hex(data) == chunk["hash"]
+
+
+class StreamHasher:
+    """
+    SHA-256 of a whole stream computed on its own thread, so the
+    sequential full-file hash overlaps with reading and chunk hashing.
+    """
+
+    def __init__(self, max_pending: int = 8):
+        self._hash = hashlib.sha256()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            self._hash.update(data)
+
+    def feed(self, data: bytes):
+        self._queue.put(data)
+
+    def hexdigest(self) -> str:
+        self._queue.put(None)
+        self._thread.join()
+        return self._hash.hexdigest()
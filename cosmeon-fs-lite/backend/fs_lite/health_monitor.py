@@ -1,10 +1,105 @@
-import hashlib
-from fs_lite.metadata_store import list_files, get_manifest
-from fs_lite.node_manager import get_node, read_chunk_from_node
-from fs_lite.node_manager import get_all_nodes, write_chunk_to_node
-from fs_lite.metadata_store import save_manifest
-
-def scan_system_health() -> dict:
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fs_lite.event_bus import publish, latest
+from fs_lite.hashing import get_hash_pool, sha256_hex, chunk_matches
+from fs_lite.io_scheduler import FOREGROUND, SCRUB
+from fs_lite.metadata_store import list_manifests, get_manifest
+from fs_lite.node_manager import get_node_statuses, read_chunk_from_node
+from fs_lite.node_manager import NODE_IDS, node_has_chunk, delete_chunk_from_node
+from fs_lite.metadata_store import update_manifests
+from fs_lite.anti_entropy import expected_placements
+from fs_lite.repair_executor import run_repair
+
+HEALTH_DETAIL_MODES = ("unhealthy", "all", "none")
+
+# Background checks read through their own pool: a throttled read sleeps in
+# the I/O scheduler and must never hold a hash-pool worker that uploads and
+# downloads are queued behind.
+SCRUB_WORKERS = 8
+# Checks queued or running at once, so a scan never enqueues the whole cluster
+MAX_SCRUB_IN_FLIGHT = SCRUB_WORKERS * 2
+
+_scrub_pool = None
+_scrub_pool_lock = threading.Lock()
+
+
+def get_scrub_pool() -> ThreadPoolExecutor:
+    global _scrub_pool
+    with _scrub_pool_lock:
+        if _scrub_pool is None:
+            _scrub_pool = ThreadPoolExecutor(
+                max_workers=SCRUB_WORKERS,
+                thread_name_prefix="scrub"
+            )
+        return _scrub_pool
+
+
+def _map_checks(fn, items: list, io_class: str):
+    """
+    fn over items, results in order. Foreground checks never wait in the
+    scheduler and use the hash pool; background ones run on the scrub pool
+    with at most MAX_SCRUB_IN_FLIGHT submitted at a time.
+    """
+    if io_class == FOREGROUND:
+        yield from get_hash_pool().map(fn, items)
+        return
+
+    pool = get_scrub_pool()
+    pending = deque()
+    for item in items:
+        if len(pending) >= MAX_SCRUB_IN_FLIGHT:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _check_copies(
+    chunk: dict,
+    statuses: dict,
+    io_class: str = SCRUB,
+    fast_algorithm: str = None,
+) -> tuple:
+    """
+    Reads and checks both copies of a chunk — with the file's fast
+    checksum when it has one, SHA-256 otherwise.
+    A copy on a SUSPECT node isn't read but still counts as available, the
+    same rule repair and anti-entropy use: nothing is re-replicated until
+    the node is OFFLINE.
+    Returns (available_copies, corrupted, suspect_copies).
+    One task per chunk (see _map_checks).
+    """
+    available_copies = 0
+    corrupted = False
+    suspect_copies = 0
+
+    for node_id in (chunk["primary_node"], chunk["replica_node"]):
+        if statuses.get(node_id) == "SUSPECT":
+            available_copies += 1
+            suspect_copies += 1
+            continue
+        try:
+            if statuses.get(node_id) == "ONLINE":
+                data = read_chunk_from_node(node_id, chunk["id"], io_class)
+                if chunk_matches(chunk, data, fast_algorithm):
+                    available_copies += 1
+                else:
+                    corrupted = True
+        except Exception:
+            pass
+
+    return available_copies, corrupted, suspect_copies
+
+
+def scan_system_health(
+    details: str = "unhealthy",
+    file_id: str = None,
+    offset: int = 0,
+    limit: int = None,
+    io_class: str = SCRUB,
+) -> dict:
     """
     Scans all files and chunks.
     Detects:
@@ -12,87 +107,97 @@ def scan_system_health() -> dict:
     - Under-replicated chunks (1 copy available)
     - Missing chunks (0 copies available)
     - Corrupted chunks (hash mismatch)
+    Copies on SUSPECT nodes count as available and are reported separately
+    in suspect_chunks (chunks with at least one such copy).
+
+    Chunks are checked in parallel, a bounded number at a time. The
+    per-chunk details list is filtered ("unhealthy" by default, "all", or
+    "none") and paginated with offset/limit. With file_id only that file's
+    chunks are read, and the counters cover just that file (ValueError if
+    unknown). Reads are scheduled as scrub I/O on the scrub pool, so scans
+    yield to client traffic without holding up hash-pool work.
     """
+    if details not in HEALTH_DETAIL_MODES:
+        raise ValueError(f"details must be one of {HEALTH_DETAIL_MODES}")
 
-    files = list_files()
-    if not files:
-        return {
-            "system_status": "HEALTHY",
-            "total_chunks": 0,
-            "healthy_chunks": 0,
-            "under_replicated_chunks": 0,
-            "missing_chunks": 0,
-            "corrupted_chunks": 0,
-            "details": []
-        }
-    total_chunks = 0
-    healthy_chunks = 0
-    under_replicated = 0
-    missing_chunks = 0
-    corrupted_chunks = 0
-
-    details = []
+    statuses = get_node_statuses()
 
-    for file_info in files:
-        manifest = get_manifest(file_info["file_id"])
+    if file_id is not None:
+        manifests = [get_manifest(file_id)]
+    else:
+        # One snapshot: a file deleted meanwhile is simply not in it
+        manifests = list_manifests()
 
+    chunks = []
+    for manifest in manifests:
+        fast_algorithm = manifest.get("checksums", {}).get("fast")
         for chunk in manifest["chunks"]:
-            total_chunks += 1
-
-            primary = chunk["primary_node"]
-            replica = chunk["replica_node"]
-            expected_hash = chunk["hash"]
-            chunk_id = chunk["id"]
+            chunks.append((manifest["file_id"], chunk, fast_algorithm))
 
-            available_copies = 0
-            corrupted = False
+    results = _map_checks(
+        lambda item: _check_copies(item[1], statuses, io_class, item[2]),
+        chunks,
+        io_class,
+    )
 
-            # Check primary
-            try:
-                if get_node(primary)["status"] == "ONLINE":
-                    data = read_chunk_from_node(primary, chunk_id)
-                    if hashlib.sha256(data).hexdigest() == expected_hash:
-                        available_copies += 1
-                    else:
-                        corrupted = True
-            except Exception:
-                pass
-
-            # Check replica
-            try:
-                if get_node(replica)["status"] == "ONLINE":
-                    data = read_chunk_from_node(replica, chunk_id)
-                    if hashlib.sha256(data).hexdigest() == expected_hash:
-                        available_copies += 1
-                    else:
-                        corrupted = True
-            except Exception:
-                pass
-
-            # Categorize
-            if corrupted:
-                corrupted_chunks += 1
-            elif available_copies == 2:
-                healthy_chunks += 1
-            elif available_copies == 1:
-                under_replicated += 1
-            else:
-                missing_chunks += 1
-
-            details.append({
-                "file_id": manifest["file_id"],
-                "chunk_id": chunk_id,
-                "copies_available": available_copies,
-                "corrupted": corrupted
-            })
-
-        # Determine system status
-        if missing_chunks > 0 or corrupted_chunks > 0:
-            system_status = "CRITICAL"
-        elif under_replicated > 0:
-            system_status = "DEGRADED"
+    total_chunks = 0
+    healthy_chunks = 0
+    under_replicated = 0
+    missing_chunks = 0
+    corrupted_chunks = 0
+    suspect_chunks = 0
+
+    matching_details = []
+
+    for (owner_id, chunk, _), (available_copies, corrupted, suspect_copies) in zip(chunks, results):
+        total_chunks += 1
+        if suspect_copies:
+            suspect_chunks += 1
+
+        # Categorize
+        if corrupted:
+            corrupted_chunks += 1
+        elif available_copies == 2:
+            healthy_chunks += 1
+        elif available_copies == 1:
+            under_replicated += 1
         else:
-            system_status = "HEALTHY"
+            missing_chunks += 1
+
+        if details == "none":
+            continue
+        if details == "unhealthy" and available_copies == 2 and not corrupted:
+            continue
+
+        matching_details.append({
+            "file_id": owner_id,
+            "chunk_id": chunk["id"],
+            "copies_available": available_copies,
+            "suspect_copies": suspect_copies,
+            "corrupted": corrupted
+        })
+
+    # Determine system status
+    if missing_chunks > 0 or corrupted_chunks > 0:
+        system_status = "CRITICAL"
+    elif under_replicated > 0:
+        system_status = "DEGRADED"
+    else:
+        system_status = "HEALTHY"
+
+    # A single-file scan says nothing about the cluster as a whole
+    if file_id is None:
+        publish("health", {
+            "system_status": system_status,
+            "total_chunks": total_chunks,
+            "healthy_chunks": healthy_chunks,
+            "under_replicated_chunks": under_replicated,
+            "missing_chunks": missing_chunks,
+            "corrupted_chunks": corrupted_chunks,
+            "suspect_chunks": suspect_chunks,
+        }, changed_only=True)
+
+    end = None if limit is None else offset + limit
 
     return {
         "system_status": system_status,
@@ -101,127 +206,178 @@ def scan_system_health() -> dict:
         "under_replicated_chunks": under_replicated,
         "missing_chunks": missing_chunks,
         "corrupted_chunks": corrupted_chunks,
-        "details": details
+        "suspect_chunks": suspect_chunks,
+        "details_total": len(matching_details),
+        "offset": offset,
+        "limit": limit,
+        "details": matching_details[offset:end]
     }
 
-def repair_under_replicated_chunks():
+
+def get_health_summary() -> dict:
+    """Compact form of scan_system_health(): counters only, no details."""
+    health = scan_system_health(details="none")
+    for key in ("details", "details_total", "offset", "limit"):
+        del health[key]
+    return health
+
+
+def get_cached_health_summary() -> dict:
     """
-    Repairs chunks that have only 1 healthy copy.
-    Creates a new replica on another ONLINE node.
+    The counters of the last cluster scan (published as the "health"
+    event), without touching the nodes. Scans once if none has run yet.
     """
+    health = latest("health")
+    if health is None:
+        return get_health_summary()
+    return dict(health)
 
-    files = list_files()
 
-    repaired = 0
+def _verify_chunk(chunk: dict, statuses: dict, io_class: str) -> bool:
+    """
+    Verify the first readable copy (primary, then replica).
+    One task per chunk (see _map_checks).
+    """
+    data = None
 
-    for file_info in files:
-        manifest = get_manifest(file_info["file_id"])
+    for node_id in (chunk["primary_node"], chunk["replica_node"]):
+        try:
+            if statuses.get(node_id) == "ONLINE":
+                data = read_chunk_from_node(node_id, chunk["id"], io_class)
+                break
+        except Exception:
+            pass
 
-        for chunk in manifest["chunks"]:
-            primary = chunk["primary_node"]
-            replica = chunk["replica_node"]
-            chunk_id = chunk["id"]
-            expected_hash = chunk["hash"]
+    return data is not None and sha256_hex(data) == chunk["hash"]
 
-            healthy_locations = []
 
-            # Check primary
-            try:
-                if get_node(primary)["status"] == "ONLINE":
-                    data = read_chunk_from_node(primary, chunk_id)
-                    if hashlib.sha256(data).hexdigest() == expected_hash:
-                        healthy_locations.append(primary)
-            except Exception:
-                pass
-
-            # Check replica
+def verify_files(file_ids, io_class: str = SCRUB) -> dict:
+    """
+    Verify many files at once. file_ids is a list of IDs or "all".
+    Every chunk of every requested file is hashed in parallel; node
+    status is read once for the whole batch. Requested IDs that don't
+    exist are listed in not_found; with "all", files deleted during the
+    call are just left out.
+    """
+    statuses = get_node_statuses()
+
+    manifests = []
+    not_found = []
+    if file_ids == "all":
+        manifests = list_manifests()
+    else:
+        for file_id in file_ids:
             try:
-                if get_node(replica)["status"] == "ONLINE":
-                    data = read_chunk_from_node(replica, chunk_id)
-                    if hashlib.sha256(data).hexdigest() == expected_hash:
-                        healthy_locations.append(replica)
-            except Exception:
-                pass
-
-            # If exactly one healthy copy → repair missing or corrupted replica
-            if len(healthy_locations) == 1:
-                source_node = healthy_locations[0]
-
-                # Find ONLINE nodes
-                online_nodes = [n["node_id"] for n in get_all_nodes() if n["status"] == "ONLINE"]
-
-                for node_id in online_nodes:
-                    if node_id not in healthy_locations:
-                        try:
-                            # Copy from healthy source
-                            data = read_chunk_from_node(source_node, chunk_id)
-                            write_chunk_to_node(node_id, chunk_id, data)
-
-                            # Update metadata
-                            if chunk["primary_node"] == source_node:
-                                chunk["replica_node"] = node_id
-                            else:
-                                chunk["primary_node"] = node_id
-
-                            repaired += 1
-                            print(f"🔧 Repaired/Restored chunk {chunk_id} on {node_id}")
-                            break
-                        except Exception:
-                            continue
-
-        save_manifest(manifest)
-
-    return {"repaired_chunks": repaired}
-
-def cleanup_over_replicated_chunks():
-
-    files = list_files()
-    cleaned = 0
-    RF = 2
+                manifests.append(get_manifest(file_id))
+            except ValueError:
+                not_found.append(file_id)
+
+    tasks = [
+        (manifest["file_id"], chunk)
+        for manifest in manifests
+        for chunk in manifest["chunks"]
+    ]
+    outcomes = _map_checks(
+        lambda task: _verify_chunk(task[1], statuses, io_class),
+        tasks,
+        io_class,
+    )
+
+    failed_chunks = {m["file_id"]: [] for m in manifests}
+    for (owner_id, chunk), passed in zip(tasks, outcomes):
+        if not passed:
+            failed_chunks[owner_id].append(chunk["id"])
+
+    results = [
+        {
+            "file_id": m["file_id"],
+            "file_name": m["file_name"],
+            "overall": "FAIL" if failed_chunks[m["file_id"]] else "PASS",
+            "failed_chunks": failed_chunks[m["file_id"]],
+        }
+        for m in manifests
+    ]
 
-    for file_info in files:
-        manifest = get_manifest(file_info["file_id"])
+    return {
+        "total_files": len(results),
+        "passed": sum(1 for r in results if r["overall"] == "PASS"),
+        "failed": sum(1 for r in results if r["overall"] == "FAIL"),
+        "not_found": not_found,
+        "results": results,
+    }
 
-        for chunk in manifest["chunks"]:
 
-            chunk_id = chunk["id"]
+def verify_file(file_id: str) -> dict:
+    """Verify a single file. Raises ValueError if it doesn't exist."""
+    get_manifest(file_id)
+    result = verify_files([file_id], io_class=FOREGROUND)["results"][0]
+    return {
+        "file_id": result["file_id"],
+        "file_name": result["file_name"],
+        "overall": result["overall"],
+    }
 
-            # 🔥 Find all physical copies across all nodes
-            physical_locations = []
+def repair_under_replicated_chunks(file_ids: list = None, verify: bool = True):
+    """
+    Restores chunks that have lost a copy, via the parallel repair executor.
+    file_ids restricts the pass to those files (e.g. the ones anti-entropy
+    found diverging); by default every file is checked. verify=False skips
+    reading copies and trusts the node index (enough for missing chunks).
+    """
+    return run_repair(file_ids, verify=verify)
 
-            for node in get_all_nodes():
-                node_id = node["node_id"]
-                try:
-                    read_chunk_from_node(node_id, chunk_id)
-                    physical_locations.append(node_id)
-                except Exception:
-                    continue
+def cleanup_over_replicated_chunks():
+    """
+    Remove copies beyond the replication factor that nothing needs.
+    A copy stays wherever metadata places it: the current placement, a
+    hot file's read replica, or an archived version still readable
+    through it. A placement pointing at a node that lost its copy is
+    moved onto a spare copy instead of deleting that copy. Only manifests
+    whose placements changed are saved, in one metadata commit.
+    """
+    placed = expected_placements()
+    changed = []
+    extras = []
 
-            # If over-replicated
-            if len(physical_locations) > RF:
+    for manifest in list_manifests():
+        dirty = False
 
-                # Keep first RF copies
-                nodes_to_keep = physical_locations[:RF]
-                nodes_to_delete = physical_locations[RF:]
+        for chunk in manifest["chunks"]:
+            chunk_id = chunk["id"]
 
-                for node_id in nodes_to_delete:
-                    try:
-                        import os
-                        base_dir = os.path.dirname(os.path.dirname(__file__))
-                        path = os.path.join(base_dir, "nodes", node_id, chunk_id)
+            # 🔥 Find all physical copies across all nodes
+            physical_locations = [
+                node_id for node_id in NODE_IDS if node_has_chunk(node_id, chunk_id)
+            ]
+            spare = [
+                node_id for node_id in physical_locations
+                if chunk_id not in placed[node_id]
+                and node_id not in (chunk["primary_node"], chunk["replica_node"])
+            ]
 
-                        if os.path.exists(path):
-                            os.remove(path)
-                            cleaned += 1
-                            print(f"🧹 Removed extra replica {chunk_id} from {node_id}")
+            for slot in ("primary_node", "replica_node"):
+                if chunk[slot] not in physical_locations and spare:
+                    chunk[slot] = spare.pop(0)
+                    dirty = True
 
-                    except Exception:
-                        continue
+            extras.extend((node_id, chunk_id) for node_id in spare)
 
-                # Update metadata
-                chunk["primary_node"] = nodes_to_keep[0]
-                chunk["replica_node"] = nodes_to_keep[1]
+        if dirty:
+            changed.append(manifest)
 
-        save_manifest(manifest)
+    if changed:
+        update_manifests(changed)
 
-    return {"cleaned_chunks": cleaned}
\ No newline at end of file
+    cleaned = 0
+    placed = expected_placements()   # as saved just now
+    for node_id, chunk_id in extras:
+        if chunk_id in placed[node_id]:
+            continue
+        try:
+            if delete_chunk_from_node(node_id, chunk_id):
+                cleaned += 1
+                print(f"🧹 Removed extra replica {chunk_id} from {node_id}")
+        except Exception:
+            continue
+
+    return {"cleaned_chunks": cleaned}
@@ -0,0 +1,258 @@
+import os
+import json
+
+from fs_lite.metadata_store import METADATA_DIR, file_versions, save_manifest, save_manifests
+from fs_lite.node_manager import delete_chunk_from_node, chunk_path_on_node
+
+# One small append-only log per in-flight upload.
+# Recovery only ever looks at this directory, so its cost grows with the
+# number of uploads that were running at crash time — not with cluster size.
+INTENT_DIR = os.path.join(METADATA_DIR, "intents")
+
+# Intent kinds whose header carries enough to finish the upload on recovery.
+# Others (e.g. "version" deltas) are aborted unless already committed.
+ROLL_FORWARD_KINDS = ("file", "part", "bulk")
+
+
+def _intent_path(upload_key: str) -> str:
+    return os.path.join(INTENT_DIR, f"{upload_key}.log")
+
+
+def _append(upload_key: str, record: dict, sync: bool = False):
+    with open(_intent_path(upload_key), "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+
+def begin_upload(manifest: dict, kind: str = "file", owner: dict = None):
+    """
+    Record that an upload is starting. The header carries everything needed
+    to rebuild the manifest, so a sealed upload can be rolled forward.
+    """
+    os.makedirs(INTENT_DIR, exist_ok=True)
+    header = {
+        "type": "begin",
+        "kind": kind,
+        "owner": owner or {},
+        "manifest": {
+            k: v for k, v in manifest.items() if k != "chunks"
+        },
+    }
+    # Truncate any leftover log for the same key
+    with open(_intent_path(manifest["file_id"]), "w") as f:
+        f.write(json.dumps(header) + "\n")
+        f.flush()
+
+
+def record_file(upload_key: str, manifest: dict):
+    """Bulk ingest: log one member file's manifest header before its chunks."""
+    _append(upload_key, {
+        "type": "file",
+        "manifest": {k: v for k, v in manifest.items() if k != "chunks"},
+    })
+
+
+def record_chunk(upload_key: str, chunk: dict, nodes: list, file_id: str = None):
+    """
+    Log a chunk placement *before* its bytes are written to any node.
+    file_id names the owning file when one intent covers many (bulk).
+    """
+    record = {
+        "type": "chunk",
+        "id": chunk["id"],
+        "index": chunk["index"],
+        "size": chunk["size"],
+        "hash": chunk["hash"],
+        "nodes": nodes,
+    }
+    if "fast_hash" in chunk:
+        record["fast_hash"] = chunk["fast_hash"]
+    if file_id is not None:
+        record["file_id"] = file_id
+    _append(upload_key, record)
+
+
+def intent_file(upload_key: str) -> str:
+    """Path of the intent log, so it can join a group commit."""
+    return _intent_path(upload_key)
+
+
+def seal_upload(upload_key: str):
+    """All chunks are durable on their nodes — the upload may be rolled forward."""
+    _append(upload_key, {"type": "sealed"}, sync=True)
+
+
+def commit_upload(upload_key: str):
+    """Metadata is committed; the intent is no longer needed."""
+    try:
+        os.remove(_intent_path(upload_key))
+    except FileNotFoundError:
+        pass
+
+
+def abort_upload(upload_key: str) -> int:
+    """Remove every chunk the intent mentions, then drop the intent."""
+    records = _read_records(upload_key)
+    removed = 0
+    for record in records:
+        if record.get("type") == "chunk":
+            for node_id in record["nodes"]:
+                if delete_chunk_from_node(node_id, record["id"]):
+                    removed += 1
+    commit_upload(upload_key)
+    return removed
+
+
+def list_intent_chunk_ids() -> set:
+    """Chunks named by in-flight upload intents (live for GC)."""
+    chunk_ids = set()
+    if not os.path.exists(INTENT_DIR):
+        return chunk_ids
+    for name in os.listdir(INTENT_DIR):
+        if name.endswith(".log"):
+            chunk_ids.update(
+                r["id"] for r in _read_records(name[:-len(".log")])
+                if r.get("type") == "chunk"
+            )
+    return chunk_ids
+
+
+def _read_records(upload_key: str) -> list:
+    """Parse an intent log, ignoring a torn final line from a crash."""
+    records = []
+    try:
+        with open(_intent_path(upload_key), "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _rebuild_manifest(header: dict, chunk_records: list) -> dict:
+    manifest = dict(header["manifest"])
+    manifest["chunks"] = []
+    for r in sorted(chunk_records, key=lambda r: r["index"]):
+        chunk = {
+            "id": r["id"],
+            "index": r["index"],
+            "size": r["size"],
+            "hash": r["hash"],
+            "primary_node": r["nodes"][0],
+            "replica_node": r["nodes"][1] if len(r["nodes"]) > 1 else "",
+        }
+        if "fast_hash" in r:
+            chunk["fast_hash"] = r["fast_hash"]
+        manifest["chunks"].append(chunk)
+    return manifest
+
+
+def _rebuild_bulk(records: list) -> list:
+    """Manifests of every member file logged by a bulk ingest."""
+    chunks_by_file = {}
+    for r in records:
+        if r.get("type") == "chunk":
+            chunks_by_file.setdefault(r["file_id"], []).append(r)
+    return [
+        _rebuild_manifest(r, chunks_by_file.get(r["manifest"]["file_id"], []))
+        for r in records
+        if r.get("type") == "file"
+    ]
+
+
+def _is_committed(kind: str, header: dict, versions: dict) -> bool:
+    """versions: file_id → current version, loaded once per recovery pass."""
+    if kind == "file":
+        return header["manifest"]["file_id"] in versions
+    if kind == "part":
+        from fs_lite.multipart import is_part_committed
+        return is_part_committed(header["owner"], header["manifest"]["file_id"])
+    if kind == "version":
+        current = versions.get(header["owner"]["file_id"])
+        return current is not None and current >= header["owner"]["version"]
+    return False
+
+
+def _roll_forward(kind: str, header: dict, manifests: list, versions: dict):
+    if kind == "file":
+        save_manifest(manifests[0])
+    elif kind == "part":
+        from fs_lite.multipart import record_part
+        record_part(header["owner"], manifests[0])
+    elif kind == "bulk":
+        # One metadata commit covers the whole ingest — all or nothing saved
+        save_manifests([m for m in manifests if m["file_id"] not in versions])
+
+
+def recover_incomplete_uploads() -> dict:
+    """
+    Startup recovery pass. For every in-flight upload:
+    - metadata already committed → just drop the intent
+    - sealed and every chunk present → finish (commit metadata)
+    - otherwise → abort (remove chunks and staged temp files)
+    """
+    if not os.path.isdir(INTENT_DIR):
+        return {"finished": 0, "aborted": 0, "orphans_removed": 0}
+
+    finished = 0
+    aborted = 0
+    orphans_removed = 0
+    # One metadata load for the whole pass — not one per intent
+    versions = file_versions()
+
+    for name in os.listdir(INTENT_DIR):
+        if not name.endswith(".log"):
+            continue
+        upload_key = name[:-len(".log")]
+        records = _read_records(upload_key)
+
+        if not records or records[0].get("type") != "begin":
+            commit_upload(upload_key)
+            continue
+
+        header = records[0]
+        kind = header.get("kind", "file")
+        chunk_records = [r for r in records if r.get("type") == "chunk"]
+        sealed = any(r.get("type") == "sealed" for r in records)
+
+        if _is_committed(kind, header, versions):
+            commit_upload(upload_key)
+            finished += 1
+            continue
+
+        if kind == "bulk":
+            manifests = _rebuild_bulk(records)
+        else:
+            manifests = [_rebuild_manifest(header, chunk_records)]
+
+        complete = (
+            kind in ROLL_FORWARD_KINDS
+            and sealed
+            and all(len(m["chunks"]) == m.get("total_chunks") for m in manifests)
+            and all(
+                os.path.exists(chunk_path_on_node(node_id, r["id"]))
+                for r in chunk_records
+                for node_id in r["nodes"]
+            )
+        )
+
+        if complete:
+            _roll_forward(kind, header, manifests, versions)
+            commit_upload(upload_key)
+            finished += 1
+            print(f"♻️  Recovered upload {upload_key} — rolled forward")
+        else:
+            orphans_removed += abort_upload(upload_key)
+            aborted += 1
+            print(f"♻️  Recovered upload {upload_key} — aborted")
+
+    return {
+        "finished": finished,
+        "aborted": aborted,
+        "orphans_removed": orphans_removed,
+    }
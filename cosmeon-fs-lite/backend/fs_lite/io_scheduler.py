@@ -0,0 +1,179 @@
+import threading
+import time
+
+# Priority classes for node I/O
+FOREGROUND = "foreground"   # client uploads / downloads
+REPAIR = "repair"           # restoring replication
+SCRUB = "scrub"             # health scans, bulk verification
+REBALANCE = "rebalance"     # over-replication cleanup, data movement
+GC = "gc"                   # reclaiming deleted and orphaned chunks
+
+IO_CLASSES = (FOREGROUND, REPAIR, SCRUB, REBALANCE, GC)
+
+MB = 1024 * 1024
+
+# Cluster-wide bandwidth per class in bytes/sec (None = unlimited)
+DEFAULT_CLASS_LIMITS = {
+    FOREGROUND: None,
+    REPAIR: 20 * MB,
+    SCRUB: 10 * MB,
+    REBALANCE: 5 * MB,
+    GC: 4 * MB,  # deletes are charged a nominal cost each, see garbage_collector
+}
+
+# Bandwidth each node can sustain, shared by all classes (None = unlimited).
+# Foreground I/O is charged against it without waiting, so background work
+# only gets what clients leave over.
+DEFAULT_NODE_LIMIT = 100 * MB
+
+# How much unused bandwidth a bucket may save up, in seconds of its rate
+BURST_SECONDS = 1.0
+
+# How far foreground traffic may overdraw a node bucket, in seconds of its rate
+MAX_DEBT_SECONDS = 2.0
+
+
+class TokenBucket:
+    """
+    Byte-rate limiter. reserve() takes tokens immediately (possibly going
+    into debt) and returns how long the caller must wait, so concurrent
+    callers queue up fairly without holding the lock while sleeping.
+    """
+
+    def __init__(self, rate: float = None):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.tokens = self._burst()
+        self.updated = time.monotonic()
+
+    def _burst(self) -> float:
+        return (self.rate or 0) * BURST_SECONDS
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(
+                self._burst(),
+                self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    def set_rate(self, rate: float = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.tokens = min(self.tokens, self._burst())
+
+    def reserve(self, nbytes: int) -> float:
+        """Take nbytes of tokens; returns seconds to wait before using them."""
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill(time.monotonic())
+            self.tokens -= nbytes
+            return max(0.0, -self.tokens / self.rate)
+
+    def charge(self, nbytes: int):
+        """Take tokens without waiting (foreground traffic)."""
+        with self._lock:
+            if not self.rate:
+                return
+            self._refill(time.monotonic())
+            self.tokens = max(
+                self.tokens - nbytes,
+                -self.rate * MAX_DEBT_SECONDS
+            )
+
+
+class IOScheduler:
+    """
+    Sits in front of node reads and writes.
+    - Foreground I/O never waits on node buckets; it only charges them.
+    - Background classes wait for both their class bucket and the node's
+      bucket, so they slow down automatically while clients are busy.
+    Limits can be changed at runtime.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._class_buckets = {
+            io_class: TokenBucket(limit)
+            for io_class, limit in DEFAULT_CLASS_LIMITS.items()
+        }
+        self._node_buckets = {}
+        self._node_limits = {}
+        self.default_node_limit = DEFAULT_NODE_LIMIT
+        self._stats = {
+            io_class: {"bytes": 0, "ops": 0, "throttled_seconds": 0.0}
+            for io_class in IO_CLASSES
+        }
+
+    def _node_bucket(self, node_id: str) -> TokenBucket:
+        with self._lock:
+            if node_id not in self._node_buckets:
+                self._node_buckets[node_id] = TokenBucket(
+                    self._node_limits.get(node_id, self.default_node_limit)
+                )
+            return self._node_buckets[node_id]
+
+    def acquire(self, io_class: str, node_id: str, nbytes: int):
+        """Block until nbytes of I/O of this class may hit this node."""
+        if io_class not in self._class_buckets:
+            raise ValueError(f"Unknown I/O class: {io_class}")
+
+        class_wait = self._class_buckets[io_class].reserve(nbytes)
+
+        node_bucket = self._node_bucket(node_id)
+        if io_class == FOREGROUND:
+            node_bucket.charge(nbytes)
+            wait = class_wait
+        else:
+            wait = max(class_wait, node_bucket.reserve(nbytes))
+
+        if wait > 0:
+            time.sleep(wait)
+
+        with self._lock:
+            stats = self._stats[io_class]
+            stats["bytes"] += nbytes
+            stats["ops"] += 1
+            stats["throttled_seconds"] += wait
+
+    def set_class_limit(self, io_class: str, bytes_per_sec: float = None):
+        if io_class not in self._class_buckets:
+            raise ValueError(f"Unknown I/O class: {io_class}")
+        self._class_buckets[io_class].set_rate(bytes_per_sec)
+
+    def set_node_limit(self, node_id: str, bytes_per_sec: float = None):
+        with self._lock:
+            self._node_limits[node_id] = bytes_per_sec
+        self._node_bucket(node_id).set_rate(bytes_per_sec)
+
+    def get_limits(self) -> dict:
+        with self._lock:
+            return {
+                "classes": {
+                    io_class: bucket.rate
+                    for io_class, bucket in self._class_buckets.items()
+                },
+                "nodes": {
+                    **{
+                        node_id: bucket.rate
+                        for node_id, bucket in self._node_buckets.items()
+                    },
+                    **self._node_limits,
+                },
+                "default_node_limit": self.default_node_limit,
+            }
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                io_class: {
+                    **stats,
+                    "throttled_seconds": round(stats["throttled_seconds"], 3)
+                }
+                for io_class, stats in self._stats.items()
+            }
+
+
+scheduler = IOScheduler()
@@ -0,0 +1,162 @@
+import hashlib
+import zlib
+
+# ─────────────────────────────────────────────────────────
+# FILE MERKLE TREE
+# ─────────────────────────────────────────────────────────
+# Leaves are the chunk SHA-256 hashes, in chunk order. An odd node at the
+# end of a level is promoted unchanged. Internal nodes are prefixed with
+# 0x01 so they can never be confused with a leaf.
+
+
+def _parent(left: str, right: str) -> str:
+    return hashlib.sha256(
+        b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)
+    ).hexdigest()
+
+
+def build_tree(leaf_hashes: list) -> list:
+    """All levels of the tree, leaves first, root last."""
+    if not leaf_hashes:
+        return [[hashlib.sha256(b"").hexdigest()]]
+
+    levels = [list(leaf_hashes)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [
+            _parent(level[i], level[i + 1])
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(leaf_hashes: list) -> str:
+    return build_tree(leaf_hashes)[-1][0]
+
+
+def inclusion_proof(levels: list, index: int) -> list:
+    """Sibling hashes from leaf to root for the leaf at index."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                "hash": level[sibling],
+                "side": "left" if sibling < index else "right",
+            })
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf_hash: str, proof: list, root: str) -> bool:
+    node = leaf_hash
+    for step in proof:
+        if step["side"] == "left":
+            node = _parent(step["hash"], node)
+        else:
+            node = _parent(node, step["hash"])
+    return node == root
+
+
+def update_leaves(levels: list, changes: dict) -> list:
+    """
+    Apply {index: new_leaf_hash} and recompute only the paths above the
+    changed leaves. Leaves may also be appended (index == len); the new
+    right edge is hashed, the rest of the tree is reused. Returns new
+    levels; the input is not modified.
+    """
+    leaves = list(levels[0])
+    for index in sorted(changes):
+        if index < len(leaves):
+            leaves[index] = changes[index]
+        elif index == len(leaves):
+            leaves.append(changes[index])
+        else:
+            raise ValueError(f"Leaf index {index} leaves a gap")
+
+    new_levels = [leaves]
+    dirty = set(changes)
+    depth = 1
+    while len(new_levels[-1]) > 1:
+        below = new_levels[-1]
+        # Appends only grow a level; its new slots all sit above dirty nodes
+        level = list(levels[depth]) if depth < len(levels) else []
+        level.extend([None] * ((len(below) + 1) // 2 - len(level)))
+        parents_dirty = set()
+        for i in dirty:
+            p = i // 2
+            left = 2 * p
+            if left + 1 < len(below):
+                level[p] = _parent(below[left], below[left + 1])
+            else:
+                level[p] = below[left]
+            parents_dirty.add(p)
+        new_levels.append(level)
+        dirty = parents_dirty
+        depth += 1
+    return new_levels
+
+
+# ─────────────────────────────────────────────────────────
+# NODE DIGEST
+# ─────────────────────────────────────────────────────────
+# Rolled-up summary of what a node holds. Chunks fall into fixed buckets;
+# each bucket digest is the XOR of its entries' hashes, so adding or
+# removing a chunk is O(1). A small Merkle tree over the buckets lets two
+# digests be compared top-down, descending only into differing subtrees.
+
+NODE_DIGEST_BUCKETS = 64
+
+
+def bucket_of(chunk_id: str) -> int:
+    return zlib.crc32(chunk_id.encode("utf-8")) % NODE_DIGEST_BUCKETS
+
+
+def _entry_value(chunk_id: str, size: int) -> int:
+    digest = hashlib.sha256(f"{chunk_id}:{size}".encode("utf-8")).digest()
+    return int.from_bytes(digest, "big")
+
+
+class NodeDigest:
+
+    def __init__(self):
+        self.buckets = [0] * NODE_DIGEST_BUCKETS
+
+    def toggle(self, chunk_id: str, size: int):
+        """Add an entry, or remove it if already present (XOR)."""
+        self.buckets[bucket_of(chunk_id)] ^= _entry_value(chunk_id, size)
+
+    def bucket_hashes(self) -> list:
+        return [f"{b:064x}" for b in self.buckets]
+
+    def levels(self) -> list:
+        return build_tree(self.bucket_hashes())
+
+    def root(self) -> str:
+        return self.levels()[-1][0]
+
+
+def diverging_buckets(a_levels: list, b_levels: list) -> tuple:
+    """
+    Compare two bucket trees from the root down.
+    Returns (bucket indices that differ, number of tree nodes compared).
+    """
+    compared = 1
+    if a_levels[-1][0] == b_levels[-1][0]:
+        return [], compared
+
+    frontier = [0]
+    for depth in range(len(a_levels) - 2, -1, -1):
+        next_frontier = []
+        for p in frontier:
+            for child in (2 * p, 2 * p + 1):
+                if child >= len(a_levels[depth]):
+                    continue
+                compared += 1
+                if a_levels[depth][child] != b_levels[depth][child]:
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return frontier, compared
@@ -1,85 +1,373 @@
 import os
 import json
+import threading
+import time
+
+from fs_lite.durability import atomic_write
+from fs_lite.compact_manifest import CompactManifest
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 METADATA_DIR = os.path.join(BASE_DIR, "metadata")
 METADATA_FILE = os.path.join(METADATA_DIR, "metadata.json")
+# Superseded manifest versions, kept readable until garbage-collected
+VERSIONS_FILE = os.path.join(METADATA_DIR, "versions.json")
+# Deleted files whose chunks are still being reclaimed
+TOMBSTONES_FILE = os.path.join(METADATA_DIR, "tombstones.json")
+
+# Manifest keys beyond the core set that are persisted when present
+OPTIONAL_MANIFEST_FIELDS = (
+    "full_hash_scheme", "parts", "checksums", "merkle_root", "version",
+    "tier", "read_replicas",
+)
+
+# Serialises read-modify-write cycles on metadata.json
+_lock = threading.RLock()
 
+# Parsed compact manifests, reused until metadata.json changes
+_cache = {"signature": None, "manifests": {}}
 
-def _load_all() -> dict:
+# Bumped on every metadata write from this process
+_generation = 0
+
+
+def _load_all(path: str = None) -> dict:
     """Load entire metadata JSON. Returns empty dict if file doesn't exist."""
-    if not os.path.exists(METADATA_FILE):
+    path = path or METADATA_FILE
+    if not os.path.exists(path):
         return {}
-    with open(METADATA_FILE, "r") as f:
+    with open(path, "r") as f:
         return json.load(f)
 
 
-def _save_all(data: dict):
-    """Save entire metadata JSON."""
+def _save_all(data: dict, path: str = None):
+    """
+    Save entire metadata JSON atomically (temp file + fsync + rename),
+    so a crash never leaves a truncated metadata.json behind.
+    """
+    global _generation
+    path = path or METADATA_FILE
     os.makedirs(METADATA_DIR, exist_ok=True)
-    with open(METADATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    if path == METADATA_FILE:
+        _cache["signature"] = None
+    atomic_write(path, json.dumps(data, indent=2).encode("utf-8"))
+    _generation += 1
 
 
-def save_manifest(manifest: dict):
+def _signature(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def metadata_signature() -> tuple:
     """
-    Save a file manifest to metadata store.
-    Strips raw chunk data (bytes) before saving — only metadata is stored.
+    Changes whenever current or archived manifests change, so callers can
+    cache values derived from them.
     """
-    all_data = _load_all()
+    return (_generation, _signature(METADATA_FILE), _signature(VERSIONS_FILE))
 
-    # Clean copy — remove raw bytes from chunks before saving
-    clean_manifest = {
+
+def _compact_manifests() -> dict:
+    """
+    file_id → CompactManifest for every current file. Shared and cached:
+    treat as read-only; use get_manifest() for a copy to modify.
+    """
+    with _lock:
+        signature = _signature(METADATA_FILE)
+        if signature is None or signature != _cache["signature"]:
+            _cache["manifests"] = {
+                file_id: CompactManifest.from_record(record)
+                for file_id, record in _load_all().items()
+            }
+            _cache["signature"] = signature
+        return _cache["manifests"]
+
+
+def _to_record(manifest: dict, previous: dict = None) -> dict:
+    """
+    Stored form of a manifest: known header fields plus a packed chunk
+    table. Raw chunk bytes and transient keys are dropped.
+    The Merkle tree is stored too: taken from "merkle_levels" when the
+    caller has it, reused from the previous record when only placements
+    changed, and built from the chunk hashes otherwise.
+    """
+    header = {
         "file_id": manifest["file_id"],
         "file_name": manifest["file_name"],
         "file_size": manifest["file_size"],
         "total_chunks": manifest["total_chunks"],
         "chunk_size": manifest["chunk_size"],
         "full_hash": manifest["full_hash"],
-        "chunks": [
-            {
-                "id": c["id"],
-                "index": c["index"],
-                "size": c["size"],
-                "hash": c["hash"],
-                "primary_node": c.get("primary_node", ""),
-                "replica_node": c.get("replica_node", "")
-            }
-            for c in manifest["chunks"]
-        ]
     }
+    for key in OPTIONAL_MANIFEST_FIELDS:
+        if key in manifest:
+            header[key] = manifest[key]
+    compact = CompactManifest.from_dict({**header, "chunks": manifest["chunks"]})
 
-    all_data[manifest["file_id"]] = clean_manifest
-    _save_all(all_data)
+    if "merkle_levels" in manifest:
+        compact.set_merkle_levels(manifest["merkle_levels"])
+    elif previous is not None:
+        stored = CompactManifest.from_record(previous)
+        if stored.hashes == compact.hashes:
+            compact.tree = stored.tree
+    if compact.tree is None:
+        compact.set_merkle_levels(compact.merkle_levels())
+    return compact.to_record()
+
+
+def save_manifest(manifest: dict):
+    """
+    Save a file manifest to metadata store.
+    Strips raw chunk data (bytes) before saving — only metadata is stored.
+    """
+    clean_manifest = _to_record(manifest)
+
+    with _lock:
+        all_data = _load_all()
+        all_data[manifest["file_id"]] = clean_manifest
+        _save_all(all_data)
     print(f"💾 Manifest saved for file: {manifest['file_name']} (ID: {manifest['file_id']})")
 
 
-def get_manifest(file_id: str) -> dict:
-    """Retrieve a manifest by file ID."""
-    all_data = _load_all()
-    if file_id not in all_data:
+def save_manifests(manifests: list):
+    """save_manifest for many new files in one metadata commit."""
+    if not manifests:
+        return
+    records = [_to_record(m) for m in manifests]
+
+    with _lock:
+        all_data = _load_all()
+        for manifest, record in zip(manifests, records):
+            all_data[manifest["file_id"]] = record
+        _save_all(all_data)
+    print(f"💾 Manifests saved in one commit: {len(manifests)} files")
+
+
+def get_compact_manifest(file_id: str) -> CompactManifest:
+    """Packed manifest for read-only use (shared — do not modify)."""
+    compact = _compact_manifests().get(file_id)
+    if compact is None:
         raise ValueError(f"No file found with ID: {file_id}")
-    return all_data[file_id]
+    return compact
+
+
+def get_manifest(file_id: str) -> dict:
+    """Retrieve a manifest by file ID (a fresh dict the caller may modify)."""
+    return get_compact_manifest(file_id).to_dict()
+
+
+def list_compact_manifests() -> list:
+    """All packed manifests, for passes that only need IDs and placements."""
+    return list(_compact_manifests().values())
+
+
+def list_manifests() -> list:
+    """All manifests as dicts."""
+    return [compact.to_dict() for compact in _compact_manifests().values()]
+
+
+def file_versions() -> dict:
+    """file_id → current version of every file, from one read of metadata.json."""
+    with _lock:
+        return {file_id: record.get("version", 1) for file_id, record in _load_all().items()}
 
 
 def list_files() -> list:
     """List all uploaded files."""
-    all_data = _load_all()
     return [
         {
-            "file_id": v["file_id"],
-            "file_name": v["file_name"],
-            "file_size": v["file_size"],
-            "total_chunks": v["total_chunks"]
+            "file_id": m.header["file_id"],
+            "file_name": m.header["file_name"],
+            "file_size": m.header["file_size"],
+            "total_chunks": m.header["total_chunks"]
         }
-        for v in all_data.values()
+        for m in _compact_manifests().values()
     ]
 
 
+def update_manifest(manifest: dict) -> bool:
+    """
+    Save placement changes (repair, cleanup) made to a manifest read earlier.
+    Skipped if the file was deleted or updated to a newer version meanwhile,
+    so background passes never resurrect or roll back a file.
+    """
+    return bool(update_manifests([manifest]))
+
+
+def update_manifests(manifests: list) -> list:
+    """
+    update_manifest for many files in one metadata commit.
+    Returns the IDs actually saved.
+    """
+    saved = []
+    with _lock:
+        all_data = _load_all()
+        for manifest in manifests:
+            current = all_data.get(manifest["file_id"])
+            if current is None or current.get("version", 1) != manifest.get("version", 1):
+                print(f"⏭️  Manifest changed meanwhile, not saved: {manifest['file_id']}")
+                continue
+            all_data[manifest["file_id"]] = _to_record(manifest, current)
+            saved.append(manifest["file_id"])
+        if saved:
+            _save_all(all_data)
+    if len(saved) > 1:
+        print(f"💾 Manifests saved in one commit: {len(saved)} files")
+    elif saved:
+        print(f"💾 Manifest updated for file: {saved[0]}")
+    return saved
+
+
 def delete_manifest(file_id: str):
     """Remove a file manifest."""
-    all_data = _load_all()
-    if file_id in all_data:
+    with _lock:
+        all_data = _load_all()
+        if file_id not in all_data:
+            return
+        del all_data[file_id]
+        _save_all(all_data)
+    print(f"🗑️  Manifest deleted: {file_id}")
+
+
+# ─────────────────────────────────────────────────────────
+# MANIFEST VERSIONS
+# ─────────────────────────────────────────────────────────
+
+def save_new_version(manifest: dict, expected_version: int):
+    """
+    Replace a file's manifest with a new version, archiving the current one.
+    Fails if the current version isn't expected_version (concurrent update).
+    """
+    with _lock:
+        all_data = _load_all()
+        current = all_data.get(manifest["file_id"])
+        if current is None:
+            raise ValueError(f"No file found with ID: {manifest['file_id']}")
+        if current.get("version", 1) != expected_version:
+            raise RuntimeError(
+                f"File {manifest['file_id']} changed concurrently "
+                f"(expected version {expected_version})"
+            )
+
+        # Archive first: a crash in between leaves a duplicate, never a loss
+        versions = _load_all(VERSIONS_FILE)
+        versions.setdefault(manifest["file_id"], []).append(current)
+        _save_all(versions, VERSIONS_FILE)
+
+        save_manifest(manifest)
+
+
+def get_manifest_version(file_id: str, version: int) -> dict:
+    """A specific version — the current manifest or an archived one."""
+    current = get_manifest(file_id)
+    if current.get("version", 1) == version:
+        return current
+    for archived in _load_all(VERSIONS_FILE).get(file_id, []):
+        if archived.get("version", 1) == version:
+            return CompactManifest.from_record(archived).to_dict()
+    raise ValueError(f"No version {version} of file {file_id}")
+
+
+def list_archived_compact() -> list:
+    """Every superseded manifest version, across all files, packed."""
+    return [
+        CompactManifest.from_record(record)
+        for versions in _load_all(VERSIONS_FILE).values()
+        for record in versions
+    ]
+
+
+def list_archived_manifests() -> list:
+    """Every superseded manifest version, across all files."""
+    return [compact.to_dict() for compact in list_archived_compact()]
+
+
+def list_versions(file_id: str) -> list:
+    """Summary of every readable version, oldest first."""
+    current = get_compact_manifest(file_id).header
+    archived = _load_all(VERSIONS_FILE).get(file_id, [])
+    return [
+        {
+            "version": m.get("version", 1),
+            "file_size": m["file_size"],
+            "total_chunks": m["total_chunks"],
+            "full_hash": m["full_hash"],
+            "current": m is current,
+        }
+        for m in archived + [current]
+    ]
+
+
+# ─────────────────────────────────────────────────────────
+# DELETION
+# ─────────────────────────────────────────────────────────
+
+def mark_deleted(file_id: str) -> dict:
+    """
+    Remove a file and all its versions from metadata and leave a tombstone
+    listing their chunks for the garbage collector. No chunk is touched.
+    """
+    with _lock:
+        all_data = _load_all()
+        if file_id not in all_data:
+            raise ValueError(f"No file found with ID: {file_id}")
+        versions = _load_all(VERSIONS_FILE)
+        manifests = versions.get(file_id, []) + [all_data[file_id]]
+
+        chunk_ids = sorted({
+            chunk_id
+            for record in manifests
+            for chunk_id in CompactManifest.from_record(record).iter_chunk_ids()
+        })
+        tombstone = {
+            "file_id": file_id,
+            "file_name": all_data[file_id]["file_name"],
+            "deleted_at": time.time(),
+            "chunks": chunk_ids,
+        }
+
+        # Metadata first: a crash before the tombstone is written only
+        # leaves orphans, which the sweep reclaims
         del all_data[file_id]
         _save_all(all_data)
-        print(f"🗑️  Manifest deleted: {file_id}")
\ No newline at end of file
+        if file_id in versions:
+            del versions[file_id]
+            _save_all(versions, VERSIONS_FILE)
+
+        tombstones = _load_all(TOMBSTONES_FILE)
+        tombstones[file_id] = tombstone
+        _save_all(tombstones, TOMBSTONES_FILE)
+
+    print(f"🪦 File marked deleted: {file_id} ({len(chunk_ids)} chunks to reclaim)")
+    return tombstone
+
+
+def list_tombstones() -> list:
+    return list(_load_all(TOMBSTONES_FILE).values())
+
+
+def remove_tombstone(file_id: str):
+    with _lock:
+        tombstones = _load_all(TOMBSTONES_FILE)
+        if tombstones.pop(file_id, None) is not None:
+            _save_all(tombstones, TOMBSTONES_FILE)
+
+
+def prune_versions(keep: int) -> int:
+    """
+    Drop all but the newest `keep` archived versions of each file.
+    Chunks only they referenced become orphans for the sweep.
+    """
+    pruned = 0
+    with _lock:
+        versions = _load_all(VERSIONS_FILE)
+        for file_id, archived in versions.items():
+            if len(archived) > keep:
+                pruned += len(archived) - keep
+                versions[file_id] = archived[len(archived) - keep:] if keep else []
+        if pruned:
+            versions = {k: v for k, v in versions.items() if v}
+            _save_all(versions, VERSIONS_FILE)
+    return pruned
@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+from fs_lite.chunk_engine import split_stream, composite_hash, CHUNK_SIZE
+from fs_lite.hashing import (
+    DEFAULT_CHECKSUM_POLICY,
+    checksum_info,
+    parse_checksum_policy,
+)
+from fs_lite.distributor import distribute_chunks
+from fs_lite.durability import atomic_write
+from fs_lite.merkle import merkle_root
+from fs_lite.intent_log import commit_upload, abort_upload
+from fs_lite.metadata_store import METADATA_DIR, save_manifest
+from fs_lite.node_manager import delete_chunk_from_node
+
+# One JSON state file per open multipart upload
+MULTIPART_DIR = os.path.join(METADATA_DIR, "multipart")
+
+MAX_PART_NUMBER = 10000
+
+# An upload with no part committed for this long is abandoned; the GC
+# sweep discards it and its part chunks
+MULTIPART_TTL_SECONDS = 24 * 3600
+
+_lock = threading.Lock()
+
+
+def _state_path(upload_id: str) -> str:
+    return os.path.join(MULTIPART_DIR, f"{upload_id}.json")
+
+
+def _load_state(upload_id: str) -> dict:
+    path = _state_path(upload_id)
+    if not os.path.exists(path):
+        raise ValueError(f"No multipart upload found with ID: {upload_id}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_state(state: dict):
+    os.makedirs(MULTIPART_DIR, exist_ok=True)
+    atomic_write(
+        _state_path(state["upload_id"]),
+        json.dumps(state, indent=2).encode("utf-8")
+    )
+
+
+def _delete_part_chunks(part: dict):
+    for chunk in part["chunks"]:
+        for node_id in (chunk["primary_node"], chunk["replica_node"]):
+            if node_id:
+                delete_chunk_from_node(node_id, chunk["id"])
+
+
+def initiate_upload(file_name: str, checksum: str = DEFAULT_CHECKSUM_POLICY) -> dict:
+    """Open a multipart upload. The upload ID becomes the final file ID."""
+    parse_checksum_policy(checksum)  # validate up front
+
+    upload_id = str(uuid.uuid4())[:8]
+    state = {
+        "upload_id": upload_id,
+        "file_name": file_name,
+        "chunk_size": CHUNK_SIZE,
+        "checksum": checksum,
+        "created_at": time.time(),
+        "parts": {},
+    }
+    with _lock:
+        _save_state(state)
+
+    print(f"📨 Multipart upload started: {file_name} (ID: {upload_id})")
+    return {"upload_id": upload_id, "file_name": file_name}
+
+
+def upload_part(upload_id: str, part_number: int, stream) -> dict:
+    """
+    Chunk, hash and place one part as soon as it arrives.
+    Parts may arrive concurrently and in any order; re-sending a part
+    replaces the previous copy.
+    """
+    if not 1 <= part_number <= MAX_PART_NUMBER:
+        raise RuntimeError(f"Part number must be between 1 and {MAX_PART_NUMBER}")
+
+    state = _load_state(upload_id)
+
+    # Unique per attempt, so a retried part never overwrites committed chunks
+    part_key = f"{upload_id}_p{part_number}_{uuid.uuid4().hex[:6]}"
+    owner = {"upload_id": upload_id, "part_number": part_number}
+
+    part_manifest = split_stream(
+        stream,
+        f"part_{part_number}",
+        chunk_size=state["chunk_size"],
+        file_id=part_key,
+        checksum=state.get("checksum", DEFAULT_CHECKSUM_POLICY),
+    )
+    part_manifest = distribute_chunks(part_manifest, intent_kind="part", intent_owner=owner)
+
+    try:
+        part = record_part(owner, part_manifest)
+    except Exception:
+        abort_upload(part_key)
+        raise
+    commit_upload(part_key)
+
+    return {
+        "upload_id": upload_id,
+        "part_number": part_number,
+        "size": part["size"],
+        "hash": part["hash"],
+        "total_chunks": len(part["chunks"]),
+    }
+
+
+def record_part(owner: dict, part_manifest: dict) -> dict:
+    """Commit a distributed part into the upload state."""
+    part = {
+        "part_number": owner["part_number"],
+        "part_key": part_manifest["file_id"],
+        "size": part_manifest["file_size"],
+        "hash": part_manifest["full_hash"],
+        "chunks": [
+            {
+                "id": c["id"],
+                "size": c["size"],
+                "hash": c["hash"],
+                **({"fast_hash": c["fast_hash"]} if "fast_hash" in c else {}),
+                "primary_node": c.get("primary_node", ""),
+                "replica_node": c.get("replica_node", ""),
+            }
+            for c in sorted(part_manifest["chunks"], key=lambda c: c["index"])
+        ],
+    }
+
+    with _lock:
+        state = _load_state(owner["upload_id"])
+        replaced = state["parts"].get(str(owner["part_number"]))
+        state["parts"][str(owner["part_number"])] = part
+        state["updated_at"] = time.time()
+        _save_state(state)
+
+    if replaced and replaced["part_key"] != part["part_key"]:
+        _delete_part_chunks(replaced)
+
+    print(
+        f"🧩 Part {owner['part_number']} committed for upload "
+        f"{owner['upload_id']} ({len(part['chunks'])} chunks)"
+    )
+    return part
+
+
+def is_part_committed(owner: dict, part_key: str) -> bool:
+    try:
+        state = _load_state(owner["upload_id"])
+    except ValueError:
+        return False
+    part = state["parts"].get(str(owner["part_number"]))
+    return part is not None and part["part_key"] == part_key
+
+
+def list_part_chunk_ids() -> set:
+    """Chunks held by committed parts of every open upload (live for GC)."""
+    chunk_ids = set()
+    if not os.path.exists(MULTIPART_DIR):
+        return chunk_ids
+    for name in os.listdir(MULTIPART_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            state = _load_state(name[:-len(".json")])
+        except (ValueError, json.JSONDecodeError):
+            continue
+        for part in state["parts"].values():
+            chunk_ids.update(c["id"] for c in part["chunks"])
+    return chunk_ids
+
+
+def get_upload_status(upload_id: str) -> dict:
+    """Which parts are already committed — lets a client resume."""
+    state = _load_state(upload_id)
+    parts = sorted(state["parts"].values(), key=lambda p: p["part_number"])
+    return {
+        "upload_id": upload_id,
+        "file_name": state["file_name"],
+        "parts": [
+            {"part_number": p["part_number"], "size": p["size"], "hash": p["hash"]}
+            for p in parts
+        ],
+        "committed_bytes": sum(p["size"] for p in parts),
+    }
+
+
+def complete_upload(upload_id: str, part_numbers: list = None) -> dict:
+    """
+    Assemble the final manifest from the part manifests — no chunk data is
+    reread. Parts not listed are discarded.
+    """
+    with _lock:
+        state = _load_state(upload_id)
+
+        available = {int(n): p for n, p in state["parts"].items()}
+        if part_numbers is None:
+            part_numbers = sorted(available)
+
+        if not part_numbers:
+            raise RuntimeError("Cannot complete an upload with no parts")
+
+        missing = [n for n in part_numbers if n not in available]
+        if missing:
+            raise RuntimeError(f"Parts not uploaded: {missing}")
+
+        if part_numbers != sorted(set(part_numbers)):
+            raise RuntimeError("Part numbers must be unique and ascending")
+
+        chunks = []
+        parts = []
+        for n in part_numbers:
+            part = available[n]
+            parts.append({
+                "part_number": n,
+                "size": part["size"],
+                "hash": part["hash"],
+                "chunk_count": len(part["chunks"]),
+            })
+            for c in part["chunks"]:
+                chunks.append({**c, "index": len(chunks)})
+
+        manifest = {
+            "file_id": upload_id,
+            "file_name": state["file_name"],
+            "file_size": sum(p["size"] for p in parts),
+            "total_chunks": len(chunks),
+            "chunk_size": state["chunk_size"],
+            "full_hash": composite_hash([p["hash"] for p in parts]),
+            "full_hash_scheme": "multipart",
+            "checksums": checksum_info(
+                parse_checksum_policy(state.get("checksum", DEFAULT_CHECKSUM_POLICY))
+            ),
+            "merkle_root": merkle_root([c["hash"] for c in chunks]),
+            "parts": parts,
+            "chunks": chunks,
+        }
+
+        save_manifest(manifest)
+        os.remove(_state_path(upload_id))
+
+    for n, part in available.items():
+        if n not in part_numbers:
+            _delete_part_chunks(part)
+
+    return manifest
+
+
+def reap_stale_uploads(ttl_seconds: float = MULTIPART_TTL_SECONDS) -> int:
+    """
+    Abort every upload with no activity (initiate or part commit) for
+    ttl_seconds. Returns how many were discarded.
+    """
+    if not os.path.exists(MULTIPART_DIR):
+        return 0
+    cutoff = time.time() - ttl_seconds
+    reaped = 0
+    for name in os.listdir(MULTIPART_DIR):
+        if not name.endswith(".json"):
+            continue
+        upload_id = name[:-len(".json")]
+        with _lock:
+            try:
+                state = _load_state(upload_id)
+            except (ValueError, json.JSONDecodeError):
+                continue
+            if state.get("updated_at", state["created_at"]) >= cutoff:
+                continue
+            os.remove(_state_path(upload_id))
+
+        for part in state["parts"].values():
+            _delete_part_chunks(part)
+        reaped += 1
+        print(f"⌛ Multipart upload expired: {upload_id} ({len(state['parts'])} parts)")
+    return reaped
+
+
+def abort_multipart_upload(upload_id: str) -> dict:
+    """Discard an upload and every chunk its parts placed."""
+    with _lock:
+        state = _load_state(upload_id)
+        os.remove(_state_path(upload_id))
+
+    for part in state["parts"].values():
+        _delete_part_chunks(part)
+
+    print(f"🗑️  Multipart upload aborted: {upload_id}")
+    return {"upload_id": upload_id, "aborted_parts": len(state["parts"])}
@@ -1,4 +1,13 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fs_lite.durability import group_commit, temp_path_for, TEMP_SUFFIX
+from fs_lite.io_scheduler import scheduler, FOREGROUND
+from fs_lite.hashing import sha256_hex
+from fs_lite.merkle import NodeDigest, bucket_of
+from fs_lite.failure_detector import detector
 
 # Path to the 4 satellite node folders
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,58 +19,171 @@ MAX_STORAGE_MB = 5
 MAX_STORAGE_BYTES = MAX_STORAGE_MB * 1024 * 1024
 
 
-def _get_used_storage(node_path: str) -> int:
-    """Calculate total used storage in bytes for a node."""
-    total = 0
+# In-memory view of the nodes, kept current by every write/delete that goes
+# through this module. Serving /nodes, capacity checks and live events from
+# it means no directory walk per request.
+_state_lock = threading.RLock()
+_chunk_index = None   # node_id → {chunk_id: size_bytes}
+_statuses = None      # node_id → "ONLINE" / "OFFLINE" (operator setting)
+_digests = None       # node_id → NodeDigest of (chunk_id, size) held
+_used_bytes = None    # node_id → sum of _chunk_index sizes, kept running
+_state_version = 0    # bumped on every change, for change detection
+
+
+def _scan_node(node_path: str) -> dict:
+    """List a node directory once: chunk_id → size."""
+    chunks = {}
     if os.path.exists(node_path):
         for f in os.listdir(node_path):
             if not f.startswith("."):
                 file_path = os.path.join(node_path, f)
                 if os.path.isfile(file_path):
-                    total += os.path.getsize(file_path)
-    return total
+                    chunks[f] = os.path.getsize(file_path)
+    return chunks
+
+
+def _read_status_file(node_id: str) -> str:
+    status_file = os.path.join(NODES_DIR, node_id, ".status")
+    if os.path.exists(status_file):
+        with open(status_file, "r") as f:
+            return f.read().strip()
+    return "ONLINE"
+
+
+def refresh_node_state():
+    """Rebuild the in-memory node view from disk (startup, reset)."""
+    global _chunk_index, _statuses, _digests, _used_bytes, _state_version
+    index = {
+        node_id: _scan_node(os.path.join(NODES_DIR, node_id))
+        for node_id in NODE_IDS
+    }
+    statuses = {node_id: _read_status_file(node_id) for node_id in NODE_IDS}
+    digests = {}
+    for node_id, chunks in index.items():
+        digests[node_id] = NodeDigest()
+        for chunk_id, size in chunks.items():
+            digests[node_id].toggle(chunk_id, size)
+    with _state_lock:
+        _chunk_index = index
+        _statuses = statuses
+        _digests = digests
+        _used_bytes = {node_id: sum(chunks.values()) for node_id, chunks in index.items()}
+        _state_version += 1
+
+
+def _ensure_state():
+    if _chunk_index is None:
+        refresh_node_state()
+
+
+def get_state_version() -> int:
+    """Changes whenever node status, chunk count or usage changes."""
+    return _state_version + detector.version
+
+
+def _effective_status(node_id: str) -> str:
+    """
+    The operator's OFFLINE (the .status file) always wins; otherwise the
+    failure detector decides between ONLINE, SUSPECT and OFFLINE.
+    Call with _state_lock held.
+    """
+    if _statuses[node_id] == "OFFLINE":
+        return "OFFLINE"
+    return detector.state(node_id)
+
+
+def _index_chunk(node_id: str, chunk_id: str, size: int = None):
+    global _state_version
+    _ensure_state()
+    with _state_lock:
+        old_size = _chunk_index[node_id].pop(chunk_id, None)
+        if old_size is not None:
+            _digests[node_id].toggle(chunk_id, old_size)
+            _used_bytes[node_id] -= old_size
+        if size is not None:
+            _chunk_index[node_id][chunk_id] = size
+            _digests[node_id].toggle(chunk_id, size)
+            _used_bytes[node_id] += size
+        _state_version += 1
+
+
+def _get_used_storage(node_id: str) -> int:
+    """Total used storage in bytes for a node."""
+    _ensure_state()
+    with _state_lock:
+        return _used_bytes[node_id]
 
 
 def has_capacity(node_id: str, chunk_size: int) -> bool:
     """Check if node has enough remaining storage for a chunk."""
-    node_path = os.path.join(NODES_DIR, node_id)
-    used = _get_used_storage(node_path)
+    used = _get_used_storage(node_id)
     return (used + chunk_size) <= MAX_STORAGE_BYTES
 
 
+def get_free_bytes(node_id: str) -> int:
+    """Remaining capacity of a node in bytes."""
+    return MAX_STORAGE_BYTES - _get_used_storage(node_id)
+
+
 def get_all_nodes() -> list:
     nodes = []
 
-    for node_id in NODE_IDS:
-        node_path = os.path.join(NODES_DIR, node_id)
-        status_file = os.path.join(node_path, ".status")
-
-        if os.path.exists(status_file):
-            with open(status_file, "r") as f:
-                status = f.read().strip()
-        else:
-            status = "ONLINE"
-
-        used_storage = _get_used_storage(node_path)
-        used_mb = round(used_storage / (1024 * 1024), 2)
-
-        chunks = [
-            f for f in os.listdir(node_path)
-            if not f.startswith(".")
-        ] if os.path.exists(node_path) else []
-
-        nodes.append({
-            "node_id": node_id,
-            "status": status,
-            "chunk_count": len(chunks),
-            "used_storage_mb": used_mb,
-            "max_storage_mb": MAX_STORAGE_MB,
-            "path": node_path
-        })
+    _ensure_state()
+    with _state_lock:
+        for node_id in NODE_IDS:
+            used_storage = _used_bytes[node_id]
+            used_mb = round(used_storage / (1024 * 1024), 2)
+
+            nodes.append({
+                "node_id": node_id,
+                "status": _effective_status(node_id),
+                "chunk_count": len(_chunk_index[node_id]),
+                "used_storage_mb": used_mb,
+                "max_storage_mb": MAX_STORAGE_MB,
+                "path": os.path.join(NODES_DIR, node_id)
+            })
 
     return nodes
 
 
+def get_node_statuses() -> dict:
+    """node_id → status, without computing capacity."""
+    _ensure_state()
+    with _state_lock:
+        return {node_id: _effective_status(node_id) for node_id in NODE_IDS}
+
+
+def get_node_digest_levels(node_id: str) -> list:
+    """Bucket Merkle tree of what a node holds (leaves first, root last)."""
+    _ensure_state()
+    with _state_lock:
+        return _digests[node_id].levels()
+
+
+def get_node_chunks(node_id: str, buckets: set = None) -> dict:
+    """chunk_id → size held by a node, optionally only in some digest buckets."""
+    _ensure_state()
+    with _state_lock:
+        chunks = dict(_chunk_index[node_id])
+    if buckets is None:
+        return chunks
+    return {c: size for c, size in chunks.items() if bucket_of(c) in buckets}
+
+
+def get_chunk_size(node_id: str, chunk_id: str):
+    """Size of a chunk on a node, or None if absent (no disk access)."""
+    _ensure_state()
+    with _state_lock:
+        return _chunk_index.get(node_id, {}).get(chunk_id)
+
+
+def node_has_chunk(node_id: str, chunk_id: str) -> bool:
+    """Whether a chunk file is present on a node (no disk access)."""
+    _ensure_state()
+    with _state_lock:
+        return chunk_id in _chunk_index.get(node_id, {})
+
+
 def get_node(node_id: str) -> dict:
     for node in get_all_nodes():
         if node["node_id"] == node_id:
@@ -81,6 +203,16 @@ def set_node_status(node_id: str, status: str):
     with open(status_file, "w") as f:
         f.write(status)
 
+    global _state_version
+    _ensure_state()
+    with _state_lock:
+        _statuses[node_id] = status
+        _state_version += 1
+
+    if status == "ONLINE":
+        # Operator says it's back — start the detector from a clean slate
+        detector.reset(node_id)
+
     emoji = "🟢" if status == "ONLINE" else "🔴"
     print(f"{emoji} Node {node_id} is now {status}")
 
@@ -89,20 +221,258 @@ def get_online_nodes() -> list:
     return [n for n in get_all_nodes() if n["status"] == "ONLINE"]
 
 
-def write_chunk_to_node(node_id: str, chunk_id: str, data: bytes):
-    node_path = os.path.join(NODES_DIR, node_id)
-    chunk_path = os.path.join(node_path, chunk_id)
+def chunk_path_on_node(node_id: str, chunk_id: str) -> str:
+    return os.path.join(NODES_DIR, node_id, chunk_id)
+
+
+def stage_chunk_on_node(node_id: str, chunk_id: str, data: bytes, io_class: str = FOREGROUND) -> tuple:
+    """
+    Write chunk bytes to a hidden temp file on the node.
+    The chunk is not visible until the returned entry is committed
+    with commit_staged_chunks().
+    """
+    chunk_path = chunk_path_on_node(node_id, chunk_id)
+    tmp_path = temp_path_for(chunk_path)
+
+    scheduler.acquire(io_class, node_id, len(data))
 
-    with open(chunk_path, "wb") as f:
-        f.write(data)
+    started = time.monotonic()
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    except OSError:
+        detector.record_io(node_id, ok=False)
+        raise
+    detector.record_io(node_id, ok=True, latency=time.monotonic() - started)
 
+    return (tmp_path, chunk_path)
 
-def read_chunk_from_node(node_id: str, chunk_id: str) -> bytes:
+
+def commit_staged_chunks(entries: list):
+    """Make staged chunks durable and visible (group commit)."""
+    try:
+        group_commit.commit(entries)
+    finally:
+        for _, chunk_path in entries:
+            if chunk_path is None or not os.path.exists(chunk_path):
+                continue
+            node_path, chunk_id = os.path.split(chunk_path)
+            node_id = os.path.basename(node_path)
+            if node_id in NODE_IDS:
+                _index_chunk(node_id, chunk_id, os.path.getsize(chunk_path))
+
+
+def _copy_fd(src_fd: int, dst_fd: int, size: int) -> str:
+    """
+    Copy size bytes between file descriptors, in the kernel where possible.
+    Returns the method used: copy_file_range, sendfile or userspace.
+    """
+    for method in ("copy_file_range", "sendfile"):
+        if not hasattr(os, method):
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if method == "copy_file_range":
+                    n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                else:
+                    n = os.sendfile(dst_fd, src_fd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            # Unsupported for these files (e.g. cross-device) — rewind and fall back
+            os.lseek(src_fd, 0, os.SEEK_SET)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+            continue
+        if copied == size:
+            return method
+
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    os.ftruncate(dst_fd, 0)
+    while True:
+        data = os.read(src_fd, 1024 * 1024)
+        if not data:
+            break
+        os.write(dst_fd, data)
+    return "userspace"
+
+
+def stage_chunk_copy(
+    source_node: str,
+    target_node: str,
+    chunk_id: str,
+    expected_hash: str = None,
+    io_class: str = FOREGROUND,
+) -> tuple:
+    """
+    Stage a copy of a chunk from one node onto another without pulling it
+    through Python memory. Returns ((tmp_path, chunk_path), method); commit
+    the entry with commit_staged_chunks().
+    With expected_hash, the staged copy is read back once and checked; a
+    mismatch (corrupt source) discards it and raises RuntimeError.
+    """
+    source_path = chunk_path_on_node(source_node, chunk_id)
+    chunk_path = chunk_path_on_node(target_node, chunk_id)
+    tmp_path = temp_path_for(chunk_path)
+
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Chunk {chunk_id} not found on {source_node}")
+    size = os.path.getsize(source_path)
+
+    scheduler.acquire(io_class, source_node, size)
+    scheduler.acquire(io_class, target_node, size)
+
+    src_fd = os.open(source_path, os.O_RDONLY)
+    try:
+        dst_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            method = _copy_fd(src_fd, dst_fd, size)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    if expected_hash is not None:
+        scheduler.acquire(io_class, target_node, size)
+        with open(tmp_path, "rb") as f:
+            matches = sha256_hex(f.read()) == expected_hash
+        if not matches:
+            os.remove(tmp_path)
+            raise RuntimeError(f"Copy of {chunk_id} from {source_node} failed verification")
+
+    return (tmp_path, chunk_path), method
+
+
+def write_chunk_to_node(node_id: str, chunk_id: str, data: bytes, io_class: str = FOREGROUND):
+    commit_staged_chunks([stage_chunk_on_node(node_id, chunk_id, data, io_class)])
+
+
+def delete_chunk_from_node(node_id: str, chunk_id: str) -> bool:
+    """Remove a chunk (and any staged temp copy). Returns True if it existed."""
+    chunk_path = chunk_path_on_node(node_id, chunk_id)
+    existed = False
+
+    for path in (chunk_path, temp_path_for(chunk_path)):
+        try:
+            os.remove(path)
+            existed = existed or path == chunk_path
+        except FileNotFoundError:
+            pass
+
+    if existed:
+        _index_chunk(node_id, chunk_id, None)
+    return existed
+
+
+def discard_staged_chunk(node_id: str, chunk_id: str) -> bool:
+    """Remove a leftover temp copy only; the committed chunk is untouched."""
+    try:
+        os.remove(temp_path_for(chunk_path_on_node(node_id, chunk_id)))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def scan_node_files(node_id: str) -> list:
+    """
+    Directory listing of a node with modification times, including staged
+    temp files: [{"chunk_id", "temp", "size", "mtime"}].
+    """
+    files = []
+    node_path = os.path.join(NODES_DIR, node_id)
+    if not os.path.exists(node_path):
+        return files
+    with os.scandir(node_path) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            name = entry.name
+            temp = name.startswith(".") and name.endswith(TEMP_SUFFIX)
+            if name.startswith(".") and not temp:
+                continue  # .status and other node files
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append({
+                "chunk_id": name[1:-len(TEMP_SUFFIX)] if temp else name,
+                "temp": temp,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+            })
+    return files
+
+
+def read_chunk_from_node(node_id: str, chunk_id: str, io_class: str = FOREGROUND) -> bytes:
     node_path = os.path.join(NODES_DIR, node_id)
     chunk_path = os.path.join(node_path, chunk_id)
 
     if not os.path.exists(chunk_path):
         raise FileNotFoundError(f"Chunk {chunk_id} not found on {node_id}")
 
-    with open(chunk_path, "rb") as f:
-        return f.read()
\ No newline at end of file
+    scheduler.acquire(io_class, node_id, os.path.getsize(chunk_path))
+
+    started = time.monotonic()
+    try:
+        with open(chunk_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        raise
+    except OSError:
+        detector.record_io(node_id, ok=False)
+        raise
+    detector.record_io(node_id, ok=True, latency=time.monotonic() - started)
+    return data
+
+
+# ─────────────────────────────────────────────────────────
+# LIVENESS PROBES
+# ─────────────────────────────────────────────────────────
+
+# Probes run on their own threads: a hung node ties up its probe, never
+# the caller. A node whose previous probe is still running is not probed
+# again — its silence is what the detector notices.
+_probe_pool = ThreadPoolExecutor(max_workers=len(NODE_IDS), thread_name_prefix="probe")
+_outstanding_probes = {}
+
+
+def _probe_node(node_id: str) -> bool:
+    """Cheap liveness check: the node directory answers a stat and a listing."""
+    node_path = os.path.join(NODES_DIR, node_id)
+    try:
+        os.stat(node_path)
+        with os.scandir(node_path) as entries:
+            next(entries, None)
+        return True
+    except OSError:
+        return False
+
+
+def _on_probe_done(node_id: str, future):
+    if not future.cancelled() and future.exception() is None and future.result():
+        detector.heartbeat(node_id)
+    else:
+        detector.record_io(node_id, ok=False)
+
+
+def probe_all_nodes() -> list:
+    """
+    Probe every node the operator hasn't taken OFFLINE, then re-evaluate the
+    detector. Returns its state transitions.
+    """
+    _ensure_state()
+    with _state_lock:
+        targets = [n for n in NODE_IDS if _statuses[n] != "OFFLINE"]
+
+    for node_id in targets:
+        previous = _outstanding_probes.get(node_id)
+        if previous is not None and not previous.done():
+            continue  # still hanging
+        future = _probe_pool.submit(_probe_node, node_id)
+        _outstanding_probes[node_id] = future
+        future.add_done_callback(lambda f, n=node_id: _on_probe_done(n, f))
+
+    return detector.evaluate(targets)
\ No newline at end of file
@@ -1,64 +1,93 @@
 import os
+import random
 import hashlib
-from fs_lite.metadata_store import get_manifest
-from fs_lite.node_manager import get_node, read_chunk_from_node
+from fs_lite.hashing import get_hash_pool, sha256_hex, StreamHasher
+from fs_lite.metadata_store import get_manifest, get_manifest_version
+from fs_lite.node_manager import get_node_statuses, read_chunk_from_node
+from fs_lite.chunk_engine import composite_hash
+from fs_lite.merkle import build_tree, inclusion_proof, merkle_root
+from fs_lite.access_stats import access_stats
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DOWNLOADS_DIR = os.path.join(BASE_DIR, "downloads")
 
 
-def reconstruct_file(file_id: str) -> str:
+def reconstruct_file(file_id: str, version: int = None) -> str:
     """
     Fetches all chunks for a file, verifies hashes,
     reassembles the original file, and saves it to downloads/.
     Returns the path to the reconstructed file.
+    Pass version to rebuild an older, archived version.
     """
-    manifest = get_manifest(file_id)
+    if version is None:
+        manifest = get_manifest(file_id)
+    else:
+        manifest = get_manifest_version(file_id, version)
     file_name = manifest["file_name"]
     total_chunks = manifest["total_chunks"]
 
+    _verified_tree(manifest)
+
     print(f"\n🔄 Reconstructing: {file_name} ({total_chunks} chunks)")
     print(f"   File ID  : {file_id}")
     print(f"   Expected hash: {manifest['full_hash'][:16]}...\n")
 
     os.makedirs(DOWNLOADS_DIR, exist_ok=True)
-    output_path = os.path.join(DOWNLOADS_DIR, file_name)
+    output_name = file_name if version is None else f"v{version}_{file_name}"
+    output_path = os.path.join(DOWNLOADS_DIR, output_name)
 
     assembled_data = []
+    chunk_hashes = []
     all_passed = True
+    pool = get_hash_pool()
+    pending = []
+
+    read_replicas = manifest.get("read_replicas", {})
+    chunks = sorted(manifest["chunks"], key=lambda c: c["index"])
+    access_stats.record_read(file_id, [c["id"] for c in chunks])
 
-    for chunk_meta in sorted(manifest["chunks"], key=lambda c: c["index"]):
+    for chunk_meta in chunks:
         chunk_id = chunk_meta["id"]
         primary_node = chunk_meta["primary_node"]
         replica_node = chunk_meta["replica_node"]
-        expected_hash = chunk_meta["hash"]
 
         # Try primary node first
-        data = _fetch_chunk(chunk_id, primary_node, replica_node)
+        data = _fetch_chunk(chunk_id, primary_node, replica_node, read_replicas.get(chunk_id))
 
         if data is None:
             print(f"   ❌ FATAL: Chunk {chunk_meta['index']} unavailable on both nodes!")
             all_passed = False
             continue
 
-        # Verify chunk hash
-        actual_hash = hashlib.sha256(data).hexdigest()
-        if actual_hash == expected_hash:
-            print(f"   ✅ Chunk {chunk_meta['index']:02d} — PASS | from: {primary_node}")
+        # Hash on the pool while the next chunk is fetched
+        pending.append((chunk_meta, pool.submit(sha256_hex, data)))
+        assembled_data.append(data)
+
+    # Verify chunk hashes
+    for chunk_meta, future in pending:
+        chunk_hashes.append(future.result())
+        if chunk_hashes[-1] == chunk_meta["hash"]:
+            print(f"   ✅ Chunk {chunk_meta['index']:02d} — PASS | from: {chunk_meta['primary_node']}")
         else:
             print(f"   ❌ Chunk {chunk_meta['index']:02d} — FAIL | hash mismatch!")
             all_passed = False
 
-        assembled_data.append(data)
-
-    # Write reconstructed file
+    # Write reconstructed file, hashing it on the way out
+    full_hash = StreamHasher()
     with open(output_path, "wb") as f:
         for chunk_data in assembled_data:
+            full_hash.feed(chunk_data)
             f.write(chunk_data)
+    written_hash = full_hash.hexdigest()
 
     # Verify full file hash
     print(f"\n🔐 Verifying full file integrity...")
-    actual_full_hash = _hash_file(output_path)
+    if manifest.get("full_hash_scheme") == "multipart":
+        actual_full_hash = _hash_file_parts(output_path, manifest["parts"])
+    elif manifest.get("full_hash_scheme") == "merkle":
+        actual_full_hash = merkle_root(chunk_hashes)
+    else:
+        actual_full_hash = written_hash
 
     if actual_full_hash == manifest["full_hash"]:
         print(f"   ✅ Full file hash — PASS")
@@ -76,39 +105,119 @@ def reconstruct_file(file_id: str) -> str:
     return output_path
 
 
-def _fetch_chunk(chunk_id: str, primary_node: str, replica_node: str):
+def _verified_tree(manifest: dict) -> list:
+    """
+    Merkle tree over the manifest's chunk hashes, checked against the
+    recorded root so a tampered chunk list is caught before any read.
+    """
+    chunks = sorted(manifest["chunks"], key=lambda c: c["index"])
+    levels = build_tree([c["hash"] for c in chunks])
+    expected_root = manifest.get("merkle_root")
+    if expected_root and levels[-1][0] != expected_root:
+        raise RuntimeError("Manifest chunk hashes do not match its Merkle root")
+    return levels
+
+
+def get_chunk_proof(manifest: dict, index: int) -> dict:
+    """Inclusion proof for one chunk, for client-side verification."""
+    levels = _verified_tree(manifest)
+    if not 0 <= index < len(levels[0]):
+        raise IndexError(f"Chunk index out of range: {index}")
+    return {
+        "file_id": manifest["file_id"],
+        "index": index,
+        "leaf": levels[0][index],
+        "proof": inclusion_proof(levels, index),
+        "merkle_root": levels[-1][0],
+    }
+
+
+def read_file_range(manifest: dict, start: int, end: int) -> bytes:
+    """
+    Returns bytes [start, end] (inclusive) of a file, reading only the
+    chunks that overlap the range. The manifest's chunk hashes are checked
+    against its Merkle root once, then each chunk read against its hash —
+    no full-file read needed.
+    """
+    chunks = sorted(manifest["chunks"], key=lambda c: c["index"])
+    _verified_tree(manifest)
+    read_replicas = manifest.get("read_replicas", {})
+
+    wanted = []
+    offset = 0
+    for chunk_meta in chunks:
+        chunk_start = offset
+        offset += chunk_meta["size"]
+        if offset - 1 >= start and chunk_start <= end:
+            wanted.append((chunk_start, chunk_meta))
+    access_stats.record_read(manifest["file_id"], [c["id"] for _, c in wanted])
+
+    result = []
+    for chunk_start, chunk_meta in wanted:
+        data = _fetch_chunk(
+            chunk_meta["id"],
+            chunk_meta["primary_node"],
+            chunk_meta["replica_node"],
+            read_replicas.get(chunk_meta["id"]),
+        )
+        if data is None:
+            raise RuntimeError(f"Chunk {chunk_meta['index']} unavailable on both nodes")
+
+        if sha256_hex(data) != chunk_meta["hash"]:
+            raise RuntimeError(f"Chunk {chunk_meta['index']} failed integrity check")
+
+        result.append(data[max(start - chunk_start, 0):end - chunk_start + 1])
+
+    return b"".join(result)
+
+
+def _fetch_chunk(chunk_id: str, primary_node: str, replica_node: str, read_replica: str = None):
     """
     Tries to fetch a chunk from primary node.
-    Falls back to replica if primary is offline or missing.
-    Returns bytes or None if both fail.
+    Falls back to replica if primary is offline, suspect or missing.
+    A SUSPECT copy is only tried when no ONLINE copy could be read, so a
+    hanging node never delays a read that a healthy replica can serve.
+    A hot chunk's extra read replica joins the ONLINE copies, and reads
+    start at a random one of them to spread load.
+    Returns bytes or None if every copy fails.
     """
-    # Try primary
-    try:
-        node_info = get_node(primary_node)
-        if node_info["status"] == "ONLINE":
-            return read_chunk_from_node(primary_node, chunk_id)
-        else:
-            print(f"   ⚠️  Primary {primary_node} is OFFLINE — trying replica {replica_node}...")
-    except Exception:
-        print(f"   ⚠️  Primary {primary_node} failed — trying replica {replica_node}...")
-
-    # Try replica
-    try:
-        node_info = get_node(replica_node)
-        if node_info["status"] == "ONLINE":
-            return read_chunk_from_node(replica_node, chunk_id)
-        else:
-            print(f"   ⚠️  Replica {replica_node} is also OFFLINE!")
-    except Exception:
-        print(f"   ⚠️  Replica {replica_node} also failed!")
+    statuses = get_node_statuses()
+    copies = [n for n in dict.fromkeys((primary_node, replica_node, read_replica)) if n]
+    online = [n for n in copies if statuses.get(n) == "ONLINE"]
+    suspect = [n for n in copies if statuses.get(n) == "SUSPECT"]
+
+    for node_id in copies:
+        if node_id not in online and node_id != read_replica:
+            print(f"   ⚠️  {node_id} is {statuses.get(node_id, 'UNKNOWN')} — skipping")
+
+    if read_replica in online:
+        start = random.randrange(len(online))
+        online = online[start:] + online[:start]
+
+    for node_id in online + suspect:
+        try:
+            data = read_chunk_from_node(node_id, chunk_id)
+        except Exception:
+            print(f"   ⚠️  Read of {chunk_id} from {node_id} failed — trying next copy...")
+            continue
+        access_stats.record_node_read(node_id, len(data), node_id == read_replica)
+        return data
 
     return None
 
 
-def _hash_file(file_path: str) -> str:
-    """Compute SHA-256 of an entire file."""
-    h = hashlib.sha256()
+def _hash_file_parts(file_path: str, parts: list) -> str:
+    """Recompute a multipart composite hash from part boundaries."""
+    part_hashes = []
     with open(file_path, "rb") as f:
-        while chunk := f.read(8192):
-            h.update(chunk)
-    return h.hexdigest()
\ No newline at end of file
+        for part in parts:
+            h = hashlib.sha256()
+            remaining = part["size"]
+            while remaining > 0:
+                data = f.read(min(8192, remaining))
+                if not data:
+                    break
+                h.update(data)
+                remaining -= len(data)
+            part_hashes.append(h.hexdigest())
+    return composite_hash(part_hashes)
@@ -0,0 +1,298 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fs_lite.distributor import REPLICATION_FACTOR
+from fs_lite.event_bus import publish
+from fs_lite.hashing import chunk_matches
+from fs_lite.io_scheduler import REPAIR
+from fs_lite.metadata_store import list_manifests, update_manifests
+from fs_lite.node_manager import (
+    get_node_statuses,
+    get_chunk_size,
+    get_free_bytes,
+    read_chunk_from_node,
+    stage_chunk_copy,
+    commit_staged_chunks,
+    delete_chunk_from_node,
+)
+
+# Chunk repairs in flight at once. Bandwidth is still bounded by the
+# REPAIR class and per-node limits in the I/O scheduler.
+REPAIR_WORKERS = min(16, (os.cpu_count() or 2) * 2)
+
+# Publish a progress event every this many finished repairs
+PROGRESS_EVERY = 16
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Serialises repair passes so two never pick the same chunk
+_pass_lock = threading.Lock()
+
+_status_lock = threading.Lock()
+_status = {
+    "state": "idle",
+    "degraded_since": None,             # when redundancy was last lost
+    "last_time_to_full_redundancy": None,
+    "last_restored_at": None,
+    "last_run": None,
+}
+
+
+def get_repair_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=REPAIR_WORKERS,
+                thread_name_prefix="repair"
+            )
+        return _pool
+
+
+def note_redundancy_lost():
+    """Start the time-to-full-redundancy clock (e.g. a node just failed)."""
+    with _status_lock:
+        if _status["degraded_since"] is None:
+            _status["degraded_since"] = time.time()
+
+
+def _healthy_copies(chunk: dict, statuses: dict, verify: bool, fast_algorithm: str) -> list:
+    """
+    Nodes holding a good copy. Without verify, presence with the right size
+    is enough (no reads); with verify, each copy is read and checked.
+    SUSPECT nodes are left out here and handled by the caller.
+    """
+    healthy = []
+    for node_id in (chunk["primary_node"], chunk["replica_node"]):
+        if not node_id or statuses.get(node_id) != "ONLINE":
+            continue
+        if not verify:
+            if get_chunk_size(node_id, chunk["id"]) == chunk["size"]:
+                healthy.append(node_id)
+            continue
+        try:
+            data = read_chunk_from_node(node_id, chunk["id"], REPAIR)
+        except Exception:
+            continue
+        if chunk_matches(chunk, data, fast_algorithm):
+            healthy.append(node_id)
+    return healthy
+
+
+def _plan(manifests: list, verify: bool) -> tuple:
+    """
+    Find chunks below the replication factor.
+    Returns (tasks, lost): each task is one chunk with its healthy sources;
+    lost chunks have no healthy copy left.
+    """
+    statuses = get_node_statuses()
+    pool = get_repair_pool()
+
+    checks = []
+    for manifest in manifests:
+        fast_algorithm = manifest.get("checksums", {}).get("fast")
+        for chunk in manifest["chunks"]:
+            if verify:
+                future = pool.submit(_healthy_copies, chunk, statuses, True, fast_algorithm)
+            else:
+                future = None
+            checks.append((manifest, chunk, fast_algorithm, future))
+
+    tasks = []
+    lost = []
+    for manifest, chunk, fast_algorithm, future in checks:
+        healthy = (
+            future.result() if future is not None
+            else _healthy_copies(chunk, statuses, False, fast_algorithm)
+        )
+        # Copies on SUSPECT nodes aren't read or copied from, but they aren't
+        # written off either — no re-replication until the node is OFFLINE
+        suspect = [
+            n for n in (chunk["primary_node"], chunk["replica_node"])
+            if n and statuses.get(n) == "SUSPECT"
+        ]
+        if len(healthy) + len(suspect) >= REPLICATION_FACTOR:
+            continue
+        if not healthy:
+            if not suspect:
+                lost.append(chunk["id"])
+            continue
+        # The slot that no longer points at a good copy
+        slot = "replica_node" if chunk["primary_node"] in healthy else "primary_node"
+        tasks.append({
+            "manifest": manifest,
+            "chunk": chunk,
+            "sources": healthy,
+            "slot": slot,
+            "replaced": chunk[slot],
+        })
+    return tasks, lost
+
+
+def _assign_targets(tasks: list) -> list:
+    """
+    Spread repairs across ONLINE nodes by free capacity: each chunk goes to
+    the node with the most room left after the repairs already assigned.
+    """
+    statuses = get_node_statuses()
+    free = {
+        node_id: get_free_bytes(node_id)
+        for node_id, status in statuses.items()
+        if status == "ONLINE"
+    }
+
+    assigned = []
+    for task in tasks:
+        chunk = task["chunk"]
+        candidates = [
+            node_id for node_id, room in free.items()
+            if node_id not in task["sources"] and room >= chunk["size"]
+        ]
+        if not candidates:
+            continue
+        target = max(candidates, key=lambda n: free[n])
+        free[target] -= chunk["size"]
+        assigned.append({**task, "target": target})
+    return assigned
+
+
+def _repair_chunk(task: dict) -> dict:
+    """Copy one chunk from a healthy source to its target, verified once."""
+    chunk = task["chunk"]
+    for source in task["sources"]:
+        try:
+            entry, method = stage_chunk_copy(
+                source, task["target"], chunk["id"],
+                expected_hash=chunk["hash"], io_class=REPAIR,
+            )
+            commit_staged_chunks([entry])
+        except Exception as e:
+            print(f"   ⚠️  Repair of {chunk['id']} from {source} failed: {e}")
+            continue
+        return {"ok": True, "method": method, "bytes": chunk["size"]}
+    return {"ok": False}
+
+
+def run_repair(file_ids: list = None, verify: bool = True) -> dict:
+    """
+    One repair pass: plan, copy chunks in parallel, then commit every
+    placement change in a single metadata write.
+    file_ids limits the pass to those files. verify reads and checks every
+    placed copy while planning (catches corruption); without it only
+    missing copies are found, using the in-memory node index.
+    """
+    with _pass_lock:
+        started = time.time()
+        manifests = list_manifests()
+        if file_ids is not None:
+            wanted = set(file_ids)
+            manifests = [m for m in manifests if m["file_id"] in wanted]
+
+        with _status_lock:
+            _status["state"] = "running"
+
+        tasks, lost = _plan(manifests, verify)
+        if tasks or lost:
+            note_redundancy_lost()
+        assigned = _assign_targets(tasks)
+
+        publish("repair", {"state": "running", "files_scanned": len(manifests),
+                           "total_files": len(manifests), "repaired_chunks": 0,
+                           "planned_chunks": len(tasks)})
+
+        repaired = 0
+        failed = len(tasks) - len(assigned)
+        bytes_copied = 0
+        methods = {}
+        changed = {}
+
+        pool = get_repair_pool()
+        futures = {pool.submit(_repair_chunk, task): task for task in assigned}
+        for done, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            result = future.result()
+            if result["ok"]:
+                task["chunk"][task["slot"]] = task["target"]
+                changed[task["manifest"]["file_id"]] = task["manifest"]
+                repaired += 1
+                bytes_copied += result["bytes"]
+                methods[result["method"]] = methods.get(result["method"], 0) + 1
+            else:
+                failed += 1
+
+            if done % PROGRESS_EVERY == 0:
+                publish("repair", {"state": "running", "files_scanned": len(manifests),
+                                   "total_files": len(manifests), "repaired_chunks": repaired,
+                                   "planned_chunks": len(tasks)})
+
+        # One metadata commit for the whole pass
+        saved = update_manifests(list(changed.values())) if changed else []
+
+        # Drop bad copies the new placements replaced, so over-replication
+        # cleanup can never pick them over the good ones
+        statuses = get_node_statuses()
+        saved_set = set(saved)
+        for task in assigned:
+            old_node = task["replaced"]
+            if (
+                task["manifest"]["file_id"] in saved_set
+                and task["chunk"][task["slot"]] == task["target"]
+                and old_node
+                and old_node != task["target"]
+                and statuses.get(old_node) == "ONLINE"
+            ):
+                delete_chunk_from_node(old_node, task["chunk"]["id"])
+
+        duration = time.time() - started
+        run = {
+            "files_scanned": len(manifests),
+            "planned_chunks": len(tasks),
+            "repaired_chunks": repaired,
+            "failed_chunks": failed,
+            "lost_chunks": len(lost),
+            "bytes_copied": bytes_copied,
+            "copy_methods": methods,
+            "manifests_updated": len(saved),
+            "workers": REPAIR_WORKERS,
+            "verified_sources": verify,
+            "duration_seconds": round(duration, 3),
+        }
+
+        # Fully redundant again? (cheap: in-memory presence check)
+        remaining, remaining_lost = _plan(list_manifests(), verify=False)
+        with _status_lock:
+            _status["state"] = "idle"
+            _status["last_run"] = run
+            if not remaining and not remaining_lost and _status["degraded_since"]:
+                restored = time.time()
+                _status["last_time_to_full_redundancy"] = round(
+                    restored - _status["degraded_since"], 3
+                )
+                _status["last_restored_at"] = restored
+                _status["degraded_since"] = None
+                print(
+                    f"🛡️  Full redundancy restored in "
+                    f"{_status['last_time_to_full_redundancy']}s"
+                )
+
+        publish("repair", {"state": "idle", "files_scanned": len(manifests),
+                           "total_files": len(manifests), "repaired_chunks": repaired,
+                           "planned_chunks": len(tasks)})
+
+        if tasks:
+            print(
+                f"🔧 Repair pass: {repaired}/{len(tasks)} chunks restored in "
+                f"{duration:.2f}s ({methods})"
+            )
+        return run
+
+
+def get_repair_status() -> dict:
+    with _status_lock:
+        status = dict(_status)
+    if status["degraded_since"]:
+        status["degraded_for_seconds"] = round(time.time() - status["degraded_since"], 3)
+    return status
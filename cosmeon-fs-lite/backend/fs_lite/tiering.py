@@ -0,0 +1,427 @@
+import threading
+import time
+from collections import deque
+
+from fs_lite.access_stats import access_stats
+from fs_lite.anti_entropy import expected_placements
+from fs_lite.distributor import REPLICATION_FACTOR
+from fs_lite.io_scheduler import REBALANCE
+from fs_lite.metadata_store import (
+    get_manifest,
+    list_manifests,
+    list_compact_manifests,
+    update_manifests,
+)
+from fs_lite.node_manager import (
+    NODE_IDS,
+    get_node_statuses,
+    get_free_bytes,
+    stage_chunk_copy,
+    commit_staged_chunks,
+    delete_chunk_from_node,
+)
+
+# Tiers recorded in the manifest ("tier"); no tier means standard
+HOT = "hot"             # extra read replica per hot chunk
+STANDARD = "standard"
+COLD = "cold"           # copies moved onto the designated cold nodes
+
+# Decayed reads (see access_stats.HALF_LIFE_SECONDS) that make a file hot
+DEFAULT_HOT_READS = 8.0
+# A hot file stays hot until its heat falls below this share of hot_reads
+HOT_EXIT_FRACTION = 0.5
+# Within a hot file, chunks read at least this share of hot_reads get a
+# read replica — a file read only by range doesn't copy untouched chunks
+HOT_CHUNK_FRACTION = 0.5
+# A file below this heat for cold_after_seconds becomes cold
+DEFAULT_COLD_READS = 0.5
+DEFAULT_COLD_AFTER_SECONDS = 600
+
+# Chunk copies made per pass, so one pass never floods the nodes
+MAX_COPIES_PER_PASS = 256
+
+_tier_lock = threading.Lock()
+_policy = {
+    "hot_reads": DEFAULT_HOT_READS,
+    "cold_reads": DEFAULT_COLD_READS,
+    "cold_after_seconds": DEFAULT_COLD_AFTER_SECONDS,
+    "cold_nodes": [],
+}
+_first_seen = {}        # file_id → when the tiering job first saw it
+_recent = deque(maxlen=50)
+_status = {
+    "last_run": None,
+    "totals": {
+        "read_replicas_added": 0,
+        "read_replicas_removed": 0,
+        "chunks_moved_cold": 0,
+        "bytes_moved_cold": 0,
+    },
+}
+
+
+def configure_tiering(
+    hot_reads: float = None,
+    cold_reads: float = None,
+    cold_after_seconds: float = None,
+    cold_nodes: list = None,
+):
+    policy = dict(_policy)
+    if hot_reads is not None:
+        if hot_reads <= 0:
+            raise ValueError("hot_reads must be positive")
+        policy["hot_reads"] = hot_reads
+    if cold_reads is not None:
+        if cold_reads < 0:
+            raise ValueError("cold_reads must not be negative")
+        policy["cold_reads"] = cold_reads
+    if cold_after_seconds is not None:
+        if cold_after_seconds < 0:
+            raise ValueError("cold_after_seconds must not be negative")
+        policy["cold_after_seconds"] = cold_after_seconds
+    if cold_nodes is not None:
+        unknown = [n for n in cold_nodes if n not in NODE_IDS]
+        if unknown:
+            raise ValueError(f"Unknown nodes: {unknown}")
+        policy["cold_nodes"] = list(dict.fromkeys(cold_nodes))
+    if policy["cold_reads"] >= policy["hot_reads"] * HOT_EXIT_FRACTION:
+        raise ValueError("cold_reads must be below the hot exit threshold")
+    _policy.update(policy)
+
+
+def _classify(manifest: dict, now: float) -> tuple:
+    """(tier, heat) for a file, from its decayed read count."""
+    file_id = manifest["file_id"]
+    heat = access_stats.file_heat(file_id)
+    hot_reads = _policy["hot_reads"]
+
+    if heat >= hot_reads or (
+        manifest.get("tier") == HOT and heat >= hot_reads * HOT_EXIT_FRACTION
+    ):
+        return HOT, heat
+
+    quiet_since = access_stats.last_read(file_id) or _first_seen[file_id]
+    if heat < _policy["cold_reads"] and now - quiet_since >= _policy["cold_after_seconds"]:
+        return COLD, heat
+    return STANDARD, heat
+
+
+def _placed(node_id: str, chunk_id: str) -> bool:
+    """
+    Does any manifest still place this chunk on this node? Archived
+    versions count: a partial update shares the unchanged chunks, so
+    the old version may still read a copy the current one moved.
+    """
+    return chunk_id in expected_placements().get(node_id, {})
+
+
+def _copy(sources: list, target: str, chunk: dict):
+    """Verified copy of a chunk to target. Returns the staged entry or None."""
+    for source in sources:
+        try:
+            entry, _ = stage_chunk_copy(
+                source, target, chunk["id"],
+                expected_hash=chunk["hash"], io_class=REBALANCE,
+            )
+            return entry
+        except Exception as e:
+            print(f"   ⚠️  Tiering copy of {chunk['id']} from {source} failed: {e}")
+    return None
+
+
+class _Pass:
+    """Working state of one tiering pass."""
+
+    def __init__(self):
+        statuses = get_node_statuses()
+        self.online = [n for n, s in statuses.items() if s == "ONLINE"]
+        self.cold_nodes = [n for n in _policy["cold_nodes"] if n in self.online]
+        self.free = {n: get_free_bytes(n) for n in self.online}
+        self.budget = MAX_COPIES_PER_PASS
+        self.staged = []
+        self.added = {}         # file_id → [(node_id, chunk_id)] new copies
+        self.obsolete = {}      # file_id → [(node_id, chunk_id)] to delete once saved
+        self.stats = {
+            "read_replicas_added": 0,
+            "read_replicas_removed": 0,
+            "chunks_moved_cold": 0,
+            "bytes_moved_cold": 0,
+        }
+
+    def add_read_replicas(self, manifest: dict) -> bool:
+        # Recorded on the manifest only once a copy is made
+        replicas = dict(manifest.get("read_replicas", {}))
+        threshold = _policy["hot_reads"] * HOT_CHUNK_FRACTION
+        changed = False
+
+        for chunk in manifest["chunks"]:
+            if self.budget <= 0:
+                break
+            if chunk["id"] in replicas or access_stats.chunk_heat(chunk["id"]) < threshold:
+                continue
+            holders = (chunk["primary_node"], chunk["replica_node"])
+            sources = [n for n in holders if n in self.online]
+            targets = [
+                n for n in self.online
+                if n not in holders
+                and n not in self.cold_nodes
+                and self.free[n] >= chunk["size"]
+            ]
+            if not sources or not targets:
+                continue
+
+            target = max(targets, key=lambda n: self.free[n])
+            entry = _copy(sources, target, chunk)
+            if entry is None:
+                continue
+            self.staged.append(entry)
+            self.free[target] -= chunk["size"]
+            self.budget -= 1
+            replicas[chunk["id"]] = target
+            self.added.setdefault(manifest["file_id"], []).append((target, chunk["id"]))
+            self.stats["read_replicas_added"] += 1
+            changed = True
+
+        if changed:
+            manifest["read_replicas"] = replicas
+        return changed
+
+    def drop_read_replicas(self, manifest: dict) -> bool:
+        replicas = manifest.pop("read_replicas", None)
+        if not replicas:
+            return False
+        self.obsolete.setdefault(manifest["file_id"], []).extend(
+            (node_id, chunk_id) for chunk_id, node_id in replicas.items()
+        )
+        self.stats["read_replicas_removed"] += len(replicas)
+        return True
+
+    def prune_read_replicas(self, manifest: dict) -> bool:
+        """
+        Forget read replicas of chunks a partial update replaced (the old
+        version still references them) and ones repair has since made a
+        regular copy.
+        """
+        replicas = manifest.get("read_replicas")
+        if not replicas:
+            return False
+        holders = {c["id"]: (c["primary_node"], c["replica_node"]) for c in manifest["chunks"]}
+        kept = {
+            chunk_id: node_id for chunk_id, node_id in replicas.items()
+            if chunk_id in holders and node_id not in holders[chunk_id]
+        }
+        if len(kept) == len(replicas):
+            return False
+        if kept:
+            manifest["read_replicas"] = kept
+        else:
+            del manifest["read_replicas"]
+        return True
+
+    def move_to_cold(self, manifest: dict) -> bool:
+        """Put as many of each chunk's copies on cold nodes as RF allows."""
+        wanted = min(REPLICATION_FACTOR, len(self.cold_nodes))
+        changed = False
+
+        for chunk in manifest["chunks"]:
+            on_cold = [
+                n for n in (chunk["primary_node"], chunk["replica_node"])
+                if n in self.cold_nodes
+            ]
+            for slot in ("primary_node", "replica_node"):
+                if len(on_cold) >= wanted or self.budget <= 0:
+                    break
+                source = chunk[slot]
+                if source in self.cold_nodes or source not in self.online:
+                    continue
+                targets = [
+                    n for n in self.cold_nodes
+                    if n not in (chunk["primary_node"], chunk["replica_node"])
+                    and self.free[n] >= chunk["size"]
+                ]
+                if not targets:
+                    break
+
+                target = max(targets, key=lambda n: self.free[n])
+                entry = _copy([source], target, chunk)
+                if entry is None:
+                    continue
+                self.staged.append(entry)
+                self.free[target] -= chunk["size"]
+                self.budget -= 1
+                chunk[slot] = target
+                on_cold.append(target)
+                self.added.setdefault(manifest["file_id"], []).append((target, chunk["id"]))
+                self.obsolete.setdefault(manifest["file_id"], []).append((source, chunk["id"]))
+                self.stats["chunks_moved_cold"] += 1
+                self.stats["bytes_moved_cold"] += chunk["size"]
+                changed = True
+        return changed
+
+    def undo_copies(self, file_id: str):
+        """Remove the new copies (staged or committed) of an unsaved change."""
+        for node_id, chunk_id in self.added.get(file_id, []):
+            if not _placed(node_id, chunk_id):
+                delete_chunk_from_node(node_id, chunk_id)
+
+
+def run_tiering() -> dict:
+    """
+    One tiering pass over every file:
+    - hot: hot chunks get an extra read replica on a non-cold node
+    - no longer hot: read replicas removed
+    - cold: copies moved onto the designated cold nodes (if any)
+    Copies are verified and committed first, then all manifest changes
+    are saved in one metadata commit, then replaced copies are deleted.
+    If committing the copies fails, they are removed and nothing is saved.
+    """
+    with _tier_lock:
+        started = time.time()
+        work = _Pass()
+
+        manifests = list_manifests()
+        live = {m["file_id"] for m in manifests}
+        for file_id in list(_first_seen):
+            if file_id not in live:
+                del _first_seen[file_id]
+        for file_id in live:
+            _first_seen.setdefault(file_id, started)
+
+        changed = []
+        tiers = {HOT: 0, STANDARD: 0, COLD: 0}
+        for manifest in manifests:
+            tier, heat = _classify(manifest, started)
+            tiers[tier] += 1
+            old_tier = manifest.get("tier", STANDARD)
+
+            dirty = work.prune_read_replicas(manifest)
+            if tier == HOT:
+                dirty = work.add_read_replicas(manifest) or dirty
+            else:
+                dirty = work.drop_read_replicas(manifest) or dirty
+            if tier == COLD and work.cold_nodes:
+                dirty = work.move_to_cold(manifest) or dirty
+
+            if tier != old_tier:
+                if tier == STANDARD:
+                    manifest.pop("tier", None)
+                else:
+                    manifest["tier"] = tier
+                _recent.appendleft({
+                    "file_id": manifest["file_id"],
+                    "file_name": manifest["file_name"],
+                    "from": old_tier,
+                    "to": tier,
+                    "heat": round(heat, 3),
+                    "at": started,
+                })
+                print(f"🌡️  {manifest['file_id']} tier {old_tier} → {tier} (heat {heat:.2f})")
+                dirty = True
+
+            if dirty:
+                changed.append(manifest)
+
+        if work.staged:
+            try:
+                commit_staged_chunks(work.staged)
+            except Exception:
+                # Nothing is saved: no manifest may point at these copies
+                for file_id in work.added:
+                    work.undo_copies(file_id)
+                raise
+        saved = set(update_manifests(changed)) if changed else set()
+
+        for manifest in changed:
+            file_id = manifest["file_id"]
+            if file_id in saved:
+                # Old locations of moved chunks and dropped read replicas,
+                # unless another manifest or an archived version uses them
+                for node_id, chunk_id in work.obsolete.get(file_id, []):
+                    if node_id in work.online and not _placed(node_id, chunk_id):
+                        delete_chunk_from_node(node_id, chunk_id)
+                continue
+            # Not saved (deleted or updated meanwhile): undo the new copies
+            work.undo_copies(file_id)
+
+        run = {
+            "files_scanned": len(manifests),
+            "tiers": tiers,
+            "manifests_updated": len(saved),
+            **work.stats,
+            "duration_seconds": round(time.time() - started, 3),
+            "finished_at": time.time(),
+        }
+        _status["last_run"] = run
+        for key, value in work.stats.items():
+            _status["totals"][key] += value
+        return run
+
+
+def get_tiering_status() -> dict:
+    """Policy, tier counts, heat of the hottest files and traffic savings."""
+    cold_nodes = set(_policy["cold_nodes"])
+    tiers = {HOT: 0, STANDARD: 0, COLD: 0}
+    read_replicas = 0
+    cold_bytes = 0
+    file_tiers = {}
+    for manifest in list_compact_manifests():
+        tier = manifest.header.get("tier", STANDARD)
+        tiers[tier] += 1
+        file_tiers[manifest.header["file_id"]] = tier
+        read_replicas += len(manifest.header.get("read_replicas", {}))
+        if tier == COLD:
+            for _, size, primary_node, replica_node in manifest.iter_placements():
+                cold_bytes += size * sum(n in cold_nodes for n in (primary_node, replica_node))
+
+    hot_files = [
+        {**f, "tier": file_tiers[f["file_id"]]}
+        for f in access_stats.top_files(20)
+        if f["file_id"] in file_tiers
+    ][:10]
+
+    traffic = access_stats.traffic()
+    return {
+        "policy": {
+            **_policy,
+            "hot_exit_fraction": HOT_EXIT_FRACTION,
+            "hot_chunk_fraction": HOT_CHUNK_FRACTION,
+        },
+        "tiers": tiers,
+        "read_replicas": read_replicas,
+        "cold_bytes_on_cold_nodes": cold_bytes,
+        "hot_files": hot_files,
+        "traffic": traffic,
+        "savings": {
+            # Reads a hot file's extra copy absorbed instead of its two regular copies
+            "bytes_served_by_read_replicas": traffic["read_replica_bytes"],
+            # Downloads served from the cache without touching any node
+            "bytes_served_from_cache": traffic["cache_bytes"],
+            # Data moved off regular nodes onto cold nodes
+            "bytes_moved_to_cold_nodes": _status["totals"]["bytes_moved_cold"],
+        },
+        "recent_decisions": list(_recent),
+        **_status,
+    }
+
+
+def get_file_access(file_id: str) -> dict:
+    """Heat and tier of one file and each of its chunks. Raises ValueError."""
+    manifest = get_manifest(file_id)
+    read_replicas = manifest.get("read_replicas", {})
+    return {
+        "file_id": file_id,
+        "tier": manifest.get("tier", STANDARD),
+        "heat": round(access_stats.file_heat(file_id), 3),
+        "last_read": access_stats.last_read(file_id),
+        "chunks": [
+            {
+                "id": c["id"],
+                "index": c["index"],
+                "heat": round(access_stats.chunk_heat(c["id"]), 3),
+                "primary_node": c["primary_node"],
+                "replica_node": c["replica_node"],
+                "read_replica": read_replicas.get(c["id"]),
+            }
+            for c in sorted(manifest["chunks"], key=lambda c: c["index"])
+        ],
+    }
@@ -1,22 +1,85 @@
 import os
+import re
+import json
+import shutil
 import asyncio
 from collections import OrderedDict
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import (
+    FastAPI,
+    UploadFile,
+    File,
+    HTTPException,
+    Body,
+    Request,
+    BackgroundTasks,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-import aiofiles
+from fastapi.responses import FileResponse, StreamingResponse, Response, JSONResponse
 
 from fs_lite.health_monitor import (
     scan_system_health,
+    get_health_summary,
+    get_cached_health_summary,
+    verify_file,
+    verify_files,
     repair_under_replicated_chunks,
     cleanup_over_replicated_chunks,
 )
-from fs_lite.chunk_engine import split_file
+from fs_lite.chunk_engine import split_stream
+from fs_lite.hashing import DEFAULT_CHECKSUM_POLICY
 from fs_lite.distributor import distribute_chunks
-from fs_lite.metadata_store import save_manifest, get_manifest, list_files
-from fs_lite.node_manager import get_all_nodes, set_node_status
-from fs_lite.reconstruct import reconstruct_file
+from fs_lite.metadata_store import (
+    VERSIONS_FILE,
+    TOMBSTONES_FILE,
+    mark_deleted,
+    save_manifest,
+    get_manifest,
+    get_manifest_version,
+    list_files,
+    list_versions,
+)
+from fs_lite.node_manager import (
+    get_all_nodes,
+    set_node_status,
+    get_state_version,
+    refresh_node_state,
+    get_node_digest_levels,
+    probe_all_nodes,
+    NODE_IDS,
+)
+from fs_lite.failure_detector import detector, PROBE_INTERVAL
+from fs_lite.admission import admission, AdmissionRejected
+from fs_lite import event_bus
+from fs_lite.io_scheduler import scheduler, IO_CLASSES
+from fs_lite.reconstruct import reconstruct_file, read_file_range, get_chunk_proof
+from fs_lite.anti_entropy import find_divergence
+from fs_lite.file_updates import append_to_file, patch_file
+from fs_lite.repair_executor import note_redundancy_lost, get_repair_status
+from fs_lite.garbage_collector import (
+    GC_GRACE_SECONDS,
+    collect_deleted,
+    sweep_orphans,
+    get_gc_status,
+)
+from fs_lite.durability import TEMP_SUFFIX
+from fs_lite.bulk import ARCHIVE_FORMATS, ingest_archive, export_archive
+from fs_lite.access_stats import access_stats
+from fs_lite.tiering import run_tiering, configure_tiering, get_tiering_status, get_file_access
+from fs_lite.multipart import (
+    MULTIPART_DIR,
+    initiate_upload,
+    upload_part,
+    get_upload_status,
+    complete_upload,
+    abort_multipart_upload,
+)
+from fs_lite.intent_log import (
+    INTENT_DIR,
+    recover_incomplete_uploads,
+    commit_upload,
+    abort_upload,
+)
 
 app = FastAPI(title="COSMEON FS-Lite", version="1.0.0")
 
@@ -48,33 +111,220 @@ def add_to_cache(file_id: str, output_path: str):
         print(f"🗑️ Cache EVICTED file {evicted_id}")
 
 
+def invalidate_cache(file_id: str):
+    if file_cache.pop(file_id, None):
+        print(f"♻️ Cache INVALIDATED for file {file_id}")
+
+
 # ─────────────────────────────────────────────────────────
 # BACKGROUND AUTO-REPAIR DAEMON
 # ─────────────────────────────────────────────────────────
 
+REPAIR_LOOP_INTERVAL = 2     # seconds between anti-entropy passes
+FULL_SCRUB_INTERVAL = 30     # seconds between full content scrubs
+
+
 async def background_repair_daemon():
+    """
+    Every loop: cheap anti-entropy pass (node digests vs metadata, no chunk
+    reads) and a targeted repair of whatever diverged.
+    Every FULL_SCRUB_INTERVAL: full content scrub to catch silent corruption.
+    """
+    last_scrub = 0.0
+    loop = asyncio.get_running_loop()
+
     while True:
         try:
-            health = scan_system_health()
-
-            if (
-                health["under_replicated_chunks"] > 0
-                or health["corrupted_chunks"] > 0
-                or health["missing_chunks"] > 0
-            ):
-                print("🛠️ Auto-repair triggered...")
-                repair_under_replicated_chunks()
+            divergence = await asyncio.to_thread(find_divergence)
+
+            if divergence["affected_files"]:
+                print("🛠️ Auto-repair triggered (anti-entropy)...")
+                # Anti-entropy only finds missing copies — no need to reread
+                await asyncio.to_thread(
+                    repair_under_replicated_chunks,
+                    divergence["affected_files"],
+                    False,
+                )
                 print("✅ Auto-repair completed.")
 
+            # Only on the interval: a repair that can't make progress (e.g. no
+            # capacity) must not turn every loop into a full scrub
+            if loop.time() - last_scrub >= FULL_SCRUB_INTERVAL:
+                last_scrub = loop.time()
+
+                # Off the event loop: scrub I/O is throttled and may sleep
+                health = await asyncio.to_thread(get_health_summary)
+
+                if (
+                    health["under_replicated_chunks"] > 0
+                    or health["corrupted_chunks"] > 0
+                    or health["missing_chunks"] > 0
+                ):
+                    print("🛠️ Auto-repair triggered (scrub)...")
+                    await asyncio.to_thread(repair_under_replicated_chunks)
+                    print("✅ Auto-repair completed.")
+                    await asyncio.to_thread(get_health_summary)
+
         except Exception as e:
             print(f"⚠️ Background repair error: {e}")
 
-        await asyncio.sleep(2)
+        await asyncio.sleep(REPAIR_LOOP_INTERVAL)
+
+
+# ─────────────────────────────────────────────────────────
+# BACKGROUND GARBAGE COLLECTOR
+# ─────────────────────────────────────────────────────────
+
+GC_LOOP_INTERVAL = 2        # seconds between checks for deleted files
+GC_SWEEP_INTERVAL = 60      # seconds between orphan mark-and-sweep passes
+
+
+async def garbage_collector_daemon():
+    """
+    Reclaims chunks of deleted files soon after DELETE returns, and
+    periodically sweeps nodes for orphans (failed uploads, repair
+    leftovers, crashes). Deletes are throttled by the I/O scheduler.
+    """
+    loop = asyncio.get_running_loop()
+    last_sweep = loop.time()
+
+    while True:
+        try:
+            await asyncio.to_thread(collect_deleted)
+
+            if loop.time() - last_sweep >= GC_SWEEP_INTERVAL:
+                last_sweep = loop.time()
+                await asyncio.to_thread(sweep_orphans)
+
+        except Exception as e:
+            print(f"⚠️ Garbage collector error: {e}")
+
+        await asyncio.sleep(GC_LOOP_INTERVAL)
+
+
+# ─────────────────────────────────────────────────────────
+# BACKGROUND TIERING
+# ─────────────────────────────────────────────────────────
+
+TIERING_INTERVAL = 30       # seconds between hot/cold tiering passes
+
+
+async def tiering_daemon():
+    """
+    Re-tiers files by read heat: read replicas for hot files, cold files
+    moved onto the cold nodes. Copies run in the rebalance I/O class.
+    """
+    while True:
+        await asyncio.sleep(TIERING_INTERVAL)
+        try:
+            await asyncio.to_thread(run_tiering)
+        except Exception as e:
+            print(f"⚠️ Tiering error: {e}")
+
+
+# ─────────────────────────────────────────────────────────
+# LIVE EVENT PUMP
+# ─────────────────────────────────────────────────────────
+
+NODE_EVENT_INTERVAL = 0.5  # seconds — coalesces bursts of chunk writes
+
+
+async def node_state_pump():
+    """
+    Publishes node status/capacity whenever the in-memory node view
+    changes. Reads only memory, however many viewers are connected.
+    """
+    last_version = None
+    while True:
+        version = get_state_version()
+        if version != last_version:
+            last_version = version
+            event_bus.publish("nodes", {"nodes": get_all_nodes()})
+        await asyncio.sleep(NODE_EVENT_INTERVAL)
+
+
+# ─────────────────────────────────────────────────────────
+# FAILURE DETECTOR
+# ─────────────────────────────────────────────────────────
+
+async def failure_detector_loop():
+    """
+    Probes every node each PROBE_INTERVAL and lets the failure detector
+    mark nodes SUSPECT / OFFLINE. A node declared OFFLINE starts the
+    redundancy clock; one that comes back is rebalanced.
+    """
+    while True:
+        try:
+            transitions = await asyncio.to_thread(probe_all_nodes)
+            for node_id, old, new in transitions:
+                if new == "OFFLINE":
+                    note_redundancy_lost()
+                elif old == "OFFLINE" and new == "ONLINE":
+                    asyncio.create_task(asyncio.to_thread(_rebalance_after_recovery))
+        except Exception as e:
+            print(f"⚠️ Failure detector error: {e}")
+
+        await asyncio.sleep(PROBE_INTERVAL)
 
 
 @app.on_event("startup")
 async def start_background_tasks():
+    event_bus.bind_loop(asyncio.get_running_loop())
+
+    # Replay upload intents left behind by a crash before serving traffic
+    recovery = recover_incomplete_uploads()
+    print(f"♻️  Startup recovery: {recovery}")
+
+    refresh_node_state()
+
     asyncio.create_task(background_repair_daemon())
+    asyncio.create_task(garbage_collector_daemon())
+    asyncio.create_task(node_state_pump())
+    asyncio.create_task(failure_detector_loop())
+    asyncio.create_task(tiering_daemon())
+
+
+# ─────────────────────────────────────────────────────────
+# ADMISSION CONTROL
+# ─────────────────────────────────────────────────────────
+
+# Requests that write file data: admitted (or turned away) before the
+# body is read
+INGEST_ROUTES = [
+    ("POST", re.compile(r"^/upload$")),
+    ("PUT", re.compile(r"^/multipart/[^/]+/parts/[^/]+$")),
+    ("POST", re.compile(r"^/files/[^/]+/append$")),
+    ("PATCH", re.compile(r"^/files/[^/]+$")),
+    ("POST", re.compile(r"^/bulk$")),
+]
+
+
+def _is_ingest(request: Request) -> bool:
+    return any(
+        request.method == method and pattern.match(request.url.path)
+        for method, pattern in INGEST_ROUTES
+    )
+
+
+# Registered before CORS so rejections still carry CORS headers
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    if not _is_ingest(request):
+        return await call_next(request)
+
+    length = request.headers.get("content-length")
+    try:
+        ticket = await admission.admit(int(length) if length is not None else None)
+    except ValueError:
+        return JSONResponse(status_code=400, content={"detail": "Invalid Content-Length"})
+    except AdmissionRejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=headers)
+
+    try:
+        return await call_next(request)
+    finally:
+        admission.release(ticket)
 
 
 # ─────────────────────────────────────────────────────────
@@ -89,9 +339,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_TEMP = "temp_uploads"
-os.makedirs(UPLOAD_TEMP, exist_ok=True)
-
 
 # ─────────────────────────────────────────────────────────
 # ROOT
@@ -115,24 +362,30 @@ def get_nodes():
 def fail_node(node_id: str):
     try:
         set_node_status(node_id, "OFFLINE")
+        note_redundancy_lost()
         return {"message": f"{node_id} is now OFFLINE", "status": "OFFLINE"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+def _rebalance_after_recovery():
+    # Repair missing replicas first
+    repair_under_replicated_chunks()
+
+    # Cleanup any over-replication
+    cleanup_over_replicated_chunks()
+
+
 @app.post("/nodes/{node_id}/recover")
-def recover_node(node_id: str):
+def recover_node(node_id: str, background_tasks: BackgroundTasks):
     try:
         set_node_status(node_id, "ONLINE")
 
-        # Repair missing replicas first
-        repair_under_replicated_chunks()
-
-        # Cleanup any over-replication
-        cleanup_over_replicated_chunks()
+        # Throttled background I/O — don't hold the request or starve clients
+        background_tasks.add_task(_rebalance_after_recovery)
 
         return {
-            "message": f"{node_id} is now ONLINE, repair + cleanup executed",
+            "message": f"{node_id} is now ONLINE, repair + cleanup scheduled",
             "status": "ONLINE"
         }
 
@@ -140,6 +393,127 @@ def recover_node(node_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@app.get("/nodes/{node_id}/digest")
+def node_digest(node_id: str):
+    if node_id not in NODE_IDS:
+        raise HTTPException(status_code=404, detail=f"Node not found: {node_id}")
+    levels = get_node_digest_levels(node_id)
+    return {
+        "node_id": node_id,
+        "root": levels[-1][0],
+        "buckets": levels[0],
+    }
+
+
+@app.get("/anti-entropy")
+def anti_entropy_report():
+    return find_divergence()
+
+
+@app.get("/admission")
+def admission_status():
+    """Ingest slots, queue, reserved space and rejection counts."""
+    return admission.snapshot()
+
+
+@app.get("/detector")
+def failure_detector_status():
+    """Per-node suspicion (phi), time since last heard from, and settings."""
+    return detector.snapshot()
+
+
+@app.put("/detector")
+def configure_failure_detector(payload: dict = Body(...)):
+    """
+    Body: {"phi_suspect": 5.0, "detection_seconds": 5.0}
+    (either key may be left out)
+    """
+    try:
+        detector.configure(
+            phi_suspect=payload.get("phi_suspect"),
+            detection_seconds=payload.get("detection_seconds"),
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return detector.snapshot()["config"]
+
+
+# ─────────────────────────────────────────────────────────
+# I/O SCHEDULER
+# ─────────────────────────────────────────────────────────
+
+@app.get("/io")
+def io_status():
+    return {
+        "limits": scheduler.get_limits(),
+        "stats": scheduler.get_stats(),
+    }
+
+
+@app.put("/io/limits")
+def set_io_limit(payload: dict = Body(...)):
+    """
+    Body: {"io_class": "repair", "bytes_per_sec": 10485760}
+       or {"node_id": "node_1", "bytes_per_sec": 52428800}
+    bytes_per_sec: null removes the limit.
+    """
+    if "bytes_per_sec" not in payload:
+        raise HTTPException(status_code=400, detail="bytes_per_sec is required")
+
+    rate = payload["bytes_per_sec"]
+    if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+        raise HTTPException(status_code=400, detail="bytes_per_sec must be positive or null")
+
+    if "io_class" in payload:
+        if payload["io_class"] not in IO_CLASSES:
+            raise HTTPException(status_code=400, detail=f"io_class must be one of {IO_CLASSES}")
+        scheduler.set_class_limit(payload["io_class"], rate)
+    elif "node_id" in payload:
+        if payload["node_id"] not in NODE_IDS:
+            raise HTTPException(status_code=404, detail=f"Node not found: {payload['node_id']}")
+        scheduler.set_node_limit(payload["node_id"], rate)
+    else:
+        raise HTTPException(status_code=400, detail="io_class or node_id is required")
+
+    return {"limits": scheduler.get_limits()}
+
+
+# ─────────────────────────────────────────────────────────
+# LIVE EVENTS (SERVER-SENT EVENTS)
+# ─────────────────────────────────────────────────────────
+
+EVENT_KEEPALIVE_SECONDS = 15
+
+
+@app.get("/events")
+async def cluster_events(request: Request):
+    """
+    Server-sent event stream: `nodes`, `health` and `repair` events.
+    A new viewer first receives the latest state of each, then changes
+    as they happen.
+    """
+    async def stream():
+        queue = event_bus.subscribe()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(
+                        queue.get(), timeout=EVENT_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ─────────────────────────────────────────────────────────
 # FILE METADATA
 # ─────────────────────────────────────────────────────────
@@ -157,37 +531,221 @@ def get_file_info(file_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@app.get("/files/{file_id}/proof/{index}")
+def get_file_chunk_proof(file_id: str, index: int):
+    try:
+        return get_chunk_proof(get_manifest(file_id), index)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/files/{file_id}")
+def delete_file(file_id: str):
+    """
+    Marks the file deleted and returns at once; its chunks are reclaimed
+    by the background garbage collector.
+    """
+    try:
+        tombstone = mark_deleted(file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    invalidate_cache(file_id)
+    access_stats.forget(file_id)
+    return {
+        "success": True,
+        "file_id": file_id,
+        "chunks_pending": len(tombstone["chunks"]),
+    }
+
+
+@app.get("/files/{file_id}/access")
+def get_file_access_stats(file_id: str):
+    """Read heat of the file and each chunk, its tier and read replicas."""
+    try:
+        return get_file_access(file_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/files/{file_id}/versions")
+def get_file_versions(file_id: str):
+    try:
+        return {"file_id": file_id, "versions": list_versions(file_id)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# ─────────────────────────────────────────────────────────
+# PARTIAL UPDATES (APPEND / PATCH)
+# ─────────────────────────────────────────────────────────
+
+async def _apply_update(file_id: str, update, *args):
+    try:
+        result = await asyncio.to_thread(update, file_id, *args)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    invalidate_cache(file_id)
+    return {"success": True, **result}
+
+
+@app.post("/files/{file_id}/append")
+async def append_file(file_id: str, file: UploadFile = File(...)):
+    data = await file.read()
+    return await _apply_update(file_id, append_to_file, data)
+
+
+@app.patch("/files/{file_id}")
+async def patch_file_range(file_id: str, offset: int, file: UploadFile = File(...)):
+    """Overwrite bytes at offset; only the overlapping chunks are rewritten."""
+    data = await file.read()
+    return await _apply_update(file_id, patch_file, offset, data)
+
+
 # ─────────────────────────────────────────────────────────
 # FILE UPLOAD
 # ─────────────────────────────────────────────────────────
 
+def _ingest_file(stream, file_name: str, checksum: str) -> dict:
+    manifest = split_stream(stream, file_name, checksum=checksum)
+    manifest = distribute_chunks(manifest)
+    try:
+        save_manifest(manifest)
+    except Exception:
+        abort_upload(manifest["file_id"])
+        raise
+    commit_upload(manifest["file_id"])
+    return manifest
+
+
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    temp_path = os.path.join(UPLOAD_TEMP, file.filename)
+async def upload_file(file: UploadFile = File(...), checksum: str = DEFAULT_CHECKSUM_POLICY):
+    try:
+        # Chunked and hashed straight from the upload stream, off the event
+        # loop, so concurrent uploads share group commits
+        manifest = await asyncio.to_thread(
+            _ingest_file, file.file, os.path.basename(file.filename), checksum
+        )
+
+        return {
+            "success": True,
+            "file_id": manifest["file_id"],
+            "file_name": manifest["file_name"],
+            "file_size": manifest["file_size"],
+            "total_chunks": manifest["total_chunks"],
+        }
 
-    async with aiofiles.open(temp_path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+
+# ─────────────────────────────────────────────────────────
+# MULTIPART UPLOAD (RESUMABLE, PARALLEL)
+# ─────────────────────────────────────────────────────────
+
+@app.post("/multipart")
+def multipart_initiate(file_name: str, checksum: str = DEFAULT_CHECKSUM_POLICY):
     try:
-        manifest = split_file(temp_path)
-        manifest = distribute_chunks(manifest)
-        save_manifest(manifest)
+        return initiate_upload(file_name, checksum)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.put("/multipart/{upload_id}/parts/{part_number}")
+async def multipart_upload_part(upload_id: str, part_number: int, file: UploadFile = File(...)):
+    try:
+        # Each part is chunked and placed in its own thread — parts run in parallel
+        return await asyncio.to_thread(upload_part, upload_id, part_number, file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+@app.get("/multipart/{upload_id}")
+def multipart_status(upload_id: str):
+    try:
+        return get_upload_status(upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/multipart/{upload_id}/complete")
+def multipart_complete(upload_id: str, payload: dict = Body(default={})):
+    try:
+        manifest = complete_upload(upload_id, payload.get("parts"))
         return {
             "success": True,
             "file_id": manifest["file_id"],
             "file_name": manifest["file_name"],
             "file_size": manifest["file_size"],
             "total_chunks": manifest["total_chunks"],
+            "full_hash": manifest["full_hash"],
         }
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/multipart/{upload_id}")
+def multipart_abort(upload_id: str):
+    try:
+        return abort_multipart_upload(upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# ─────────────────────────────────────────────────────────
+# BULK INGEST / EXPORT (TAR, ZIP)
+# ─────────────────────────────────────────────────────────
 
+@app.post("/bulk")
+async def bulk_ingest(
+    file: UploadFile = File(...),
+    format: str = None,
+    checksum: str = DEFAULT_CHECKSUM_POLICY,
+):
+    """Every file in a tar or zip archive, in one pass and one metadata commit."""
+    try:
+        result = await asyncio.to_thread(ingest_archive, file.file, format, checksum)
+        return {"success": True, **result}
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+
+@app.get("/bulk/export")
+def bulk_export(file_ids: str = None, format: str = "tar"):
+    """Stream files as one archive. file_ids: comma-separated (default: all)."""
+    if format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported archive format: {format}")
+    ids = [i for i in file_ids.split(",") if i] if file_ids else None
+    try:
+        stream = export_archive(ids, format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type = "application/zip" if format == "zip" else "application/x-tar"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cosmeon-export.{format}"'},
+    )
 
 
 # ─────────────────────────────────────────────────────────
@@ -195,12 +753,22 @@ async def upload_file(file: UploadFile = File(...)):
 # ─────────────────────────────────────────────────────────
 
 @app.get("/download/{file_id}")
-def download_file(file_id: str):
+def download_file(file_id: str, version: int = None):
     try:
+        if version is not None:
+            # Older versions are rebuilt on demand and never cached
+            manifest = get_manifest_version(file_id, version)
+            return FileResponse(
+                path=reconstruct_file(file_id, version),
+                filename=manifest["file_name"],
+                media_type="application/octet-stream"
+            )
+
         cached_path = get_from_cache(file_id)
 
         if cached_path:
             manifest = get_manifest(file_id)
+            access_stats.record_read(file_id, cached_bytes=os.path.getsize(cached_path))
             return FileResponse(
                 path=cached_path,
                 filename=manifest["file_name"],
@@ -223,60 +791,97 @@ def download_file(file_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ─────────────────────────────────────────────────────────
-# VERIFY
-# ─────────────────────────────────────────────────────────
-
-@app.get("/verify/{file_id}")
-def verify_file(file_id: str):
+@app.get("/download/{file_id}/range")
+def download_range(file_id: str, start: int = 0, end: int = None):
+    """
+    Bytes [start, end] (inclusive). Only the overlapping chunks are read,
+    each verified against its Merkle proof.
+    """
     try:
         manifest = get_manifest(file_id)
-        from fs_lite.node_manager import read_chunk_from_node, get_node
-        import hashlib
-
-        all_passed = True
-
-        for chunk in manifest["chunks"]:
-            chunk_id = chunk["id"]
-            primary = chunk["primary_node"]
-            replica = chunk["replica_node"]
-            expected_hash = chunk["hash"]
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-            data = None
+    file_size = manifest["file_size"]
+    end = file_size - 1 if end is None else min(end, file_size - 1)
+    if start < 0 or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Invalid range {start}-{end} for file of {file_size} bytes"
+        )
 
-            try:
-                if get_node(primary)["status"] == "ONLINE":
-                    data = read_chunk_from_node(primary, chunk_id)
-            except Exception:
-                pass
+    try:
+        data = read_file_range(manifest, start, end)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            if data is None:
-                try:
-                    if get_node(replica)["status"] == "ONLINE":
-                        data = read_chunk_from_node(replica, chunk_id)
-                except Exception:
-                    pass
+    return Response(
+        content=data,
+        status_code=206,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+            "Accept-Ranges": "bytes",
+            "X-Merkle-Root": manifest.get("merkle_root", ""),
+        },
+    )
 
-            if data is None or hashlib.sha256(data).hexdigest() != expected_hash:
-                all_passed = False
 
-        return {
-            "file_id": file_id,
-            "file_name": manifest["file_name"],
-            "overall": "PASS" if all_passed else "FAIL"
-        }
+# ─────────────────────────────────────────────────────────
+# VERIFY
+# ─────────────────────────────────────────────────────────
 
+@app.get("/verify/{file_id}")
+def verify_single_file(file_id: str):
+    try:
+        return verify_file(file_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@app.post("/verify")
+def verify_bulk(payload: dict = Body(...)):
+    """Body: {"file_ids": ["a3f9c1b2", ...]} or {"file_ids": "all"}"""
+    file_ids = payload.get("file_ids")
+    if file_ids != "all" and not isinstance(file_ids, list):
+        raise HTTPException(
+            status_code=400,
+            detail='file_ids must be a list of IDs or "all"'
+        )
+    return verify_files(file_ids)
+
+
 # ─────────────────────────────────────────────────────────
 # SYSTEM HEALTH
 # ─────────────────────────────────────────────────────────
 
 @app.get("/health")
-def system_health():
-    return scan_system_health()
+def system_health(
+    details: str = "unhealthy",
+    file_id: str = None,
+    offset: int = 0,
+    limit: int = 100,
+):
+    try:
+        return scan_system_health(
+            details=details,
+            file_id=file_id,
+            offset=max(offset, 0),
+            limit=max(limit, 0),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/health/summary")
+def system_health_summary(fresh: bool = False):
+    """
+    Counters from the last background scan (no disk I/O per request);
+    fresh=true runs a new scan.
+    """
+    if fresh:
+        return get_health_summary()
+    return get_cached_health_summary()
 
 
 @app.post("/repair")
@@ -284,6 +889,62 @@ def repair_system():
     return repair_under_replicated_chunks()
 
 
+@app.get("/repair/status")
+def repair_status():
+    """Repair state, last pass stats and time to restore full redundancy."""
+    return get_repair_status()
+
+
+# ─────────────────────────────────────────────────────────
+# HOT / COLD TIERING
+# ─────────────────────────────────────────────────────────
+
+@app.get("/tiering")
+def tiering_status():
+    """Tier counts, hottest files, recent tier changes and traffic savings."""
+    return get_tiering_status()
+
+
+@app.put("/tiering")
+def tiering_configure(payload: dict = Body(...)):
+    """Set hot_reads, cold_reads, cold_after_seconds and/or cold_nodes."""
+    try:
+        configure_tiering(
+            hot_reads=payload.get("hot_reads"),
+            cold_reads=payload.get("cold_reads"),
+            cold_after_seconds=payload.get("cold_after_seconds"),
+            cold_nodes=payload.get("cold_nodes"),
+        )
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return get_tiering_status()["policy"]
+
+
+@app.post("/tiering")
+def tiering_run():
+    return run_tiering()
+
+
+# ─────────────────────────────────────────────────────────
+# GARBAGE COLLECTION
+# ─────────────────────────────────────────────────────────
+
+@app.get("/gc")
+def gc_status():
+    return get_gc_status()
+
+
+@app.post("/gc")
+def gc_run(grace_seconds: float = GC_GRACE_SECONDS):
+    """Reclaim deleted files and sweep for orphans now."""
+    if grace_seconds < 0:
+        raise HTTPException(status_code=400, detail="grace_seconds must be >= 0")
+    return {
+        "deleted": collect_deleted(),
+        "sweep": sweep_orphans(grace_seconds),
+    }
+
+
 # ─────────────────────────────────────────────────────────
 # RESET CLUSTER
 # ─────────────────────────────────────────────────────────
@@ -299,13 +960,20 @@ def reset_cluster():
             node_path = os.path.join(nodes_dir, node_id)
             if os.path.isdir(node_path):
                 for f in os.listdir(node_path):
-                    if not f.startswith("."):
+                    if not f.startswith(".") or f.endswith(TEMP_SUFFIX):
                         os.remove(os.path.join(node_path, f))
 
         # Clear metadata
         metadata_path = os.path.join(base_dir, "metadata", "metadata.json")
         if os.path.exists(metadata_path):
             os.remove(metadata_path)
+        for path in (VERSIONS_FILE, TOMBSTONES_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+
+        # Clear in-flight upload intents
+        shutil.rmtree(INTENT_DIR, ignore_errors=True)
+        shutil.rmtree(MULTIPART_DIR, ignore_errors=True)
 
         # Clear downloads
         downloads_dir = os.path.join(base_dir, "downloads")
@@ -313,8 +981,12 @@ def reset_cluster():
             for f in os.listdir(downloads_dir):
                 os.remove(os.path.join(downloads_dir, f))
 
-        # Clear cache
+        # Clear cache and read statistics
         file_cache.clear()
+        access_stats.reset()
+
+        # Node view changed behind node_manager's back — rebuild it
+        refresh_node_state()
 
         print("🧹 Cluster reset completed successfully.")
         return {"message": "Cluster reset successful"}
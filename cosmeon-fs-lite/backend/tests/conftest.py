@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fs_lite import anti_entropy, intent_log, metadata_store, multipart, node_manager, reconstruct
+from fs_lite.chunk_engine import split_stream
+from fs_lite.distributor import distribute_chunks
+from fs_lite.failure_detector import detector
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    """
+    An empty four-node cluster and metadata store under tmp_path, with
+    every node ONLINE. Restored when the test ends.
+    """
+    nodes_dir = tmp_path / "nodes"
+    metadata_dir = tmp_path / "metadata"
+    for node_id in node_manager.NODE_IDS:
+        (nodes_dir / node_id).mkdir(parents=True)
+    metadata_dir.mkdir()
+
+    monkeypatch.setattr(node_manager, "NODES_DIR", str(nodes_dir))
+    monkeypatch.setattr(metadata_store, "METADATA_DIR", str(metadata_dir))
+    monkeypatch.setattr(metadata_store, "METADATA_FILE", str(metadata_dir / "metadata.json"))
+    monkeypatch.setattr(metadata_store, "VERSIONS_FILE", str(metadata_dir / "versions.json"))
+    monkeypatch.setattr(metadata_store, "TOMBSTONES_FILE", str(metadata_dir / "tombstones.json"))
+    monkeypatch.setattr(intent_log, "INTENT_DIR", str(metadata_dir / "intents"))
+    monkeypatch.setattr(multipart, "MULTIPART_DIR", str(metadata_dir / "multipart"))
+    monkeypatch.setattr(reconstruct, "DOWNLOADS_DIR", str(tmp_path / "downloads"))
+    monkeypatch.setattr(metadata_store, "_cache", {"signature": None, "manifests": {}})
+    monkeypatch.setattr(node_manager, "_chunk_index", None)
+    monkeypatch.setattr(anti_entropy, "_expected_cache", {"signature": None, "placements": None, "digests": None})
+
+    for node_id in node_manager.NODE_IDS:
+        detector.reset(node_id)
+    node_manager.refresh_node_state()
+    return tmp_path
+
+
+def make_manifest(data: bytes, file_id: str = None, chunk_size: int = 1024, **kwargs) -> dict:
+    """Manifest of data split into small chunks (not yet placed)."""
+    return split_stream(
+        io.BytesIO(data), "test.bin", chunk_size=chunk_size,
+        file_id=file_id, verbose=False, **kwargs,
+    )
+
+
+def store_file(data: bytes, file_id: str = None, chunk_size: int = 1024, **kwargs) -> dict:
+    """Upload data the way POST /upload does; returns the saved manifest."""
+    manifest = distribute_chunks(make_manifest(data, file_id, chunk_size, **kwargs))
+    metadata_store.save_manifest(manifest)
+    intent_log.commit_upload(manifest["file_id"])
+    return metadata_store.get_manifest(manifest["file_id"])
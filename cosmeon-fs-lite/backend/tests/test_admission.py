@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fs_lite import admission as admission_module
+from fs_lite.admission import (
+    RETRY_AFTER_BUSY,
+    RETRY_AFTER_FULL,
+    AdmissionController,
+    AdmissionRejected,
+    placeable_bytes,
+)
+from fs_lite.node_manager import MAX_STORAGE_BYTES, set_node_status
+
+# Four empty nodes at replication factor 2
+PLACEABLE = 2 * MAX_STORAGE_BYTES
+
+
+def _rejection(coro) -> AdmissionRejected:
+    with pytest.raises(AdmissionRejected) as e:
+        asyncio.run(coro)
+    return e.value
+
+
+def test_placeable_bytes_needs_copies_on_distinct_nodes():
+    assert placeable_bytes([100, 100, 100, 100]) == 200
+    assert placeable_bytes([1000, 10, 10]) == 20      # one big node can't hold both copies
+    assert placeable_bytes([1000]) == 0
+
+
+def test_missing_length_is_411(cluster):
+    rejected = _rejection(AdmissionController().admit(None))
+    assert rejected.status_code == 411
+    assert rejected.retry_after is None
+
+
+def test_more_than_the_cluster_holds_is_507(cluster):
+    controller = AdmissionController()
+    rejected = _rejection(controller.admit(PLACEABLE + 1))
+    assert (rejected.status_code, rejected.retry_after) == (507, RETRY_AFTER_FULL)
+
+    # Offline nodes' space doesn't count
+    set_node_status("node_0", "OFFLINE")
+    set_node_status("node_1", "OFFLINE")
+    rejected = _rejection(controller.admit(MAX_STORAGE_BYTES + 1))
+    assert rejected.status_code == 507
+    assert controller.snapshot()["rejected_full"] == 2
+
+
+def test_space_reserved_by_uploads_in_progress_is_429(cluster):
+    controller = AdmissionController()
+
+    async def scenario():
+        ticket = await controller.admit(PLACEABLE - 100)
+        try:
+            await controller.admit(200)
+        finally:
+            controller.release(ticket)
+
+    rejected = _rejection(scenario())
+    assert (rejected.status_code, rejected.retry_after) == (429, RETRY_AFTER_BUSY)
+
+    snapshot = controller.snapshot()
+    assert snapshot["reserved_bytes"] == 0 and snapshot["active"] == 0
+
+
+def test_full_queue_is_429_and_queued_ingests_get_freed_slots(cluster, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_CONCURRENT_INGESTS", 1)
+    monkeypatch.setattr(admission_module, "MAX_QUEUED_INGESTS", 1)
+    controller = AdmissionController()
+
+    async def scenario():
+        first = await controller.admit(10)
+        queued = asyncio.ensure_future(controller.admit(10))
+        await asyncio.sleep(0)
+        assert controller.snapshot()["queued"] == 1
+
+        with pytest.raises(AdmissionRejected) as e:
+            await controller.admit(10)
+        assert e.value.status_code == 429
+
+        controller.release(first)
+        controller.release(await queued)
+
+    asyncio.run(scenario())
+    snapshot = controller.snapshot()
+    assert (snapshot["admitted"], snapshot["rejected_busy"]) == (2, 1)
+
+
+def test_queue_timeout_is_429(cluster, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_CONCURRENT_INGESTS", 1)
+    monkeypatch.setattr(admission_module, "QUEUE_TIMEOUT_SECONDS", 0.01)
+    controller = AdmissionController()
+
+    async def scenario():
+        ticket = await controller.admit(10)
+        try:
+            await controller.admit(10)
+        finally:
+            controller.release(ticket)
+
+    assert _rejection(scenario()).status_code == 429
+    assert controller.snapshot()["queued"] == 0
+
+
+def test_middleware_turns_ingests_away_before_the_body(cluster, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "admission", AdmissionController())
+    client = TestClient(main.app)
+
+    # Chunked body: no Content-Length
+    response = client.post("/files/f1/append", content=iter([b"x" * 10]))
+    assert response.status_code == 411
+
+    response = client.post(
+        "/files/f1/append", content=b"",
+        headers={"Content-Length": str(PLACEABLE + 1)},
+    )
+    assert response.status_code == 507
+    assert response.headers["Retry-After"] == str(RETRY_AFTER_FULL)
+
+    # Not an ingest: never gated
+    assert client.get("/admission").status_code == 200
@@ -0,0 +1,47 @@
+import os
+
+from fs_lite import anti_entropy
+from fs_lite.anti_entropy import find_divergence
+from fs_lite.node_manager import delete_chunk_from_node
+
+from conftest import store_file
+
+
+def test_in_sync_cluster_reports_nothing(cluster):
+    store_file(os.urandom(5000), file_id="f")
+
+    result = find_divergence()
+
+    assert result["in_sync"]
+    assert result["affected_files"] == []
+
+
+def test_missing_copy_is_found(cluster):
+    manifest = store_file(os.urandom(5000), file_id="f")
+    chunk = manifest["chunks"][2]
+    delete_chunk_from_node(chunk["primary_node"], chunk["id"])
+
+    result = find_divergence()
+
+    assert result["affected_files"] == ["f"]
+    assert result["nodes"][chunk["primary_node"]]["missing_chunks"] == [chunk["id"]]
+
+
+def test_expected_placements_are_rebuilt_only_when_metadata_changes(cluster, monkeypatch):
+    store_file(os.urandom(3000), file_id="a")
+    builds = []
+    real_build = anti_entropy._expected_placements
+
+    def counting_build():
+        builds.append(1)
+        return real_build()
+
+    monkeypatch.setattr(anti_entropy, "_expected_placements", counting_build)
+
+    find_divergence()
+    find_divergence()
+    assert len(builds) == 1
+
+    store_file(os.urandom(3000), file_id="b")
+    assert find_divergence()["in_sync"]
+    assert len(builds) == 2
@@ -0,0 +1,143 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from fs_lite import bulk, intent_log
+from fs_lite.bulk import export_archive, ingest_archive
+from fs_lite.metadata_store import delete_manifest, get_manifest, list_files, update_manifest
+from fs_lite.node_manager import NODE_IDS, get_node_chunks
+from fs_lite.reconstruct import reconstruct_file
+
+from conftest import store_file
+
+
+def _tar(members: dict, mode: str = "w") -> io.BytesIO:
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode=mode) as archive:
+        directory = tarfile.TarInfo("docs")
+        directory.type = tarfile.DIRTYPE      # not a regular file
+        archive.addfile(directory)
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    stream.seek(0)
+    return stream
+
+
+def _zip(members: dict) -> io.BytesIO:
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w") as archive:
+        archive.writestr("docs/", b"")
+        for name, data in members.items():
+            archive.writestr(name, data)
+    stream.seek(0)
+    return stream
+
+
+def _read(file_id: str) -> bytes:
+    with open(reconstruct_file(file_id), "rb") as f:
+        return f.read()
+
+
+def _store_named(data: bytes, file_id: str, file_name: str):
+    manifest = store_file(data, file_id=file_id)
+    manifest["file_name"] = file_name
+    update_manifest(manifest)
+
+
+def _stored_chunks() -> int:
+    return sum(len(get_node_chunks(node_id)) for node_id in NODE_IDS)
+
+
+MEMBERS = {
+    "docs/a.txt": b"alpha" * 300,
+    "docs/b.bin": os.urandom(5000),
+    "c.bin": b"",
+}
+
+
+@pytest.mark.parametrize("make_archive", [_tar, _zip])
+def test_ingest_stores_every_regular_member(cluster, monkeypatch, make_archive):
+    monkeypatch.setattr(bulk, "BULK_BATCH_FILES", 2)
+
+    result = ingest_archive(make_archive(MEMBERS))
+
+    assert result["files_ingested"] == 3
+    assert result["skipped_members"] == 1
+    assert result["batches"] == 2
+    assert result["bytes_ingested"] == sum(len(d) for d in MEMBERS.values())
+    by_name = {f["file_name"]: f["file_id"] for f in result["files"]}
+    for name, data in MEMBERS.items():
+        assert _read(by_name[os.path.basename(name)]) == data
+    assert intent_log.list_intent_chunk_ids() == set()
+
+
+def test_format_is_detected_and_compressed_tar_is_read(cluster):
+    assert ingest_archive(_zip(MEMBERS))["files_ingested"] == 3
+    assert ingest_archive(_tar(MEMBERS, "w:gz"))["files_ingested"] == 3
+    assert len(list_files()) == 6
+
+
+def test_failed_ingest_leaves_nothing_behind(cluster, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_BATCH_FILES", 1)     # a.txt is written first
+    archive = _tar(MEMBERS).getvalue()
+    truncated = io.BytesIO(archive[:len(archive) // 2])
+
+    with pytest.raises(ValueError):
+        ingest_archive(truncated, "tar")
+
+    assert list_files() == []
+    assert _stored_chunks() == 0
+
+    with pytest.raises(ValueError):
+        ingest_archive(_tar({}), "tar")     # no files at all
+    with pytest.raises(ValueError):
+        ingest_archive(_tar(MEMBERS), "rar")
+
+
+@pytest.mark.parametrize("archive_format", ["tar", "zip"])
+def test_export_round_trips(cluster, archive_format):
+    files = {
+        "f1": (b"one" * 1000, "same.txt"),
+        "f2": (os.urandom(4000), "same.txt"),
+        "f3": (os.urandom(10), "other.bin"),
+    }
+    for file_id, (data, name) in files.items():
+        _store_named(data, file_id, name)
+
+    exported = io.BytesIO(b"".join(export_archive(["f1", "f2", "f3"], archive_format)))
+
+    if archive_format == "zip":
+        with zipfile.ZipFile(exported) as archive:
+            members = {name: archive.read(name) for name in archive.namelist()}
+    else:
+        with tarfile.open(fileobj=exported) as archive:
+            members = {m.name: archive.extractfile(m).read() for m in archive}
+    assert members == {
+        "same.txt": files["f1"][0],
+        "f2_same.txt": files["f2"][0],
+        "other.bin": files["f3"][0],
+    }
+
+    # And back in again
+    exported.seek(0)
+    result = ingest_archive(exported)
+    assert sorted(f["file_size"] for f in result["files"]) == [10, 3000, 4000]
+
+
+def test_export_defaults_to_every_current_file(cluster):
+    _store_named(b"kept" * 100, "f1", "kept.txt")
+    _store_named(b"gone" * 100, "f2", "gone.txt")
+    delete_manifest("f2")
+
+    exported = io.BytesIO(b"".join(export_archive()))
+    with tarfile.open(fileobj=exported) as archive:
+        assert archive.getnames() == ["kept.txt"]
+
+    with pytest.raises(ValueError):
+        export_archive(["f2"])
+    assert get_manifest("f1")["file_name"] == "kept.txt"
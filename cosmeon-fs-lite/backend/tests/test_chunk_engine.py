@@ -0,0 +1,41 @@
+import os
+import threading
+import time
+
+from fs_lite import health_monitor
+from fs_lite.io_scheduler import SCRUB, scheduler
+
+from conftest import make_manifest, store_file
+
+
+def test_chunks_hashes_and_merkle_root():
+    data = os.urandom(2500)
+    manifest = make_manifest(data, file_id="f", checksum="sha256+crc32")
+
+    assert [c["id"] for c in manifest["chunks"]] == ["f_0", "f_1", "f_2"]
+    assert [c["size"] for c in manifest["chunks"]] == [1024, 1024, 452]
+    assert b"".join(c["data"] for c in manifest["chunks"]) == data
+    assert all(c["hash"] and c["fast_hash"] for c in manifest["chunks"])
+    assert manifest["checksums"]["fast"] == "crc32"
+
+
+def test_upload_hashing_is_not_held_up_by_a_throttled_scan(cluster):
+    for i in range(4):
+        store_file(os.urandom(4096), file_id=f"f{i}")
+    previous = scheduler.get_limits()["classes"][SCRUB]
+    # 32 chunk copies of 1 KB at 4 KB/s: the scan sleeps for several seconds
+    scheduler.set_class_limit(SCRUB, 4096)
+    try:
+        scan = threading.Thread(target=health_monitor.scan_system_health, kwargs={"details": "none"})
+        scan.start()
+        time.sleep(0.3)
+
+        started = time.monotonic()
+        make_manifest(os.urandom(2 * 1024 * 1024), chunk_size=64 * 1024)
+        elapsed = time.monotonic() - started
+
+        assert scan.is_alive()
+        assert elapsed < 1.0
+    finally:
+        scheduler.set_class_limit(SCRUB, previous)
+        scan.join()
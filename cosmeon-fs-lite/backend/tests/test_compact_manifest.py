@@ -0,0 +1,137 @@
+import hashlib
+import json
+
+import pytest
+
+from fs_lite.compact_manifest import CompactManifest
+from fs_lite.merkle import build_tree
+from fs_lite.metadata_store import get_compact_manifest, get_manifest, save_manifest
+
+CHUNK_SIZE = 1024
+
+
+def _manifest(chunk_ids: list, fast=None, **header) -> dict:
+    """A manifest over chunk_ids; fast[i] False leaves chunk i without a fast_hash."""
+    chunks = []
+    for index, chunk_id in enumerate(chunk_ids):
+        chunk = {
+            "id": chunk_id,
+            "index": index,
+            "size": CHUNK_SIZE if index < len(chunk_ids) - 1 else 100,
+            "hash": hashlib.sha256(chunk_id.encode()).hexdigest(),
+            "primary_node": f"node_{index % 3}",
+            "replica_node": f"node_{(index + 1) % 3}",
+        }
+        if fast is not None and fast[index]:
+            chunk["fast_hash"] = f"{index:08x}"
+        chunks.append(chunk)
+    return {
+        "file_id": "f1",
+        "file_name": "f1.bin",
+        "file_size": CHUNK_SIZE * (len(chunk_ids) - 1) + 100,
+        "total_chunks": len(chunk_ids),
+        "chunk_size": CHUNK_SIZE,
+        "full_hash": "0" * 64,
+        **header,
+        "chunks": chunks,
+    }
+
+
+def _round_trip(manifest: dict) -> CompactManifest:
+    """Pack, store as JSON, load back; the result must match the input exactly."""
+    record = json.loads(json.dumps(CompactManifest.from_dict(manifest).to_record()))
+    loaded = CompactManifest.from_record(record)
+    assert loaded.to_dict() == manifest
+    assert list(loaded.iter_chunk_ids()) == [c["id"] for c in manifest["chunks"]]
+    return loaded
+
+
+def test_multipart_ids_round_trip_as_one_run_per_part():
+    ids = [f"f1_p1_9c01aa_{n}" for n in range(4)] + [f"f1_p2_77aa00_{n}" for n in range(3)]
+    loaded = _round_trip(_manifest(ids))
+    assert loaded.runs == [("f1_p1_9c01aa_", 0, ""), ("f1_p2_77aa00_", 0, "")]
+    assert loaded.chunk_id(5) == "f1_p2_77aa00_1"
+
+
+def test_patched_ids_break_the_run():
+    ids = ["f1_0", "f1_1", "f1_2_v3", "f1_3_v3", "f1_4"]
+    loaded = _round_trip(_manifest(ids))
+    assert loaded.run_starts == [0, 2, 4]
+    assert loaded.runs[1] == ("f1_", 2, "_v3")
+    assert loaded.chunk_id(3) == "f1_3_v3"
+
+
+def test_non_contiguous_and_unnumbered_ids():
+    ids = ["f1_0", "f1_1", "f1_7", "f1_8", "f1_2", "custom", "f1_3"]
+    loaded = _round_trip(_manifest(ids))
+    assert loaded.run_starts == [0, 2, 4, 5, 6]
+    assert loaded.runs[3] == ("custom", None, None)
+    assert [loaded.chunk_id(i) for i in range(len(ids))] == ids
+
+
+@pytest.mark.parametrize("fast", [
+    [False, False, True, True],
+    [True, True, False, True],
+    [True, False, False, False],
+])
+def test_mixed_fast_hash_presence(fast):
+    loaded = _round_trip(_manifest(["f1_0", "f1_1", "f1_2", "f1_3"], fast=fast))
+    assert ["fast_hash" in loaded.chunk(i) for i in range(4)] == fast
+
+
+def test_sizes_and_placements_round_trip():
+    manifest = _manifest([f"f1_{n}" for n in range(5)])
+    manifest["chunks"][0]["replica_node"] = ""
+    loaded = _round_trip(manifest)
+    assert loaded.size_overrides == {4: 100}
+    assert loaded.placement(0) == ("node_0", "")
+
+
+def test_legacy_list_of_chunks_record_loads():
+    manifest = _manifest(["f1_0", "f1_1", "f1_2"], fast=[True, True, True], version=2)
+    legacy = json.loads(json.dumps(manifest))
+    legacy["chunks"].reverse()  # stored order doesn't matter, index does
+
+    loaded = CompactManifest.from_record(legacy)
+
+    assert loaded.to_dict() == manifest
+    assert loaded.tree is None
+    assert loaded.merkle_levels() == build_tree([c["hash"] for c in manifest["chunks"]])
+
+
+def test_stored_tree_round_trips():
+    manifest = _manifest([f"f1_{n}" for n in range(7)])
+    compact = CompactManifest.from_dict(manifest)
+    levels = build_tree(compact.chunk_hashes())
+    compact.set_merkle_levels(levels)
+
+    loaded = CompactManifest.from_record(json.loads(json.dumps(compact.to_record())))
+    assert loaded.merkle_levels() == levels
+
+
+def test_unknown_table_format_is_rejected():
+    record = CompactManifest.from_dict(_manifest(["f1_0"])).to_record()
+    record["chunk_table"]["format"] = 99
+    with pytest.raises(ValueError):
+        CompactManifest.from_record(record)
+
+
+def test_editing_a_manifest_copy_leaves_the_cache_alone(cluster):
+    save_manifest(_manifest(
+        ["f1_0", "f1_1"],
+        checksums={"strong": "sha256", "fast": "crc32"},
+        parts=[{"part_number": 1, "size": 1124}],
+        read_replicas={"f1_0": "node_2"},
+    ))
+
+    manifest = get_manifest("f1")
+    manifest["checksums"]["fast"] = None
+    manifest["parts"][0]["size"] = 0
+    manifest["read_replicas"]["f1_1"] = "node_0"
+    manifest["chunks"][0]["primary_node"] = "node_9"
+
+    header = get_compact_manifest("f1").header
+    assert header["checksums"] == {"strong": "sha256", "fast": "crc32"}
+    assert header["parts"] == [{"part_number": 1, "size": 1124}]
+    assert header["read_replicas"] == {"f1_0": "node_2"}
+    assert get_manifest("f1")["chunks"][0]["primary_node"] == "node_0"
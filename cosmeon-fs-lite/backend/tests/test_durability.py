@@ -0,0 +1,128 @@
+import os
+import stat
+import threading
+
+import pytest
+
+from fs_lite import durability
+from fs_lite.durability import GroupCommitter, temp_path_for
+
+
+def _stage(directory, name: str, data: bytes = b"chunk") -> tuple:
+    final_path = os.path.join(directory, name)
+    tmp_path = temp_path_for(final_path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    return tmp_path, final_path
+
+
+def test_commit_publishes_staged_files(tmp_path):
+    committer = GroupCommitter(window=0)
+    entry = _stage(str(tmp_path), "a", b"hello")
+
+    committer.commit([entry])
+
+    assert not os.path.exists(entry[0])
+    with open(entry[1], "rb") as f:
+        assert f.read() == b"hello"
+
+
+def test_concurrent_writers_share_a_batch(tmp_path):
+    committer = GroupCommitter(window=0.05)
+    entries = [_stage(str(tmp_path), f"chunk_{i}") for i in range(8)]
+
+    threads = [threading.Thread(target=committer.commit, args=([e],)) for e in entries]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(os.path.exists(final_path) for _, final_path in entries)
+    assert committer.entries_committed == 8
+    assert committer.batches_committed < 8
+
+
+def test_file_fsync_error_fails_only_that_entry(tmp_path, monkeypatch):
+    # Per-file fsync: the fallback where syncfs isn't available
+    committer = GroupCommitter(window=0, batch_sync=False)
+    good = _stage(str(tmp_path), "good")
+    bad = _stage(str(tmp_path), "bad")
+    bad_inode = os.stat(bad[0]).st_ino
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        if os.fstat(fd).st_ino == bad_inode:
+            raise OSError(5, "Input/output error")
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+
+    with pytest.raises(OSError):
+        committer.commit([good, bad])
+    assert os.path.exists(good[1])
+    assert not os.path.exists(bad[1])
+
+
+@pytest.mark.skipif(os.name == "nt", reason="directories can't be synced on Windows")
+def test_directory_fsync_error_is_raised(tmp_path, monkeypatch):
+    committer = GroupCommitter(window=0)
+    entry = _stage(str(tmp_path), "a")
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        if stat.S_ISDIR(os.fstat(fd).st_mode):
+            raise OSError(5, "Input/output error")
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+
+    with pytest.raises(OSError):
+        committer.commit([entry])
+
+
+def _fake_syncfs(monkeypatch, result: int = 0) -> list:
+    calls = []
+
+    def syncfs(fd):
+        calls.append(os.fstat(fd).st_dev)
+        if result:
+            durability.ctypes.set_errno(5)
+        return result
+
+    monkeypatch.setattr(durability, "_syncfs", syncfs)
+    return calls
+
+
+def test_batch_syncs_each_filesystem_once(tmp_path, monkeypatch):
+    calls = _fake_syncfs(monkeypatch)
+    real_fsync = os.fsync
+    file_fsyncs = []
+
+    def fsync(fd):
+        if not stat.S_ISDIR(os.fstat(fd).st_mode):
+            file_fsyncs.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    committer = GroupCommitter(window=0, batch_sync=True)
+    dirs = [tmp_path / "node_0", tmp_path / "node_1"]
+    for d in dirs:
+        d.mkdir()
+    entries = [_stage(str(dirs[i % 2]), f"chunk_{i}") for i in range(6)]
+
+    committer.commit(entries)
+
+    assert calls == [os.stat(tmp_path).st_dev]
+    assert file_fsyncs == []
+    assert all(os.path.exists(final_path) for _, final_path in entries)
+
+
+def test_batch_sync_error_fails_the_whole_filesystem(tmp_path, monkeypatch):
+    _fake_syncfs(monkeypatch, result=-1)
+    committer = GroupCommitter(window=0, batch_sync=True)
+    entries = [_stage(str(tmp_path), f"chunk_{i}") for i in range(3)]
+
+    with pytest.raises(OSError):
+        committer.commit(entries)
+    # Not published: a failed sync may have lost the data
+    assert not any(os.path.exists(final_path) for _, final_path in entries)
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from fs_lite import failure_detector, reconstruct
+from fs_lite.failure_detector import (
+    IO_ERRORS_TO_SUSPECT,
+    OFFLINE,
+    ONLINE,
+    PROBE_INTERVAL,
+    SLOW_IO_SECONDS,
+    SUSPECT,
+    FailureDetector,
+    detector,
+)
+from fs_lite.node_manager import get_node_statuses, set_node_status
+
+from conftest import store_file
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(failure_detector.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _probe(fd: FailureDetector, clock: FakeClock, node_id: str, rounds: int):
+    for _ in range(rounds):
+        clock.now += PROBE_INTERVAL
+        fd.heartbeat(node_id)
+
+
+def test_silence_goes_suspect_then_offline_and_recovers(clock):
+    fd = FailureDetector()
+    _probe(fd, clock, "n", 20)
+
+    clock.now += PROBE_INTERVAL * 1.2     # a late probe is not a failure
+    assert fd.evaluate(["n"]) == []
+    assert fd.state("n") == ONLINE
+
+    clock.now += PROBE_INTERVAL * 2
+    assert fd.evaluate(["n"]) == [("n", ONLINE, SUSPECT)]
+
+    clock.now = fd._nodes["n"].last_seen + fd.detection_seconds
+    assert fd.evaluate(["n"]) == [("n", SUSPECT, OFFLINE)]
+
+    fd.heartbeat("n")
+    assert fd.evaluate(["n"]) == [("n", OFFLINE, ONLINE)]
+
+
+def test_detection_time_is_configurable(clock):
+    fd = FailureDetector()
+    fd.configure(phi_suspect=1000.0, detection_seconds=2.0)
+    _probe(fd, clock, "n", 5)
+
+    clock.now += 1.9
+    fd.evaluate(["n"])
+    assert fd.state("n") == ONLINE
+    clock.now += 0.1
+    fd.evaluate(["n"])
+    assert fd.state("n") == OFFLINE
+
+    with pytest.raises(ValueError):
+        fd.configure(detection_seconds=PROBE_INTERVAL)
+    with pytest.raises(ValueError):
+        fd.configure(phi_suspect=0)
+
+
+def test_failed_and_slow_io_mark_suspect_without_waiting(clock):
+    fd = FailureDetector()
+    _probe(fd, clock, "n", 5)
+
+    for _ in range(IO_ERRORS_TO_SUSPECT - 1):
+        fd.record_io("n", ok=False)
+    fd.record_io("n", ok=True, latency=SLOW_IO_SECONDS + 1)
+    assert fd.state("n") == SUSPECT      # no evaluate() needed
+
+    fd.record_io("n", ok=True, latency=0.01)
+    fd.evaluate(["n"])
+    assert fd.state("n") == ONLINE
+
+
+def test_operator_offline_overrides_the_detector(cluster):
+    assert detector.state("node_1") == ONLINE
+    set_node_status("node_1", "OFFLINE")
+    assert get_node_statuses()["node_1"] == "OFFLINE"
+
+    set_node_status("node_1", "ONLINE")
+    assert get_node_statuses()["node_1"] == "ONLINE"
+
+
+def test_reads_skip_a_suspect_node(cluster, monkeypatch):
+    data = os.urandom(3000)
+    manifest = store_file(data, file_id="f1")
+    suspect = manifest["chunks"][0]["primary_node"]
+    for _ in range(IO_ERRORS_TO_SUSPECT):
+        detector.record_io(suspect, ok=False)
+
+    nodes_read = []
+    real_read = reconstruct.read_chunk_from_node
+
+    def tracking_read(node_id, chunk_id, *args):
+        nodes_read.append(node_id)
+        return real_read(node_id, chunk_id, *args)
+
+    monkeypatch.setattr(reconstruct, "read_chunk_from_node", tracking_read)
+
+    with open(reconstruct.reconstruct_file("f1"), "rb") as f:
+        assert f.read() == data
+    assert suspect not in nodes_read
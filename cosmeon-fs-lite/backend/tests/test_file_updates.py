@@ -0,0 +1,114 @@
+import os
+import threading
+
+import pytest
+
+from fs_lite import file_updates, merkle
+from fs_lite.file_updates import append_to_file, patch_file
+from fs_lite.merkle import build_tree
+from fs_lite.metadata_store import get_compact_manifest, get_manifest, update_manifest
+from fs_lite.reconstruct import reconstruct_file
+
+from conftest import store_file
+
+
+def _read(file_id: str, version: int = None) -> bytes:
+    with open(reconstruct_file(file_id, version), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def parent_calls(monkeypatch):
+    """Counts internal Merkle node hashes."""
+    calls = []
+    real_parent = merkle._parent
+
+    def counting_parent(left, right):
+        calls.append(1)
+        return real_parent(left, right)
+
+    monkeypatch.setattr(merkle, "_parent", counting_parent)
+    return calls
+
+
+def _assert_tree_matches_hashes(file_id: str):
+    compact = get_compact_manifest(file_id)
+    assert compact.tree is not None
+    levels = compact.merkle_levels()
+    assert levels == build_tree(compact.chunk_hashes())
+    assert levels[-1][0] == compact.header["merkle_root"]
+
+
+def test_patch_rewrites_only_overlapping_chunks(cluster):
+    data = bytearray(os.urandom(5000))
+    store_file(bytes(data), file_id="f")
+
+    result = patch_file("f", 1500, b"x" * 100)
+    data[1500:1600] = b"x" * 100
+
+    assert result["chunks_rewritten"] == 1
+    assert _read("f") == bytes(data)
+    assert _read("f", version=1) != bytes(data)
+    assert get_manifest("f")["full_hash"] == get_manifest("f")["merkle_root"]
+    _assert_tree_matches_hashes("f")
+
+
+def test_append_tops_up_the_tail_and_grows(cluster):
+    data = os.urandom(2500)
+    store_file(data, file_id="f")
+
+    result = append_to_file("f", b"y" * 3000)
+
+    assert result["file_size"] == 5500
+    assert [c["size"] for c in get_manifest("f")["chunks"]] == [1024, 1024, 1024, 1024, 1024, 380]
+    assert _read("f") == data + b"y" * 3000
+    _assert_tree_matches_hashes("f")
+
+
+def test_one_chunk_patch_hashes_one_path(cluster, parent_calls):
+    store_file(os.urandom(64 * 1024), file_id="f")     # 64 chunks, depth 6
+    parent_calls.clear()
+
+    patch_file("f", 10 * 1024, b"z")
+
+    assert len(parent_calls) == 6
+    _assert_tree_matches_hashes("f")
+
+
+def test_placement_change_reuses_the_stored_tree(cluster, parent_calls):
+    store_file(os.urandom(16 * 1024), file_id="f")
+    manifest = get_manifest("f")
+    chunk = manifest["chunks"][0]
+    chunk["primary_node"], chunk["replica_node"] = chunk["replica_node"], chunk["primary_node"]
+    parent_calls.clear()
+
+    assert update_manifest(manifest)
+
+    assert parent_calls == []
+    _assert_tree_matches_hashes("f")
+
+
+def test_patch_past_the_end_is_rejected(cluster):
+    store_file(os.urandom(100), file_id="f")
+    with pytest.raises(RuntimeError):
+        patch_file("f", 101, b"x")
+
+
+def test_concurrent_appends_serialise_and_leave_no_lock_behind(cluster):
+    store_file(b"", file_id="f1")
+    threads = [
+        threading.Thread(target=append_to_file, args=("f1", bytes([65 + i]) * 300))
+        for i in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    manifest = get_manifest("f1")
+    assert manifest["file_size"] == 1800
+    assert manifest["version"] == 7
+    with open(reconstruct_file("f1"), "rb") as f:
+        data = f.read()
+    assert sorted(data[i] for i in range(0, 1800, 300)) == [65 + i for i in range(6)]
+    assert file_updates._file_locks == {}
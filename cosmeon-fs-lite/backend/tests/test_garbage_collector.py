@@ -0,0 +1,90 @@
+import os
+import time
+
+from fs_lite import garbage_collector, node_manager
+from fs_lite.file_updates import patch_file
+from fs_lite.garbage_collector import GC_GRACE_SECONDS, collect_deleted, sweep_orphans
+from fs_lite.metadata_store import list_tombstones, mark_deleted
+from fs_lite.node_manager import (
+    NODE_IDS,
+    chunk_path_on_node,
+    get_node_chunks,
+    node_has_chunk,
+    write_chunk_to_node,
+)
+
+from conftest import store_file
+
+
+def test_collect_deleted_frees_every_copy(cluster, monkeypatch):
+    manifest = store_file(os.urandom(3000), file_id="f1")
+    mark_deleted("f1")
+
+    # Each delete looks up just that chunk's size in the node index
+    lookups = []
+
+    def get_chunk_size(node_id, chunk_id):
+        lookups.append((node_id, chunk_id))
+        return node_manager.get_chunk_size(node_id, chunk_id)
+    monkeypatch.setattr(garbage_collector, "get_chunk_size", get_chunk_size)
+
+    result = collect_deleted()
+
+    assert result["files_reclaimed"] == 1
+    assert result["chunk_copies_deleted"] == 6
+    assert result["bytes_freed"] == 2 * 3000
+    assert len(lookups) == 6
+    assert list_tombstones() == []
+    for chunk in manifest["chunks"]:
+        for node_id in (chunk["primary_node"], chunk["replica_node"]):
+            assert not node_has_chunk(node_id, chunk["id"])
+    assert garbage_collector.get_gc_status()["last_collect"] == result
+
+
+def _plant(node_id: str, chunk_id: str, data: bytes, age: float):
+    """A chunk file on a node, written age seconds ago."""
+    write_chunk_to_node(node_id, chunk_id, data)
+    path = chunk_path_on_node(node_id, chunk_id)
+    then = time.time() - age
+    os.utime(path, (then, then))
+
+
+def test_sweep_reclaims_stale_copies_of_live_chunks(cluster):
+    data = os.urandom(3000)
+    manifest = store_file(data, file_id="f1")
+    chunk = manifest["chunks"][0]
+    elsewhere = [
+        n for n in NODE_IDS if n not in (chunk["primary_node"], chunk["replica_node"])
+    ]
+    # A repair leftover: same chunk, on a node metadata doesn't place it on
+    _plant(elsewhere[0], chunk["id"], data[:1024], age=GC_GRACE_SECONDS + 60)
+    # Too young to judge: may belong to a copy whose metadata isn't saved yet
+    _plant(elsewhere[1], chunk["id"], data[:1024], age=0)
+    for c in manifest["chunks"]:
+        for node_id in (c["primary_node"], c["replica_node"]):
+            old = time.time() - GC_GRACE_SECONDS - 60
+            os.utime(chunk_path_on_node(node_id, c["id"]), (old, old))
+
+    result = sweep_orphans()
+
+    assert result["orphans_deleted"] == 1
+    assert result["bytes_freed"] == 1024
+    assert not node_has_chunk(elsewhere[0], chunk["id"])
+    assert node_has_chunk(elsewhere[1], chunk["id"])
+    for c in manifest["chunks"]:
+        assert node_has_chunk(c["primary_node"], c["id"])
+        assert node_has_chunk(c["replica_node"], c["id"])
+
+
+def test_sweep_keeps_copies_only_archived_versions_place(cluster):
+    manifest = store_file(os.urandom(3000), file_id="f1")
+    patch_file("f1", 0, b"new")
+    chunk = manifest["chunks"][0]   # replaced in v2, still placed by v1
+    for node_id in NODE_IDS:
+        for c in get_node_chunks(node_id):
+            old = time.time() - GC_GRACE_SECONDS - 60
+            os.utime(chunk_path_on_node(node_id, c), (old, old))
+
+    assert sweep_orphans()["orphans_deleted"] == 0
+    assert node_has_chunk(chunk["primary_node"], chunk["id"])
+    assert node_has_chunk(chunk["replica_node"], chunk["id"])
@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+
+import pytest
+
+from fs_lite import event_bus, health_monitor, metadata_store
+from fs_lite.file_updates import patch_file
+from fs_lite.metadata_store import get_manifest, metadata_signature
+from fs_lite.anti_entropy import find_divergence
+from fs_lite.failure_detector import IO_ERRORS_TO_SUSPECT, detector
+from fs_lite.node_manager import (
+    NODE_IDS,
+    delete_chunk_from_node,
+    get_node_statuses,
+    node_has_chunk,
+    read_chunk_from_node,
+    write_chunk_to_node,
+)
+from fs_lite.repair_executor import run_repair
+
+from conftest import store_file
+
+
+def test_file_scan_reads_only_that_file(cluster, monkeypatch):
+    store_file(os.urandom(4000), file_id="a")
+    store_file(os.urandom(4000), file_id="b")
+    for node_id in NODE_IDS:
+        delete_chunk_from_node(node_id, "a_0")
+
+    reads = []
+    real_read = health_monitor.read_chunk_from_node
+
+    def counting_read(node_id, chunk_id, io_class):
+        reads.append(chunk_id)
+        return real_read(node_id, chunk_id, io_class)
+
+    monkeypatch.setattr(health_monitor, "read_chunk_from_node", counting_read)
+
+    health = health_monitor.scan_system_health(file_id="b")
+
+    assert {chunk_id.split("_")[0] for chunk_id in reads} == {"b"}
+    assert health["total_chunks"] == 4
+    assert health["system_status"] == "HEALTHY"
+
+    health = health_monitor.scan_system_health(details="unhealthy", file_id="a")
+    assert health["missing_chunks"] == 1
+    assert [d["chunk_id"] for d in health["details"]] == ["a_0"]
+
+
+def test_unknown_file_is_rejected(cluster):
+    with pytest.raises(ValueError):
+        health_monitor.scan_system_health(file_id="nope")
+
+
+def test_background_checks_are_bounded_and_off_the_hash_pool(cluster, monkeypatch):
+    for i in range(3):
+        store_file(os.urandom(8000), file_id=f"f{i}")
+    monkeypatch.setattr(health_monitor, "MAX_SCRUB_IN_FLIGHT", 2)
+
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    threads = set()
+    real_check = health_monitor._check_copies
+
+    def tracking_check(*args):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            threads.add(threading.current_thread().name)
+        time.sleep(0.002)
+        try:
+            return real_check(*args)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(health_monitor, "_check_copies", tracking_check)
+
+    health = health_monitor.scan_system_health()
+
+    assert health["healthy_chunks"] == 24
+    assert peak[0] <= 2
+    assert all(name.startswith("scrub") for name in threads)
+
+
+def test_suspect_copies_count_as_available_everywhere(cluster):
+    manifest = store_file(os.urandom(4000), file_id="f1")
+    suspect_node = manifest["chunks"][0]["primary_node"]
+    for _ in range(IO_ERRORS_TO_SUSPECT):
+        detector.record_io(suspect_node, ok=False)
+    assert get_node_statuses()[suspect_node] == "SUSPECT"
+
+    expected = sum(
+        suspect_node in (c["primary_node"], c["replica_node"])
+        for c in manifest["chunks"]
+    )
+    health = health_monitor.scan_system_health(details="all")
+
+    # Present but reported separately, so the daemon has nothing to repair
+    assert health["system_status"] == "HEALTHY"
+    assert health["under_replicated_chunks"] == 0
+    assert health["suspect_chunks"] == expected
+    assert sum(d["suspect_copies"] for d in health["details"]) == expected
+    assert run_repair()["planned_chunks"] == 0
+    assert find_divergence()["in_sync"]
+
+
+def test_file_deleted_mid_scan_is_skipped(cluster, monkeypatch):
+    store_file(os.urandom(2000), file_id="a")
+    store_file(os.urandom(2000), file_id="b")
+
+    # "b" is deleted between listing the files and loading its manifest
+    real_get_manifest = health_monitor.get_manifest
+
+    def get_manifest(file_id):
+        if file_id == "b":
+            raise ValueError(f"No file found with ID: {file_id}")
+        return real_get_manifest(file_id)
+
+    monkeypatch.setattr(health_monitor, "get_manifest", get_manifest)
+
+    assert health_monitor.scan_system_health()["system_status"] == "HEALTHY"
+    verified = health_monitor.verify_files("all")
+    assert verified["not_found"] == []
+    assert verified["failed"] == 0
+
+    # Asked for explicitly, a missing file is still an error
+    with pytest.raises(ValueError):
+        health_monitor.scan_system_health(file_id="b")
+    assert health_monitor.verify_files(["b"])["not_found"] == ["b"]
+
+
+def test_cached_summary_reads_no_chunks(cluster, monkeypatch):
+    monkeypatch.setattr(event_bus, "_latest", {})
+    store_file(os.urandom(3000), file_id="a")
+    reads = []
+    real_read = health_monitor.read_chunk_from_node
+
+    def counting_read(*args):
+        reads.append(args)
+        return real_read(*args)
+
+    monkeypatch.setattr(health_monitor, "read_chunk_from_node", counting_read)
+
+    # Nothing published yet: one scan, which publishes its counters
+    first = health_monitor.get_cached_health_summary()
+    scanned = len(reads)
+    assert first["total_chunks"] == 3 and scanned == 6
+
+    for _ in range(5):
+        summary = health_monitor.get_cached_health_summary()
+    assert summary["system_status"] == "HEALTHY"
+    assert summary["total_chunks"] == 3
+    assert len(reads) == scanned
+
+
+def _other_nodes(chunk: dict) -> list:
+    return [n for n in NODE_IDS if n not in (chunk["primary_node"], chunk["replica_node"])]
+
+
+def test_cleanup_removes_extra_copies_without_touching_metadata(cluster):
+    manifest = store_file(os.urandom(3000), file_id="f1")
+    chunk = manifest["chunks"][0]
+    extra = _other_nodes(chunk)[0]
+    write_chunk_to_node(extra, chunk["id"], read_chunk_from_node(chunk["primary_node"], chunk["id"]))
+    signature = metadata_signature()
+
+    assert health_monitor.cleanup_over_replicated_chunks() == {"cleaned_chunks": 1}
+
+    assert not node_has_chunk(extra, chunk["id"])
+    assert node_has_chunk(chunk["primary_node"], chunk["id"])
+    assert node_has_chunk(chunk["replica_node"], chunk["id"])
+    assert metadata_signature() == signature     # nothing changed, nothing saved
+
+
+def test_cleanup_keeps_copies_archived_versions_read(cluster):
+    store_file(os.urandom(3000), file_id="f1")
+    patch_file("f1", 0, b"new")
+
+    # Chunk 1 is shared by v1 and v2; v2's copy then moves (as tiering
+    # does), so three copies exist and v1 alone still reads the old one
+    current = get_manifest("f1")
+    chunk = current["chunks"][1]
+    old_node = chunk["replica_node"]
+    new_node = _other_nodes(chunk)[0]
+    write_chunk_to_node(new_node, chunk["id"], read_chunk_from_node(old_node, chunk["id"]))
+    chunk["replica_node"] = new_node
+    metadata_store.update_manifest(current)
+
+    assert health_monitor.cleanup_over_replicated_chunks() == {"cleaned_chunks": 0}
+    for node_id in (chunk["primary_node"], old_node, new_node):
+        assert node_has_chunk(node_id, chunk["id"])
+
+
+def test_cleanup_repoints_a_lost_placement_in_one_commit(cluster, monkeypatch):
+    store_file(os.urandom(3000), file_id="a")
+    manifest = store_file(os.urandom(3000), file_id="b")
+    chunk = manifest["chunks"][1]
+    spare = _other_nodes(chunk)[0]
+    data = read_chunk_from_node(chunk["replica_node"], chunk["id"])
+    write_chunk_to_node(spare, chunk["id"], data)
+    delete_chunk_from_node(chunk["replica_node"], chunk["id"])
+
+    saves = []
+    real_save = metadata_store._save_all
+    monkeypatch.setattr(metadata_store, "_save_all", lambda *a: saves.append(1) or real_save(*a))
+
+    assert health_monitor.cleanup_over_replicated_chunks() == {"cleaned_chunks": 0}
+
+    assert len(saves) == 1
+    assert get_manifest("b")["chunks"][1]["replica_node"] == spare
+    assert node_has_chunk(spare, chunk["id"])
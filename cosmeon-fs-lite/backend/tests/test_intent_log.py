@@ -0,0 +1,123 @@
+import os
+
+from fs_lite import intent_log
+from fs_lite.intent_log import (
+    begin_upload,
+    intent_file,
+    record_chunk,
+    record_file,
+    recover_incomplete_uploads,
+    seal_upload,
+)
+from fs_lite.metadata_store import get_manifest, list_files, save_manifest
+from fs_lite.node_manager import node_has_chunk, write_chunk_to_node
+
+from conftest import make_manifest
+
+NODES = ["node_0", "node_1"]
+
+
+def _log_upload(manifest: dict, write: bool = True, seal: bool = True, bulk_id: str = None):
+    """Log (and optionally write) every chunk of a manifest, as distribution does."""
+    upload_key = bulk_id or manifest["file_id"]
+    file_id = manifest["file_id"] if bulk_id else None
+    for chunk in manifest["chunks"]:
+        record_chunk(upload_key, chunk, NODES, file_id=file_id)
+        if write:
+            for node_id in NODES:
+                write_chunk_to_node(node_id, chunk["id"], chunk["data"])
+    if seal:
+        seal_upload(upload_key)
+
+
+def test_sealed_upload_rolls_forward(cluster):
+    manifest = make_manifest(os.urandom(3000), file_id="f1")
+    begin_upload(manifest)
+    _log_upload(manifest)
+
+    assert recover_incomplete_uploads() == {"finished": 1, "aborted": 0, "orphans_removed": 0}
+    saved = get_manifest("f1")
+    assert [c["id"] for c in saved["chunks"]] == ["f1_0", "f1_1", "f1_2"]
+    assert saved["chunks"][0]["primary_node"] == "node_0"
+    assert not os.path.exists(intent_file("f1"))
+
+
+def test_unsealed_upload_is_aborted(cluster):
+    manifest = make_manifest(os.urandom(3000), file_id="f1")
+    begin_upload(manifest)
+    _log_upload(manifest, seal=False)
+
+    result = recover_incomplete_uploads()
+
+    assert result["aborted"] == 1
+    assert result["orphans_removed"] == 6
+    assert list_files() == []
+    assert not node_has_chunk("node_0", "f1_0")
+
+
+def test_sealed_upload_with_missing_chunk_is_aborted(cluster):
+    manifest = make_manifest(os.urandom(3000), file_id="f1")
+    begin_upload(manifest)
+    _log_upload(manifest, write=False)
+    write_chunk_to_node("node_0", "f1_0", manifest["chunks"][0]["data"])
+
+    assert recover_incomplete_uploads()["aborted"] == 1
+    assert list_files() == []
+    assert not node_has_chunk("node_0", "f1_0")
+
+
+def test_committed_upload_only_drops_intent(cluster):
+    manifest = make_manifest(os.urandom(3000), file_id="f1")
+    begin_upload(manifest)
+    _log_upload(manifest)
+    for chunk in manifest["chunks"]:
+        chunk["primary_node"], chunk["replica_node"] = NODES
+    save_manifest(manifest)
+
+    assert recover_incomplete_uploads()["finished"] == 1
+    assert node_has_chunk("node_1", "f1_2")
+    assert not os.path.exists(intent_file("f1"))
+
+
+def test_torn_final_record_is_ignored(cluster):
+    manifest = make_manifest(os.urandom(3000), file_id="f1")
+    begin_upload(manifest)
+    _log_upload(manifest)
+    with open(intent_file("f1"), "a") as f:
+        f.write('{"type": "chu')
+
+    assert recover_incomplete_uploads()["finished"] == 1
+    assert get_manifest("f1")["total_chunks"] == 3
+
+
+def test_bulk_upload_rolls_forward_every_member(cluster):
+    members = [make_manifest(os.urandom(1500), file_id=f"m{i}") for i in range(3)]
+    begin_upload({"file_id": "bulk_1"}, kind="bulk")
+    for manifest in members:
+        record_file("bulk_1", manifest)
+        _log_upload(manifest, seal=False, bulk_id="bulk_1")
+    seal_upload("bulk_1")
+
+    assert recover_incomplete_uploads()["finished"] == 1
+    assert sorted(f["file_id"] for f in list_files()) == ["m0", "m1", "m2"]
+
+
+def test_recovery_loads_metadata_once(cluster, monkeypatch):
+    for i in range(5):
+        manifest = make_manifest(os.urandom(1500), file_id=f"f{i}")
+        begin_upload(manifest)
+        _log_upload(manifest, seal=i % 2 == 0)
+
+    loads = []
+    real_file_versions = intent_log.file_versions
+
+    def counting_file_versions():
+        loads.append(1)
+        return real_file_versions()
+
+    monkeypatch.setattr(intent_log, "file_versions", counting_file_versions)
+
+    result = recover_incomplete_uploads()
+
+    assert (result["finished"], result["aborted"]) == (3, 2)
+    assert len(loads) == 1
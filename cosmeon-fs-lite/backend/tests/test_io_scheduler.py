@@ -0,0 +1,97 @@
+import pytest
+
+from fs_lite import io_scheduler
+from fs_lite.io_scheduler import (
+    BURST_SECONDS,
+    FOREGROUND,
+    MAX_DEBT_SECONDS,
+    SCRUB,
+    IOScheduler,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(io_scheduler.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(io_scheduler.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket(None)
+    assert bucket.reserve(10 ** 12) == 0.0
+
+
+def test_burst_is_free_then_callers_queue(clock):
+    bucket = TokenBucket(100)
+    assert bucket.reserve(100 * BURST_SECONDS) == 0.0
+    # Each further reservation waits behind the ones already queued
+    assert bucket.reserve(50) == pytest.approx(0.5)
+    assert bucket.reserve(50) == pytest.approx(1.0)
+
+
+def test_tokens_refill_up_to_the_burst(clock):
+    bucket = TokenBucket(100)
+    bucket.reserve(100)
+    clock.now += 0.5
+    assert bucket.reserve(50) == 0.0
+    clock.now += 60
+    assert bucket.reserve(100 * BURST_SECONDS) == 0.0
+    assert bucket.reserve(1) > 0
+
+
+def test_charge_never_waits_and_caps_debt(clock):
+    bucket = TokenBucket(100)
+    bucket.charge(10 ** 9)
+    assert bucket.tokens == -100 * MAX_DEBT_SECONDS
+    assert bucket.reserve(0) == pytest.approx(MAX_DEBT_SECONDS)
+
+
+def test_set_rate_clamps_saved_tokens(clock):
+    bucket = TokenBucket(1000)
+    bucket.set_rate(10)
+    assert bucket.tokens == 10 * BURST_SECONDS
+
+
+def test_foreground_only_charges_node_bucket(clock):
+    scheduler = IOScheduler()
+    scheduler.set_node_limit("node_0", 100)
+
+    scheduler.acquire(FOREGROUND, "node_0", 1000)
+    assert clock.slept == []
+
+    # Background I/O now waits for the debt foreground left on the node
+    scheduler.set_class_limit(SCRUB, None)
+    scheduler.acquire(SCRUB, "node_0", 10)
+    assert clock.slept and clock.slept[0] > 0
+    assert scheduler.get_stats()[SCRUB]["throttled_seconds"] > 0
+
+
+def test_background_waits_for_its_class_limit(clock):
+    scheduler = IOScheduler()
+    scheduler.set_class_limit(SCRUB, 100)
+
+    scheduler.acquire(SCRUB, "node_0", 100)
+    scheduler.acquire(SCRUB, "node_1", 100)
+
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_unknown_class_is_rejected(clock):
+    with pytest.raises(ValueError):
+        IOScheduler().acquire("bogus", "node_0", 1)
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import random
+
+import pytest
+
+from fs_lite.merkle import (
+    NodeDigest,
+    build_tree,
+    diverging_buckets,
+    inclusion_proof,
+    merkle_root,
+    update_leaves,
+    verify_proof,
+)
+
+
+def _leaves(n: int) -> list:
+    return [hashlib.sha256(os.urandom(8)).hexdigest() for _ in range(n)]
+
+
+def test_empty_tree_has_the_empty_hash_as_root():
+    assert merkle_root([]) == hashlib.sha256(b"").hexdigest()
+
+
+def test_single_leaf_is_its_own_root():
+    leaf = _leaves(1)[0]
+    assert merkle_root([leaf]) == leaf
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 8, 13])
+def test_every_leaf_has_a_valid_proof(n):
+    leaves = _leaves(n)
+    levels = build_tree(leaves)
+    root = levels[-1][0]
+    for index, leaf in enumerate(leaves):
+        assert verify_proof(leaf, inclusion_proof(levels, index), root)
+
+
+def test_proof_rejects_a_different_leaf():
+    leaves = _leaves(6)
+    levels = build_tree(leaves)
+    assert not verify_proof(leaves[1], inclusion_proof(levels, 2), levels[-1][0])
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 16, 33])
+def test_update_leaves_matches_a_full_rebuild(n):
+    rng = random.Random(n)
+    leaves = _leaves(n)
+    levels = build_tree(leaves)
+    changes = {i: _leaves(1)[0] for i in rng.sample(range(n), max(1, n // 3))}
+
+    updated = update_leaves(levels, changes)
+
+    expected = list(leaves)
+    for i, leaf in changes.items():
+        expected[i] = leaf
+    assert updated == build_tree(expected)
+    assert levels == build_tree(leaves)    # input untouched
+
+
+def test_update_leaves_appends():
+    leaves = _leaves(5)
+    new = _leaves(2)
+    updated = update_leaves(build_tree(leaves), {5: new[0], 6: new[1]})
+    assert updated == build_tree(leaves + new)
+
+
+def test_update_leaves_rejects_a_gap():
+    with pytest.raises(ValueError):
+        update_leaves(build_tree(_leaves(3)), {5: _leaves(1)[0]})
+
+
+def test_node_digest_is_order_independent_and_finds_the_bucket():
+    a, b = NodeDigest(), NodeDigest()
+    chunks = [(f"f_{i}", 100 + i) for i in range(50)]
+    for chunk_id, size in chunks:
+        a.toggle(chunk_id, size)
+    for chunk_id, size in reversed(chunks):
+        b.toggle(chunk_id, size)
+    assert a.root() == b.root()
+
+    b.toggle("f_7", 107)
+    buckets, _ = diverging_buckets(a.levels(), b.levels())
+    assert len(buckets) == 1
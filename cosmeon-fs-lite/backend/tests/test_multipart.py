@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from fs_lite import multipart
+from fs_lite.garbage_collector import sweep_orphans
+from fs_lite.metadata_store import get_manifest
+from fs_lite.multipart import (
+    abort_multipart_upload,
+    complete_upload,
+    get_upload_status,
+    initiate_upload,
+    upload_part,
+)
+from fs_lite.node_manager import NODE_IDS, node_has_chunk
+from fs_lite.reconstruct import reconstruct_file
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(multipart, "CHUNK_SIZE", 1024)
+
+
+def _part_chunk_ids(upload_id: str) -> list:
+    with open(multipart._state_path(upload_id)) as f:
+        parts = json.load(f)["parts"].values()
+    return [c["id"] for part in parts for c in part["chunks"]]
+
+
+def _on_any_node(chunk_id: str) -> bool:
+    return any(node_has_chunk(node_id, chunk_id) for node_id in NODE_IDS)
+
+
+def test_parts_in_any_order_complete_into_one_file(cluster):
+    parts = {n: os.urandom(2500) for n in (1, 2, 3)}
+    upload_id = initiate_upload("data.bin")["upload_id"]
+
+    # Concurrently, highest part first
+    threads = [
+        threading.Thread(target=upload_part, args=(upload_id, n, io.BytesIO(parts[n])))
+        for n in (3, 1, 2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    manifest = complete_upload(upload_id)
+
+    assert manifest["file_id"] == upload_id
+    assert manifest["file_size"] == 7500
+    assert [p["part_number"] for p in manifest["parts"]] == [1, 2, 3]
+    assert [c["index"] for c in manifest["chunks"]] == list(range(9))
+    assert get_manifest(upload_id)["full_hash_scheme"] == "multipart"
+    with open(reconstruct_file(upload_id), "rb") as f:
+        assert f.read() == parts[1] + parts[2] + parts[3]
+
+
+def test_status_lists_committed_parts_for_resuming(cluster):
+    upload_id = initiate_upload("data.bin")["upload_id"]
+    upload_part(upload_id, 2, io.BytesIO(b"b" * 1500))
+
+    status = get_upload_status(upload_id)
+    assert [p["part_number"] for p in status["parts"]] == [2]
+    assert status["committed_bytes"] == 1500
+
+    # Resume: send only what's missing, then complete
+    upload_part(upload_id, 1, io.BytesIO(b"a" * 1000))
+    assert [p["part_number"] for p in get_upload_status(upload_id)["parts"]] == [1, 2]
+    assert complete_upload(upload_id)["file_size"] == 2500
+
+
+def test_resent_part_replaces_the_old_chunks(cluster):
+    upload_id = initiate_upload("data.bin")["upload_id"]
+    upload_part(upload_id, 1, io.BytesIO(b"a" * 1000))
+    old_ids = _part_chunk_ids(upload_id)
+
+    upload_part(upload_id, 1, io.BytesIO(b"b" * 1000))
+
+    assert not any(_on_any_node(chunk_id) for chunk_id in old_ids)
+    assert all(_on_any_node(chunk_id) for chunk_id in _part_chunk_ids(upload_id))
+
+
+def test_complete_rejects_missing_parts(cluster):
+    upload_id = initiate_upload("data.bin")["upload_id"]
+    upload_part(upload_id, 1, io.BytesIO(b"a" * 1000))
+    with pytest.raises(RuntimeError):
+        complete_upload(upload_id, [1, 2])
+
+
+def test_abort_removes_state_and_chunks(cluster):
+    upload_id = initiate_upload("data.bin")["upload_id"]
+    upload_part(upload_id, 1, io.BytesIO(os.urandom(3000)))
+    chunk_ids = _part_chunk_ids(upload_id)
+
+    assert abort_multipart_upload(upload_id)["aborted_parts"] == 1
+
+    assert not any(_on_any_node(chunk_id) for chunk_id in chunk_ids)
+    with pytest.raises(ValueError):
+        get_upload_status(upload_id)
+
+
+def test_gc_sweep_expires_abandoned_uploads(cluster):
+    stale_id = initiate_upload("stale.bin")["upload_id"]
+    upload_part(stale_id, 1, io.BytesIO(os.urandom(2000)))
+    stale_chunks = _part_chunk_ids(stale_id)
+    active_id = initiate_upload("active.bin")["upload_id"]
+    upload_part(active_id, 1, io.BytesIO(os.urandom(2000)))
+
+    path = multipart._state_path(stale_id)
+    with open(path) as f:
+        state = json.load(f)
+    state["created_at"] = state["updated_at"] = time.time() - multipart.MULTIPART_TTL_SECONDS - 1
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+    result = sweep_orphans()
+
+    assert result["multipart_uploads_expired"] == 1
+    assert not any(_on_any_node(chunk_id) for chunk_id in stale_chunks)
+    with pytest.raises(ValueError):
+        get_upload_status(stale_id)
+    assert [p["part_number"] for p in get_upload_status(active_id)["parts"]] == [1]
@@ -0,0 +1,45 @@
+from fs_lite import node_manager
+from fs_lite.node_manager import (
+    MAX_STORAGE_BYTES,
+    delete_chunk_from_node,
+    get_free_bytes,
+    get_node_chunks,
+    has_capacity,
+    refresh_node_state,
+    write_chunk_to_node,
+)
+
+
+def _used(node_id: str) -> int:
+    return MAX_STORAGE_BYTES - get_free_bytes(node_id)
+
+
+def test_used_bytes_track_writes_overwrites_and_deletes(cluster):
+    write_chunk_to_node("node_0", "a", b"x" * 1000)
+    write_chunk_to_node("node_0", "b", b"x" * 500)
+    assert _used("node_0") == 1500
+
+    write_chunk_to_node("node_0", "a", b"x" * 200)     # overwrite, smaller
+    assert _used("node_0") == 700
+
+    delete_chunk_from_node("node_0", "b")
+    delete_chunk_from_node("node_0", "missing")
+    assert _used("node_0") == 200 == sum(get_node_chunks("node_0").values())
+    assert _used("node_1") == 0
+
+    # A rescan from disk agrees with the running count
+    refresh_node_state()
+    assert _used("node_0") == 200
+
+
+def test_capacity_check_does_not_walk_the_index(cluster, monkeypatch):
+    write_chunk_to_node("node_0", "a", b"x" * 1000)
+
+    class NoSum(dict):
+        def values(self):
+            raise AssertionError("capacity check summed the chunk index")
+
+    monkeypatch.setitem(node_manager._chunk_index, "node_0", NoSum(node_manager._chunk_index["node_0"]))
+
+    assert has_capacity("node_0", MAX_STORAGE_BYTES - 1000)
+    assert not has_capacity("node_0", MAX_STORAGE_BYTES - 999)
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from fs_lite.node_manager import NODE_IDS, chunk_path_on_node
+from fs_lite.reconstruct import read_file_range, reconstruct_file
+
+from conftest import store_file
+
+
+def _corrupt_every_copy(chunk_id: str):
+    for node_id in NODE_IDS:
+        path = chunk_path_on_node(node_id, chunk_id)
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                f.write(b"\x00" * 8)
+
+
+def test_range_reads_only_the_requested_bytes(cluster):
+    data = os.urandom(5000)
+    manifest = store_file(data, file_id="f")
+
+    assert read_file_range(manifest, 0, 0) == data[:1]
+    assert read_file_range(manifest, 1000, 2100) == data[1000:2101]
+    assert read_file_range(manifest, 4096, 4999) == data[4096:]
+
+
+def test_range_read_rejects_a_corrupt_chunk(cluster):
+    manifest = store_file(os.urandom(5000), file_id="f")
+    _corrupt_every_copy("f_1")
+
+    assert read_file_range(manifest, 0, 100)
+    with pytest.raises(RuntimeError):
+        read_file_range(manifest, 1024, 1100)
+
+
+def test_range_read_rejects_a_manifest_not_matching_its_root(cluster):
+    manifest = store_file(os.urandom(5000), file_id="f")
+    manifest["chunks"][3]["hash"] = "0" * 64
+
+    with pytest.raises(RuntimeError):
+        read_file_range(manifest, 0, 10)
+
+
+def test_reconstruct_round_trips(cluster):
+    data = os.urandom(5000)
+    store_file(data, file_id="f")
+
+    with open(reconstruct_file("f"), "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,126 @@
+import os
+import threading
+
+import pytest
+
+from fs_lite import metadata_store, repair_executor
+from fs_lite.metadata_store import get_manifest
+from fs_lite.node_manager import (
+    chunk_path_on_node,
+    node_has_chunk,
+    set_node_status,
+)
+from fs_lite.reconstruct import reconstruct_file
+from fs_lite.repair_executor import get_repair_status, run_repair
+
+from conftest import store_file
+
+
+@pytest.fixture(autouse=True)
+def fresh_status(monkeypatch):
+    monkeypatch.setattr(repair_executor, "_status", {
+        "state": "idle",
+        "degraded_since": None,
+        "last_time_to_full_redundancy": None,
+        "last_restored_at": None,
+        "last_run": None,
+    })
+
+
+def _read(file_id: str) -> bytes:
+    with open(reconstruct_file(file_id), "rb") as f:
+        return f.read()
+
+
+def _fully_placed(file_id: str, offline: str):
+    for chunk in get_manifest(file_id)["chunks"]:
+        placed = (chunk["primary_node"], chunk["replica_node"])
+        assert offline not in placed
+        assert len(set(placed)) == 2
+        assert all(node_has_chunk(n, chunk["id"]) for n in placed)
+
+
+def test_lost_node_is_restored_in_parallel_with_one_commit(cluster, monkeypatch):
+    files = {f"f{i}": os.urandom(6000) for i in range(4)}
+    for file_id, data in files.items():
+        store_file(data, file_id=file_id)
+    lost = "node_0"
+    set_node_status(lost, "OFFLINE")
+
+    threads = set()
+    targets = []
+    real_stage = repair_executor.stage_chunk_copy
+
+    def tracking_stage(source, target, chunk_id, **kwargs):
+        threads.add(threading.current_thread().name)
+        targets.append(target)
+        return real_stage(source, target, chunk_id, **kwargs)
+
+    saves = []
+    real_save = metadata_store._save_all
+    monkeypatch.setattr(repair_executor, "stage_chunk_copy", tracking_stage)
+    monkeypatch.setattr(metadata_store, "_save_all", lambda *a: saves.append(1) or real_save(*a))
+
+    run = run_repair()
+
+    assert run["planned_chunks"] == run["repaired_chunks"] > 0
+    assert run["failed_chunks"] == 0 and run["lost_chunks"] == 0
+    assert len(saves) == 1
+    assert all(name.startswith("repair") for name in threads)
+    assert len(set(targets)) > 1        # spread over destination nodes
+    for file_id, data in files.items():
+        _fully_placed(file_id, lost)
+        assert _read(file_id) == data
+
+    status = get_repair_status()
+    assert status["degraded_since"] is None
+    assert status["last_time_to_full_redundancy"] is not None
+
+
+def test_copies_fall_back_to_userspace(cluster, monkeypatch):
+    data = os.urandom(5000)
+    store_file(data, file_id="f1")
+    set_node_status("node_1", "OFFLINE")
+
+    # Neither kernel copy available on this platform
+    monkeypatch.delattr(os, "copy_file_range", raising=False)
+    monkeypatch.delattr(os, "sendfile", raising=False)
+
+    run = run_repair()
+
+    assert run["repaired_chunks"] > 0
+    assert run["copy_methods"] == {"userspace": run["repaired_chunks"]}
+    _fully_placed("f1", "node_1")
+    assert _read("f1") == data
+
+
+def test_kernel_copy_failure_falls_back(cluster, monkeypatch):
+    data = os.urandom(5000)
+    store_file(data, file_id="f1")
+    set_node_status("node_2", "OFFLINE")
+
+    def unsupported(*args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+
+    run = run_repair()
+
+    assert run["copy_methods"] == {"userspace": run["repaired_chunks"]}
+    assert _read("f1") == data
+
+
+def test_corrupt_copy_is_replaced(cluster):
+    data = os.urandom(3000)
+    chunk = store_file(data, file_id="f1")["chunks"][0]
+    with open(chunk_path_on_node(chunk["primary_node"], chunk["id"]), "r+b") as f:
+        f.write(b"\0" * 16)
+
+    run = run_repair()
+
+    assert run["repaired_chunks"] == 1
+    repaired = get_manifest("f1")["chunks"][0]
+    assert chunk["primary_node"] not in (repaired["primary_node"], repaired["replica_node"])
+    assert not node_has_chunk(chunk["primary_node"], chunk["id"])
+    assert _read("f1") == data
@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from fs_lite import metadata_store, tiering
+from fs_lite.access_stats import access_stats
+from fs_lite.anti_entropy import find_divergence
+from fs_lite.file_updates import patch_file
+from fs_lite.metadata_store import get_compact_manifest, get_manifest
+from fs_lite.node_manager import NODE_IDS, node_has_chunk, scan_node_files
+from fs_lite.reconstruct import reconstruct_file
+
+from conftest import store_file
+
+
+@pytest.fixture(autouse=True)
+def fresh_tiering(monkeypatch):
+    access_stats.reset()
+    monkeypatch.setattr(tiering, "_first_seen", {})
+    monkeypatch.setattr(tiering, "_policy", dict(tiering._policy))
+    yield
+    access_stats.reset()
+
+
+def _heat_up(file_id: str, chunk_id: str):
+    for _ in range(int(tiering.DEFAULT_HOT_READS) + 2):
+        access_stats.record_read(file_id, [chunk_id])
+
+
+def _holders(chunk_id: str) -> list:
+    return [node_id for node_id in NODE_IDS if node_has_chunk(node_id, chunk_id)]
+
+
+def test_hot_chunk_gets_a_read_replica(cluster):
+    store_file(os.urandom(2000), file_id="f1")
+    _heat_up("f1", "f1_0")
+
+    run = tiering.run_tiering()
+
+    replicas = get_manifest("f1")["read_replicas"]
+    assert run["read_replicas_added"] == 1
+    assert list(replicas) == ["f1_0"]
+    assert replicas["f1_0"] in _holders("f1_0")
+    assert len(_holders("f1_0")) == 3
+    assert find_divergence()["in_sync"]
+
+
+def test_failed_copy_commit_saves_nothing(cluster, monkeypatch):
+    manifest = store_file(os.urandom(2000), file_id="f1")
+    _heat_up("f1", "f1_0")
+    tiering.run_tiering()
+    first = dict(get_manifest("f1")["read_replicas"])
+
+    # The next pass copies f1_1, then the commit of that copy fails
+    _heat_up("f1", "f1_1")
+    real_commit = tiering.commit_staged_chunks
+
+    def failing_commit(entries):
+        real_commit(entries)
+        raise OSError("directory sync failed")
+    monkeypatch.setattr(tiering, "commit_staged_chunks", failing_commit)
+
+    with pytest.raises(OSError):
+        tiering.run_tiering()
+
+    assert get_compact_manifest("f1").header["read_replicas"] == first
+    with open(metadata_store.METADATA_FILE) as f:
+        assert json.load(f)["f1"]["read_replicas"] == first
+
+    # The uncommitted copy is gone again, staged or not
+    placed = manifest["chunks"][1]
+    assert sorted(_holders("f1_1")) == sorted([placed["primary_node"], placed["replica_node"]])
+    assert not any(f["temp"] for node_id in NODE_IDS for f in scan_node_files(node_id))
+    assert find_divergence()["in_sync"]
+
+
+def test_cold_move_keeps_copies_an_archived_version_reads(cluster):
+    data = os.urandom(5000)
+    store_file(data, file_id="f1")
+    patch_file("f1", 100, b"X" * 10)        # v2 shares chunks 1-4 with v1
+    tiering.configure_tiering(cold_nodes=["node_2", "node_3"], cold_after_seconds=0)
+
+    run = tiering.run_tiering()
+
+    assert run["chunks_moved_cold"] > 0
+    for chunk in get_manifest("f1")["chunks"]:
+        assert {chunk["primary_node"], chunk["replica_node"]} == {"node_2", "node_3"}
+    with open(reconstruct_file("f1", 1), "rb") as f:
+        assert f.read() == data
+    with open(reconstruct_file("f1"), "rb") as f:
+        assert f.read() == data[:100] + b"X" * 10 + data[110:]
+    assert find_divergence()["in_sync"]
@@ -1,8 +1,10 @@
 import axios from "axios";
 
+export const API_BASE_URL = "http://localhost:8000";
+
 const client = axios.create({
-  baseURL: "http://localhost:8000",
+  baseURL: API_BASE_URL,
   timeout: 5000,
 });
 
-export default client;
\ No newline at end of file
+export default client;
@@ -0,0 +1,33 @@
+import { API_BASE_URL } from "./client";
+
+// One shared EventSource per tab; components register per-event handlers.
+let source = null;
+const handlers = {};
+// Latest payload per event, so a component mounting later starts from it
+const latest = {};
+
+function ensureSource() {
+  if (source) return;
+  source = new EventSource(`${API_BASE_URL}/events`);
+  source.onerror = (err) => {
+    // EventSource reconnects on its own; the server replays latest state
+    console.error("Event stream error:", err);
+  };
+}
+
+export function subscribe(event, handler) {
+  ensureSource();
+
+  if (!handlers[event]) {
+    handlers[event] = new Set();
+    source.addEventListener(event, (e) => {
+      const data = JSON.parse(e.data);
+      latest[event] = data;
+      handlers[event].forEach((h) => h(data));
+    });
+  }
+  handlers[event].add(handler);
+  if (latest[event]) handler(latest[event]);
+
+  return () => handlers[event].delete(handler);
+}
@@ -1,13 +1,13 @@
 import { useEffect, useState } from "react";
 import client from "../../api/client";
+import { subscribe } from "../../api/events";
 
 export default function NodeGrid() {
   const [nodes, setNodes] = useState([]);
 
   useEffect(() => {
     fetchNodes();
-    const interval = setInterval(fetchNodes, 5000);
-    return () => clearInterval(interval);
+    return subscribe("nodes", (data) => setNodes(data.nodes));
   }, []);
 
   const fetchNodes = async () => {
@@ -38,6 +38,8 @@ export default function NodeGrid() {
       <div className="grid grid-cols-2 md:grid-cols-4 gap-6">
         {nodes.map((node) => {
           const isOnline = node.status === "ONLINE";
+          // Failure detector is unsure — reads avoid it, no repair yet
+          const isSuspect = node.status === "SUSPECT";
 
           return (
             <div
@@ -46,6 +48,8 @@ export default function NodeGrid() {
                 ${
                   isOnline
                     ? "border-green-500/20 hover:border-green-400/50"
+                    : isSuspect
+                    ? "border-amber-500/20 hover:border-amber-400/50"
                     : "border-red-500/20 hover:border-red-400/50"
                 }
               `}
@@ -59,12 +63,12 @@ export default function NodeGrid() {
                 <div className="flex items-center gap-2">
                   <span
                     className={`h-2 w-2 rounded-full ${
-                      isOnline ? "bg-green-400" : "bg-red-400"
+                      isOnline ? "bg-green-400" : isSuspect ? "bg-amber-400" : "bg-red-400"
                     }`}
                   ></span>
                   <span
                     className={`text-xs font-medium ${
-                      isOnline ? "text-green-400" : "text-red-400"
+                      isOnline ? "text-green-400" : isSuspect ? "text-amber-400" : "text-red-400"
                     }`}
                   >
                     {node.status}
@@ -83,19 +87,19 @@ export default function NodeGrid() {
               {/* Action Button */}
               <button
                 onClick={() =>
-                  isOnline
+                  isOnline || isSuspect
                     ? failNode(node.node_id)
                     : recoverNode(node.node_id)
                 }
                 className={`mt-6 w-full py-2 rounded-lg text-sm font-medium transition
                   ${
-                    isOnline
+                    isOnline || isSuspect
                       ? "bg-red-600 hover:bg-red-700"
                       : "bg-green-600 hover:bg-green-700"
                   }
                 `}
               >
-                {isOnline ? "Simulate Failure" : "Recover Node"}
+                {isOnline || isSuspect ? "Simulate Failure" : "Recover Node"}
               </button>
             </div>
           );
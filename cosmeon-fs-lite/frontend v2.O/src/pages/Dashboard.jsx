@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import client from "../api/client";
+import { subscribe } from "../api/events";
 import NodeGrid from "../components/nodes/NodeGrid";
 import FileTable from "../components/files/FileTable";
 import UploadPanel from "../components/files/UploadPanel";
@@ -9,28 +9,15 @@ export default function Dashboard() {
   const [health, setHealth] = useState(null);
   const [refreshKey, setRefreshKey] = useState(0);
 
-  useEffect(() => {
-    fetchHealth();
-    const interval = setInterval(fetchHealth, 5000);
-    return () => clearInterval(interval);
-  }, []);
-
-  const fetchHealth = async () => {
-    try {
-      const res = await client.get("/health");
-      setHealth(res.data);
-    } catch (err) {
-      console.error("Health fetch failed:", err);
-    }
-  };
+  // Seeded by the stream's replay of the last health event, then updated
+  // by the backend's scans — viewers never trigger one
+  useEffect(() => subscribe("health", setHealth), []);
 
   const handleUploadSuccess = () => {
-    fetchHealth();
     setRefreshKey((prev) => prev + 1);
   };
 
   const handleRepairSuccess = () => {
-    fetchHealth();
     setRefreshKey((prev) => prev + 1);
   };
 